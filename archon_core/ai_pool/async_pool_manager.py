@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Async AI Pool Manager
+Version: 2.5.1
+Purpose: Non-blocking provider clients for the AI decision pool
+
+This module:
+1. Exposes coroutine versions of the AIPoolManager call_* methods
+2. Shares one aiohttp connection pool across all in-flight requests
+3. Lets a single event loop drive many concurrent plans
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+try:
+    import aiohttp
+except ImportError:  # Optional dependency, only needed for async mode
+    aiohttp = None
+
+try:
+    from .pool_manager import AIPoolManager, AIResponse, AggregatedPlan, CallOptions, PROVIDERS
+    from .rate_limiter import RateLimitTimeout
+    from .streaming import StreamAccumulator, iter_sse_events
+    from .single_flight import AsyncSingleFlight
+    from .cascade import CASCADE_PLAN_FORMAT
+    from .retry import parse_retry_after
+except ImportError:
+    from pool_manager import AIPoolManager, AIResponse, AggregatedPlan, CallOptions, PROVIDERS
+    from rate_limiter import RateLimitTimeout
+    from streaming import StreamAccumulator, iter_sse_events
+    from single_flight import AsyncSingleFlight
+    from cascade import CASCADE_PLAN_FORMAT
+    from retry import parse_retry_after
+
+
+class AsyncAIPoolManager(AIPoolManager):
+    """
+    ARCHON Async AI Pool Manager
+    Coroutine-based provider layer for high-concurrency planning
+    
+    Usage:
+        async with AsyncAIPoolManager() as pool:
+            plans = await asyncio.gather(*(pool.generate_plan(t, d) for t, d in tasks))
+    """
+    
+    def __init__(self, config_path: str = "../config/decision_pool.yaml",
+                 max_connections: int = 100):
+        if aiohttp is None:
+            raise ImportError("AsyncAIPoolManager requires aiohttp (pip install aiohttp)")
+        
+        super().__init__(config_path)
+        self.max_connections = self.pool_settings.get('async_max_connections', max_connections)
+        self._session: Optional[aiohttp.ClientSession] = None
+        if self.single_flight is not None:
+            self.single_flight = AsyncSingleFlight()
+    
+    async def __aenter__(self) -> "AsyncAIPoolManager":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Lazily create the shared client session inside the running loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared client session and flush the usage ledger"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        await asyncio.get_running_loop().run_in_executor(None, super().close)
+    
+    # ================================
+    # AI MODEL CALLERS
+    # ================================
+    
+    async def call_gpt4o(self, prompt: str, task_type: str = "planning",
+                         options: Optional[CallOptions] = None) -> AIResponse:
+        """Async GPT-4o call (Chief Planner & Coder)"""
+        return await self._call_provider_async('gpt4o', prompt, task_type, options)
+    
+    async def call_claude(self, prompt: str, task_type: str = "deployment",
+                          options: Optional[CallOptions] = None) -> AIResponse:
+        """Async Claude call (Deployment Architect)"""
+        return await self._call_provider_async('claude', prompt, task_type, options)
+    
+    async def call_gemini(self, prompt: str, task_type: str = "research",
+                          options: Optional[CallOptions] = None) -> AIResponse:
+        """Async Gemini call (Research Analyst)"""
+        return await self._call_provider_async('gemini', prompt, task_type, options)
+    
+    async def call_deepseek(self, prompt: str, task_type: str = "analysis",
+                            options: Optional[CallOptions] = None) -> AIResponse:
+        """Async DeepSeek call (Performance Analyst)"""
+        return await self._call_provider_async('deepseek', prompt, task_type, options)
+    
+    async def call_gpt5(self, prompt: str, task_type: str = "strategy",
+                        options: Optional[CallOptions] = None) -> AIResponse:
+        """Async GPT-5 call (Meta Strategist, manual trigger only)"""
+        return await self._call_provider_async('gpt5', prompt, task_type, options)
+    
+    async def call_planner_cascade(self, prompt: str, task_type: str = "planning",
+                                   options: Optional[CallOptions] = None) -> AIResponse:
+        """Async cheap-first planner cascade; see AIPoolManager.call_planner_cascade"""
+        prompt = prompt + CASCADE_PLAN_FORMAT
+        attempts = []
+        
+        for ai_id in self._cascade_tiers():
+            response = await getattr(self, f"call_{ai_id}")(prompt, task_type, options)
+            attempts.append(response)
+            if self._cascade_accepts(response):
+                return self._cascade_response(attempts, response)
+        
+        return self._cascade_response(attempts, None)
+    
+    async def _call_provider_async(self, ai_id: str, prompt: str, task_type: str,
+                                   options: Optional[CallOptions] = None) -> AIResponse:
+        """Run a provider call through the cache and single-flight group"""
+        role = PROVIDERS[ai_id]['role']
+        options = options or CallOptions()
+        
+        if not self._is_active(ai_id):
+            return self._inactive_response(ai_id, role)
+        
+        prompt, error = self.estimator.fit(ai_id, prompt)
+        if error:
+            return self._error_response(ai_id, role, error, 0)
+        
+        budget_task = options.task_type or task_type
+        learned = options.max_tokens is None
+        if learned:
+            options = replace(options, max_tokens=self.output_budget.max_tokens(ai_id, budget_task))
+        
+        cache_key = self._cache_key(ai_id, prompt, options)
+        if cache_key is not None:
+            cached = await self._offload(self.cache.db_path, self._cache_lookup, ai_id, cache_key)
+            if cached is not None:
+                return cached
+        
+        if self.single_flight is None or options.stop_when is not None:
+            return await self._call_upstream_async(ai_id, prompt, options, cache_key,
+                                                   budget_task, learned)
+        
+        response, shared = await self.single_flight.do(
+            self._request_key(ai_id, prompt, options),
+            lambda: self._call_upstream_async(ai_id, prompt, options, cache_key,
+                                              budget_task, learned),
+            self.rate_limiter.priority(options.priority).rank
+        )
+        return self._coalesced_response(response) if shared else response
+    
+    async def _call_upstream_async(self, ai_id: str, prompt: str, options: CallOptions,
+                                   cache_key: Optional[str],
+                                   budget_task: Optional[str] = None,
+                                   learned: bool = False) -> AIResponse:
+        """Send a provider call through the circuit breaker, rate limiter and hedging"""
+        role = PROVIDERS[ai_id]['role']
+        
+        if not await self._allow_async(ai_id):
+            return self._circuit_open_response(ai_id, role)
+        
+        estimated_tokens = self._estimate_tokens(ai_id, prompt, options.max_tokens)
+        reserved = 0
+        try:
+            await self._acquire_capacity(ai_id, estimated_tokens, options.priority)
+            reserved = estimated_tokens
+            response = await self._send_with_retries_async(ai_id, prompt, estimated_tokens, options)
+            reserved = 0
+            self.rate_limiter.reconcile(ai_id, estimated_tokens, response.tokens_used)
+            if learned:
+                response = await self._grow_truncated_async(ai_id, prompt, options, response)
+        except RateLimitTimeout as e:
+            self.breakers.release(ai_id)
+            return self._error_response(ai_id, role, str(e), 0)
+        except asyncio.CancelledError:
+            # Give back the half-open probe slot and the tokens of the abandoned call
+            self.breakers.release(ai_id)
+            self.rate_limiter.reconcile(ai_id, reserved, 0)
+            raise
+        
+        # Breaker state, cache entries and periodic output-budget saves may hit SQLite
+        blocking = self.breakers.db_path or cache_key is not None or self.output_budget.db_path
+        await self._offload(blocking, self._record_call, response, budget_task, cache_key)
+        return response
+    
+    async def _offload(self, blocking: bool, fn: Callable, *args):
+        """Run bookkeeping that may write SQLite on the default executor, inline if memory-only"""
+        if not blocking:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+    
+    async def _allow_async(self, ai_id: str) -> bool:
+        """Ask the circuit breaker off the event loop; a cancelled caller gives its admission back"""
+        if not self.breakers.db_path:
+            return self.breakers.allow(ai_id)
+        
+        admission = asyncio.get_running_loop().run_in_executor(None, self.breakers.allow, ai_id)
+        try:
+            return await asyncio.shield(admission)
+        except asyncio.CancelledError:
+            def release(future):
+                if not future.cancelled() and future.exception() is None and future.result():
+                    self.breakers.release(ai_id)
+            admission.add_done_callback(release)
+            raise
+    
+    async def _send_with_retries_async(self, ai_id: str, prompt: str, estimated_tokens: int,
+                                       options: CallOptions) -> AIResponse:
+        """Send (hedged if requested), retrying transient failures without blocking the loop"""
+        start = time.monotonic()
+        attempt = 0
+        delay = 0.0
+        
+        while True:
+            attempt += 1
+            if options.hedge and self.hedging.enabled:
+                response = await self._send_hedged_async(ai_id, prompt, estimated_tokens, options)
+            else:
+                response = await self._send_async(ai_id, prompt, options)
+            if response.success:
+                break
+            
+            delay = self.retries.plan_retry(ai_id, attempt, delay, response.status_code,
+                                            response.retry_after_s, options.deadline)
+            if delay is None:
+                break
+            self.rate_limiter.reconcile(ai_id, estimated_tokens, 0)
+            try:
+                await asyncio.sleep(delay)
+                await self._acquire_capacity(ai_id, estimated_tokens, options.priority)
+            except (RateLimitTimeout, asyncio.CancelledError) as e:
+                # Nothing is held during the backoff; offset the caller's refund
+                self.rate_limiter.reconcile(ai_id, 0, estimated_tokens)
+                if isinstance(e, RateLimitTimeout):
+                    break
+                raise
+        
+        return self._retried_response(response, attempt, start)
+    
+    async def _grow_truncated_async(self, ai_id: str, prompt: str, options: CallOptions,
+                                    response: AIResponse) -> AIResponse:
+        """Resend a completion cut off at a learned max_tokens with a larger budget"""
+        while self._should_grow(response, options):
+            options = replace(options, max_tokens=self.output_budget.grow(ai_id, options.max_tokens))
+            estimated_tokens = self._estimate_tokens(ai_id, prompt, options.max_tokens)
+            try:
+                await self._acquire_capacity(ai_id, estimated_tokens, options.priority)
+            except RateLimitTimeout:
+                break
+            
+            try:
+                retry = await self._send_with_retries_async(ai_id, prompt, estimated_tokens, options)
+            except asyncio.CancelledError:
+                self.rate_limiter.reconcile(ai_id, estimated_tokens, 0)
+                raise
+            self.rate_limiter.reconcile(ai_id, estimated_tokens, retry.tokens_used)
+            if not retry.success:
+                break
+            response = self._merge_truncated(response, retry)
+        return response
+    
+    async def _acquire_capacity(self, ai_id: str, tokens: int, priority: Optional[str] = None):
+        """Wait on the rate limiter without blocking the event loop"""
+        start = time.monotonic()
+        max_wait = self.rate_limiter.priority(priority).max_wait
+        if max_wait is None:
+            max_wait = self.rate_limit_max_wait
+        
+        while True:
+            wait = self.rate_limiter.try_acquire(ai_id, tokens, priority)
+            if wait <= 0:
+                break
+            if time.monotonic() - start + wait > max_wait:
+                raise RateLimitTimeout(
+                    f"{ai_id} rate limit: no capacity within {max_wait:.0f}s"
+                )
+            await asyncio.sleep(wait)
+        
+        self.rate_limiter.record_async_wait(ai_id, time.monotonic() - start, priority)
+    
+    async def _send_hedged_async(self, ai_id: str, prompt: str, estimated_tokens: int,
+                                 options: Optional[CallOptions] = None) -> AIResponse:
+        """Hedged send; unlike the blocking path, the losing request is cancelled"""
+        self.hedging.count('eligible_calls')
+        self.hedging.budget.deposit()
+        threshold_s = self.hedging.threshold_ms(ai_id) / 1000
+        
+        primary = asyncio.ensure_future(self._send_async(ai_id, prompt, options))
+        done, _ = await asyncio.wait({primary}, timeout=threshold_s)
+        if done:
+            return primary.result()
+        
+        if not self.hedging.budget.try_spend():
+            self.hedging.count('budget_denied')
+            return await primary
+        if self.rate_limiter.try_acquire(ai_id, estimated_tokens, options.priority if options else None) > 0:
+            return await primary
+        
+        self.hedging.count('hedges')
+        hedge = asyncio.ensure_future(self._send_async(ai_id, prompt, options))
+        pending = {primary, hedge}
+        winner = None
+        
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    winner = task
+                    response = task.result()
+                    if response.success:
+                        if task is hedge:
+                            self.hedging.count('hedge_wins')
+                        response.hedged = True
+                        return response
+            return response
+        finally:
+            for task in pending:
+                task.cancel()
+            # The caller settles one reservation against the answer; the duplicate's goes with the loser
+            loser = primary if winner is hedge else hedge
+            used = loser.result().tokens_used if loser.done() and not loser.cancelled() else 0
+            self.rate_limiter.reconcile(ai_id, estimated_tokens, used)
+    
+    async def _send_async(self, ai_id: str, prompt: str,
+                          options: Optional[CallOptions] = None) -> AIResponse:
+        """Send a non-blocking request to a provider and wrap the result"""
+        max_tokens = options.max_tokens if options is not None else None
+        if options is not None and options.stream:
+            return await self._send_streaming_async(ai_id, prompt, options.stop_when, max_tokens)
+        
+        role = PROVIDERS[ai_id]['role']
+        request = self._build_request(ai_id, prompt, max_tokens=max_tokens)
+        start_time = datetime.now()
+        
+        try:
+            async with self._get_session().post(
+                request['url'],
+                headers=request['headers'],
+                json=request['json'],
+                timeout=aiohttp.ClientTimeout(total=request['timeout'])
+            ) as response:
+                if response.ok:
+                    data = await response.json(content_type=None)
+                    latency = (datetime.now() - start_time).total_seconds() * 1000
+                    content, tokens, cost, cached = self._parse_response(ai_id, data)
+                    return self._completed_response(ai_id, data, content, tokens, cost, latency, cached)
+                
+                latency = (datetime.now() - start_time).total_seconds() * 1000
+                return self._error_response(ai_id, role,
+                                            f"API error: {response.status}", latency,
+                                            response.status, parse_retry_after(response.headers))
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            latency = (datetime.now() - start_time).total_seconds() * 1000
+            return self._error_response(ai_id, role, str(e) or type(e).__name__, latency)
+    
+    async def _send_streaming_async(self, ai_id: str, prompt: str,
+                                    stop_when: Optional[Callable[[str], bool]] = None,
+                                    max_tokens: Optional[int] = None) -> AIResponse:
+        """Stream a provider response without blocking the event loop"""
+        spec = PROVIDERS[ai_id]
+        request = self._build_request(ai_id, prompt, stream=True, max_tokens=max_tokens)
+        start_time = datetime.now()
+        ttft = None
+        stopped_early = False
+        
+        try:
+            async with self._get_session().post(
+                request['url'],
+                headers=request['headers'],
+                json=request['json'],
+                timeout=aiohttp.ClientTimeout(total=request['timeout'])
+            ) as response:
+                if not response.ok:
+                    latency = (datetime.now() - start_time).total_seconds() * 1000
+                    return self._error_response(ai_id, spec['role'],
+                                                f"API error: {response.status}", latency,
+                                                response.status, parse_retry_after(response.headers))
+                
+                stream = StreamAccumulator(spec['api'])
+                async for line in response.content:
+                    for event in iter_sse_events((line,)):
+                        if stream.feed(event) and ttft is None:
+                            ttft = (datetime.now() - start_time).total_seconds() * 1000
+                    if ttft is not None and stop_when is not None and stop_when(stream.text):
+                        stopped_early = True
+                        response.close()  # Drop the connection so generation stops
+                        break
+            
+            latency = (datetime.now() - start_time).total_seconds() * 1000
+            return self._stream_response(ai_id, prompt, stream, latency, ttft, stopped_early)
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            latency = (datetime.now() - start_time).total_seconds() * 1000
+            return self._error_response(ai_id, spec['role'], str(e) or type(e).__name__, latency)
+    
+    # ================================
+    # AGGREGATION & CONSENSUS
+    # ================================
+    
+    async def generate_plan(self, task: str, description: str,
+                            include_research: bool = True,
+                            latency_critical: bool = False,
+                            deadline_s: Optional[float] = None,
+                            quorum: Optional[int] = None,
+                            task_type: Optional[str] = None,
+                            cascade: Optional[bool] = None,
+                            priority: Optional[str] = None) -> AggregatedPlan:
+        """
+        Generate an aggregated plan with all model calls in flight at once
+        
+        Args:
+            task: Task name
+            description: Detailed task description
+            include_research: Whether to include Gemini research
+            latency_critical: Hedge slow model calls with a duplicate request
+            deadline_s: Return the best partial plan after this many seconds
+            quorum: Return as soon as this many models answered successfully
+            task_type: Route to the models that best serve this task type
+            cascade: Answer the planner consultation cheap model first
+            priority: Rate-limiter class of the plan's calls
+        
+        Returns:
+            AggregatedPlan with consensus from multiple AIs; stragglers are
+            cancelled and listed in `pending`
+        """
+        print(f"\n🧠 ARCHON AI POOL (async): Generating Plan for {task}")
+        
+        if deadline_s is None:
+            deadline_s = self.pool_settings.get('plan_deadline_seconds')
+        if quorum is None:
+            quorum = self.pool_settings.get('plan_quorum')
+        deadline = time.monotonic() + deadline_s if deadline_s else None
+        if cascade is None:
+            cascade = self.cascade.enabled
+        
+        consultations = self._plan_consultations(task, description, include_research)
+        # Breaker states come from SQLite when shared across processes
+        consultations = await self._offload(self.breakers.db_path, self._route_consultations,
+                                            consultations, task_type)
+        options = CallOptions(hedge=latency_critical, priority=priority, deadline=deadline,
+                              task_type=task_type)
+        tasks = [
+            asyncio.ensure_future(self._consultation_caller(ai_id, cascade)(prompt, options=options))
+            for ai_id, _, prompt in consultations
+        ]
+        
+        pending = set(tasks)
+        finished = []
+        try:
+            while pending and not self._cut_off(finished, deadline, quorum):
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                finished.extend(t.result() for t in done)
+        finally:
+            for t in pending:
+                t.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        responses = [t.result() for t in tasks if t not in pending]
+        for response in responses:
+            self._report_response(response)
+        
+        answered = {r.ai_id for r in responses}
+        cut_off = [ai_id for ai_id, _, _ in consultations if ai_id not in answered]
+        
+        return self._aggregate_plan(task, description, responses, cut_off)
+    
+    async def request_optimization(self, telemetry_summary: Dict) -> AIResponse:
+        """Request meta-optimization from GPT-5 without blocking the loop"""
+        return await self.call_gpt5(self._optimization_prompt(telemetry_summary),
+                                    task_type="optimization",
+                                    options=CallOptions(priority="background"))
+
+
+# ================================
+# MAIN EXECUTION
+# ================================
+
+async def main():
+    """Test Async AI Pool Manager"""
+    async with AsyncAIPoolManager() as pool:
+        print(f"Active Models: {pool.get_active_models()}")
+        
+        plans = await asyncio.gather(
+            pool.generate_plan("deploy_dashboard_update",
+                               "Deploy a new dashboard component", include_research=False),
+            pool.generate_plan("update_telemetry_api",
+                               "Add latency percentiles to the telemetry API", include_research=False)
+        )
+        
+        for plan in plans:
+            print(f"\n📄 Plan JSON:\n{pool.export_plan_json(plan)}")
+        
+        print(f"\n📊 Session Usage: {json.dumps(pool.get_session_usage(), indent=2)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
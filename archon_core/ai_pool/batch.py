@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Provider Batch Jobs
+Version: 2.5.1
+Purpose: Offline bulk submission of AI pool requests at batch pricing
+
+This module:
+1. Submits many requests as one OpenAI Batch or Anthropic Message Batch job
+2. Polls jobs until the provider has processed them
+3. Downloads and parses results back into per-request response bodies
+"""
+
+import json
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class BatchError(Exception):
+    """Raised when a provider rejects or fails a batch job"""
+    pass
+
+
+# Results per custom_id: (response body, error message)
+BatchResults = Dict[str, Tuple[Optional[Dict[str, Any]], Optional[str]]]
+
+
+class OpenAIBatchClient:
+    """
+    OpenAI Batch API client (also used for OpenAI-compatible providers)
+    
+    Requests are uploaded as a JSONL file, processed within the completion
+    window, and the output file is downloaded when the batch completes.
+    """
+    
+    def __init__(self, http, provider: str, api_key: str, endpoint: str,
+                 completion_window: str = "24h"):
+        self.http = http
+        self.provider = provider
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+        self.base_url, self.request_path = self._split_endpoint(endpoint)
+        self.completion_window = completion_window
+    
+    @staticmethod
+    def _split_endpoint(endpoint: str) -> Tuple[str, str]:
+        """https://host/v1/chat/completions -> (https://host/v1, /v1/chat/completions)"""
+        index = endpoint.find('/v1/')
+        if index < 0:
+            raise BatchError(f"Cannot derive batch API base from {endpoint}")
+        host = endpoint[:index]
+        return f"{host}/v1", endpoint[len(host):]
+    
+    def submit(self, bodies: Dict[str, Dict[str, Any]]) -> str:
+        """Upload the request file and create the batch; returns the batch id"""
+        lines = "\n".join(
+            json.dumps({"custom_id": custom_id, "method": "POST",
+                        "url": self.request_path, "body": body})
+            for custom_id, body in bodies.items()
+        )
+        
+        upload = self.http.post(
+            self.provider, f"{self.base_url}/files",
+            headers=self.headers,
+            data={"purpose": "batch"},
+            files={"file": ("archon_batch.jsonl", lines.encode(), "application/jsonl")},
+            timeout=120
+        )
+        if not upload.ok:
+            raise BatchError(f"Batch file upload failed: {upload.status_code}")
+        
+        batch = self.http.post(
+            self.provider, f"{self.base_url}/batches",
+            headers=self.headers,
+            json={"input_file_id": upload.json()["id"],
+                  "endpoint": self.request_path,
+                  "completion_window": self.completion_window},
+            timeout=60
+        )
+        if not batch.ok:
+            raise BatchError(f"Batch creation failed: {batch.status_code}")
+        return batch.json()["id"]
+    
+    def poll(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get the batch object once it has finished, else None"""
+        response = self.http.get(self.provider, f"{self.base_url}/batches/{batch_id}",
+                                 headers=self.headers, timeout=60)
+        if not response.ok:
+            raise BatchError(f"Batch status failed: {response.status_code}")
+        
+        batch = response.json()
+        if batch.get("status") in ("completed", "failed", "expired", "cancelled"):
+            return batch
+        return None
+    
+    def results(self, batch: Dict[str, Any]) -> BatchResults:
+        """Download the output (and error) files of a finished batch"""
+        if batch.get("status") != "completed" and not batch.get("output_file_id"):
+            raise BatchError(f"Batch {batch.get('id')} {batch.get('status')}")
+        
+        results: BatchResults = {}
+        for file_key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(file_key)
+            if not file_id:
+                continue
+            response = self.http.get(self.provider, f"{self.base_url}/files/{file_id}/content",
+                                     headers=self.headers, timeout=120)
+            if not response.ok:
+                raise BatchError(f"Batch result download failed: {response.status_code}")
+            
+            for line in response.text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                reply = entry.get("response") or {}
+                if reply.get("status_code") == 200:
+                    results[entry["custom_id"]] = (reply.get("body"), None)
+                else:
+                    error = entry.get("error") or {}
+                    results[entry["custom_id"]] = (
+                        None, error.get("message") or f"API error: {reply.get('status_code')}"
+                    )
+        return results
+
+
+class AnthropicBatchClient:
+    """Anthropic Message Batches API client"""
+    
+    def __init__(self, http, provider: str, api_key: str, endpoint: str):
+        self.http = http
+        self.provider = provider
+        self.headers = {
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01",
+            "Content-Type": "application/json"
+        }
+        self.batches_url = f"{endpoint.rstrip('/')}/batches"
+    
+    def submit(self, bodies: Dict[str, Dict[str, Any]]) -> str:
+        """Create the message batch; returns the batch id"""
+        response = self.http.post(
+            self.provider, self.batches_url,
+            headers=self.headers,
+            json={"requests": [{"custom_id": custom_id, "params": body}
+                               for custom_id, body in bodies.items()]},
+            timeout=120
+        )
+        if not response.ok:
+            raise BatchError(f"Batch creation failed: {response.status_code}")
+        return response.json()["id"]
+    
+    def poll(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get the batch object once processing has ended, else None"""
+        response = self.http.get(self.provider, f"{self.batches_url}/{batch_id}",
+                                 headers=self.headers, timeout=60)
+        if not response.ok:
+            raise BatchError(f"Batch status failed: {response.status_code}")
+        
+        batch = response.json()
+        return batch if batch.get("processing_status") == "ended" else None
+    
+    def results(self, batch: Dict[str, Any]) -> BatchResults:
+        """Download the JSONL results of an ended batch"""
+        results_url = batch.get("results_url") or f"{self.batches_url}/{batch['id']}/results"
+        response = self.http.get(self.provider, results_url, headers=self.headers, timeout=120)
+        if not response.ok:
+            raise BatchError(f"Batch result download failed: {response.status_code}")
+        
+        results: BatchResults = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            result = entry.get("result") or {}
+            if result.get("type") == "succeeded":
+                results[entry["custom_id"]] = (result.get("message"), None)
+            else:
+                error = (result.get("error") or {}).get("error") or result.get("error") or {}
+                results[entry["custom_id"]] = (
+                    None, error.get("message") or f"Batch request {result.get('type', 'failed')}"
+                )
+        return results
+
+
+def wait_for_batches(jobs: List[Tuple[Any, str]], poll_interval: float,
+                     max_wait: float) -> Dict[str, Any]:
+    """
+    Poll submitted batch jobs until all have finished
+    
+    Args:
+        jobs: (client, batch_id) pairs
+        poll_interval: Seconds between polling rounds
+        max_wait: Give up on unfinished jobs after this many seconds
+    
+    Returns:
+        Results (or BatchError) per batch id; unfinished jobs are left out
+    """
+    outcomes: Dict[str, Any] = {}
+    pending = list(jobs)
+    start = time.monotonic()
+    
+    while pending:
+        still_pending = []
+        for client, batch_id in pending:
+            try:
+                batch = client.poll(batch_id)
+                if batch is None:
+                    still_pending.append((client, batch_id))
+                else:
+                    outcomes[batch_id] = client.results(batch)
+            except BatchError as e:
+                outcomes[batch_id] = e
+            except Exception:
+                still_pending.append((client, batch_id))  # Transient network error; poll again
+        
+        pending = still_pending
+        if not pending or time.monotonic() - start + poll_interval > max_wait:
+            break
+        time.sleep(poll_interval)
+    
+    return outcomes
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - AI Pool Load Benchmark
+Version: 2.5.1
+Purpose: Measure plan throughput, latency and cost against mock providers
+
+This module:
+1. Starts the mock provider server with the profiles in benchmark.mock_providers
+2. Builds an AI pool whose endpoints and telemetry point at the mock and a scratch directory
+3. Drives generate_plan at a target concurrency (threads or AsyncAIPoolManager)
+4. Reports throughput, p50/p95/p99 plan latency and cost per plan
+"""
+
+import asyncio
+import contextlib
+import copy
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+try:
+    from .pool_manager import AIPoolManager, PROVIDERS
+    from .mock_provider import MockProviderServer
+except ImportError:
+    from pool_manager import AIPoolManager, PROVIDERS
+    from mock_provider import MockProviderServer
+
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(__file__), "../config/decision_pool.yaml")
+
+# SQLite files the pool writes, moved to the scratch directory
+_STORAGE_PATHS = ((('telemetry',), 'storage', 'memory_store.sqlite'),
+                  (('pool_settings', 'circuit_breaker'), 'path', 'memory_store.sqlite'),
+                  (('pool_settings', 'cache'), 'path', 'response_cache.sqlite'))
+
+
+@dataclass
+class PlanSample:
+    """Outcome of one benchmarked plan"""
+    latency_ms: float
+    cost_usd: float
+    tokens: int
+    succeeded: bool        # Every consulted model answered
+    failed_calls: int
+    retries: int
+    error: Optional[str] = None
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 without samples)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct * len(ordered))) - 1))]
+
+
+def benchmark_config(base_url: str, workdir: str, rate_limits: bool = False,
+                     config_path: str = DEFAULT_CONFIG) -> str:
+    """
+    Write a decision_pool.yaml pointing every model at the mock server
+    
+    Endpoint paths are kept so the mock can tell the provider APIs apart;
+    memory_store.sqlite and the other telemetry files go to `workdir` so a
+    run never touches real routing, breaker or budget history.
+    
+    Returns:
+        Absolute path of the written config
+    """
+    with open(config_path) as f:
+        config = copy.deepcopy(yaml.safe_load(f) or {})
+    
+    ai_pool = config.setdefault('ai_pool', {})
+    for ai_id, spec in PROVIDERS.items():
+        model = ai_pool[ai_id] = ai_pool.get(ai_id) or {}
+        model['endpoint'] = base_url + urlsplit(model.get('endpoint', spec['endpoint'])).path
+    
+    for sections, key, default in _STORAGE_PATHS:
+        section = config
+        for name in sections:
+            if not section.get(name):
+                section[name] = {}
+            section = section[name]
+        section[key] = os.path.join(workdir, os.path.basename(section.get(key) or default))
+    config.setdefault('pool_settings', {}).setdefault('rate_limiting', {})['enabled'] = rate_limits
+    
+    path = os.path.join(workdir, "decision_pool.yaml")
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    return path
+
+
+class PoolBenchmark:
+    """
+    ARCHON Pool Benchmark
+    Runs generate_plan at a fixed concurrency and summarises the samples
+    """
+    
+    def __init__(self, pool: AIPoolManager, plans: int = 50, concurrency: int = 8,
+                 plan_options: Optional[Dict[str, Any]] = None):
+        self.pool = pool
+        self.plans = plans
+        self.concurrency = concurrency
+        self.plan_options = plan_options or {}
+    
+    def _plan_args(self, index: int) -> Dict[str, Any]:
+        # Distinct tasks, so the response cache and single-flight cannot serve them
+        return {'task': f"benchmark_plan_{index}",
+                'description': f"Benchmark plan {index}: deploy a dashboard component with live metrics",
+                **self.plan_options}
+    
+    def _sample(self, plan, start: float) -> PlanSample:
+        return PlanSample(
+            latency_ms=(time.perf_counter() - start) * 1000,
+            cost_usd=sum(r.cost_usd for r in plan.responses),
+            tokens=sum(r.tokens_used for r in plan.responses),
+            succeeded=not plan.pending and all(r.success for r in plan.responses),
+            failed_calls=sum(1 for r in plan.responses if not r.success) + len(plan.pending),
+            retries=sum(r.retries + r.budget_retries for r in plan.responses)
+        )
+    
+    def _failed_sample(self, error: Exception, start: float) -> PlanSample:
+        return PlanSample(latency_ms=(time.perf_counter() - start) * 1000, cost_usd=0.0, tokens=0,
+                          succeeded=False, failed_calls=0, retries=0, error=str(error))
+    
+    def _timed_plan(self, index: int) -> PlanSample:
+        start = time.perf_counter()
+        try:
+            return self._sample(self.pool.generate_plan(**self._plan_args(index)), start)
+        except Exception as e:
+            return self._failed_sample(e, start)
+    
+    async def _timed_plan_async(self, index: int, slots: asyncio.Semaphore) -> PlanSample:
+        async with slots:
+            start = time.perf_counter()
+            try:
+                return self._sample(await self.pool.generate_plan(**self._plan_args(index)), start)
+            except Exception as e:
+                return self._failed_sample(e, start)
+    
+    def run(self) -> Dict[str, Any]:
+        """Run the plans on `concurrency` threads"""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="archon-bench") as executor:
+            samples = list(executor.map(self._timed_plan, range(self.plans)))
+        return self.report(samples, time.perf_counter() - start, 'threads')
+    
+    async def run_async(self) -> Dict[str, Any]:
+        """Run the plans on the event loop, `concurrency` at a time (AsyncAIPoolManager)"""
+        slots = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        samples = await asyncio.gather(*(self._timed_plan_async(i, slots) for i in range(self.plans)))
+        return self.report(list(samples), time.perf_counter() - start, 'async')
+    
+    def report(self, samples: List[PlanSample], duration_s: float, mode: str) -> Dict[str, Any]:
+        """Summarise plan samples"""
+        latencies = [s.latency_ms for s in samples]
+        total_cost = sum(s.cost_usd for s in samples)
+        errors = [s.error for s in samples if s.error]
+        return {
+            'mode': mode,
+            'plans': len(samples),
+            'concurrency': self.concurrency,
+            'duration_s': round(duration_s, 3),
+            'throughput_plans_per_s': round(len(samples) / duration_s, 3) if duration_s else 0.0,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50), 1),
+                'p95': round(percentile(latencies, 0.95), 1),
+                'p99': round(percentile(latencies, 0.99), 1),
+                'mean': round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+                'max': round(max(latencies, default=0.0), 1)
+            },
+            'cost_per_plan_usd': round(total_cost / len(samples), 6) if samples else 0.0,
+            'total_cost_usd': round(total_cost, 6),
+            'tokens_per_plan': round(sum(s.tokens for s in samples) / len(samples), 1) if samples else 0.0,
+            'successful_plans': sum(1 for s in samples if s.succeeded),
+            'failed_calls': sum(s.failed_calls for s in samples),
+            'retries': sum(s.retries for s in samples),
+            'errors': errors[:10]
+        }
+
+
+def run_benchmark(settings: Optional[Dict[str, Any]] = None, use_async: bool = False,
+                  workdir: Optional[str] = None, quiet: bool = True,
+                  config_path: str = DEFAULT_CONFIG) -> Dict[str, Any]:
+    """
+    Start the mock providers, run the benchmark and stop everything again
+    
+    Args:
+        settings: benchmark section of decision_pool.yaml (read from config_path if omitted)
+        use_async: Drive AsyncAIPoolManager instead of the threaded pool
+        workdir: Where the scratch config and telemetry go (temporary if omitted)
+        quiet: Silence the pool's per-plan console output
+        config_path: decision_pool.yaml to derive the benchmark pool from
+    
+    Returns:
+        The benchmark report, with the mock providers' request counts
+    """
+    if settings is None:
+        with open(config_path) as f:
+            settings = (yaml.safe_load(f) or {}).get('benchmark', {})
+    
+    with MockProviderServer(settings.get('mock_providers'), seed=settings.get('seed')) as mock, \
+            tempfile.TemporaryDirectory(prefix="archon-bench-") as scratch:
+        pool_config = benchmark_config(mock.base_url, workdir or scratch,
+                                       settings.get('rate_limits', False), config_path)
+        output = io.StringIO() if quiet else sys.stdout
+        
+        with contextlib.redirect_stdout(output):
+            if use_async:
+                report = asyncio.run(_run_async_pool(pool_config, settings))
+            else:
+                pool = AIPoolManager(pool_config)
+                try:
+                    report = _benchmark(pool, settings).run()
+                finally:
+                    pool.close()
+        
+        report['mock_providers'] = mock.get_stats()
+    return report
+
+
+def _benchmark(pool: AIPoolManager, settings: Dict[str, Any]) -> PoolBenchmark:
+    return PoolBenchmark(pool, settings.get('plans', 50), settings.get('concurrency', 8),
+                         settings.get('plan_options'))
+
+
+async def _run_async_pool(pool_config: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        from .async_pool_manager import AsyncAIPoolManager
+    except ImportError:
+        from async_pool_manager import AsyncAIPoolManager
+    
+    async with AsyncAIPoolManager(pool_config) as pool:
+        return await _benchmark(pool, settings).run_async()
+
+
+# ================================
+# MAIN EXECUTION
+# ================================
+
+def main() -> int:
+    """Run the benchmark from the command line; non-zero exit if a budget is exceeded"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="ARCHON AI pool load benchmark (mock providers)")
+    parser.add_argument("--plans", type=int, help="Plans to generate")
+    parser.add_argument("--concurrency", type=int, help="Plans in flight at once")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Drive AsyncAIPoolManager instead of the threaded pool")
+    parser.add_argument("--rate-limits", action="store_true", help="Enforce ai_pool rate limits")
+    parser.add_argument("--seed", type=int, help="Mock provider random seed")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="decision_pool.yaml to benchmark")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if plan p95 latency exceeds this")
+    parser.add_argument("--max-cost-per-plan", type=float, help="Fail if cost per plan exceeds this (USD)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON only")
+    args = parser.parse_args()
+    
+    with open(args.config) as f:
+        settings = dict((yaml.safe_load(f) or {}).get('benchmark', {}))
+    for key in ('plans', 'concurrency', 'seed'):
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    if args.rate_limits:
+        settings['rate_limits'] = True
+    
+    report = run_benchmark(settings, use_async=args.use_async, config_path=args.config)
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        latency = report['latency_ms']
+        print(f"⏱️  ARCHON pool benchmark ({report['mode']}): {report['plans']} plans, "
+              f"concurrency {report['concurrency']}")
+        print(f"   Throughput: {report['throughput_plans_per_s']:.2f} plans/s "
+              f"({report['duration_s']:.1f}s)")
+        print(f"   Latency: p50 {latency['p50']:.0f}ms, p95 {latency['p95']:.0f}ms, "
+              f"p99 {latency['p99']:.0f}ms")
+        print(f"   Cost per plan: ${report['cost_per_plan_usd']:.4f} "
+              f"({report['tokens_per_plan']:.0f} tokens)")
+        print(f"   Successful plans: {report['successful_plans']}/{report['plans']}, "
+              f"failed calls: {report['failed_calls']}, retries: {report['retries']}")
+    
+    failures = []
+    if args.max_p95_ms is not None and report['latency_ms']['p95'] > args.max_p95_ms:
+        failures.append(f"p95 {report['latency_ms']['p95']:.0f}ms > {args.max_p95_ms:.0f}ms")
+    if args.max_cost_per_plan is not None and report['cost_per_plan_usd'] > args.max_cost_per_plan:
+        failures.append(f"cost per plan ${report['cost_per_plan_usd']:.4f} > ${args.max_cost_per_plan:.4f}")
+    for failure in failures:
+        print(f"❌ Budget exceeded: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
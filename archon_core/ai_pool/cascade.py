@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Cheap-First Planner Cascade
+Version: 2.5.1
+Purpose: Answer planning requests with the cheapest model that is confident enough
+
+This module:
+1. Asks every cascade tier for the same structured JSON plan
+2. Checks answers for malformed JSON, missing steps and a low self-reported score
+3. Escalates to the next (larger) tier only when a check fails
+"""
+
+import json
+import re
+import threading
+from typing import Dict, Any, List, Optional
+
+
+# Appended to the planner prompt so every tier answers in a checkable format
+CASCADE_PLAN_FORMAT = """
+
+Respond with a single JSON object:
+{"steps": ["..."], "estimated_tokens": 0, "estimated_cost_usd": 0.0, "risks": ["..."],
+ "success_criteria": ["..."], "confidence": 0.0}
+where confidence (0-1) is how sure you are that the plan is complete and correct."""
+
+_NUMBERED_LINE = re.compile(r'^\s*(?:\d+[.)]|[-*])\s+\S', re.MULTILINE)
+_CONFIDENCE = re.compile(r'confidence\W{0,4}(\d+(?:\.\d+)?)\s*(%?)', re.IGNORECASE)
+
+
+def extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """First top-level JSON object in a reply (code fences and prose allowed)"""
+    start = text.find('{')
+    end = text.rfind('}')
+    if start < 0 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _normalise_score(value: float, percent: bool = False) -> float:
+    """Map 0-1, 0-10 and 0-100 scores onto 0-1"""
+    if percent or value > 10:
+        return value / 100
+    if value > 1:
+        return value / 10
+    return value
+
+
+class PlanCascade:
+    """
+    ARCHON Planner Cascade
+    Confidence checks and escalation counters for cascade mode
+    """
+    
+    def __init__(self, settings: Dict[str, Any]):
+        self.enabled = settings.get('enabled', False)
+        self.tiers: List[str] = settings.get('tiers', ['gemini', 'gpt4o'])
+        self.allow_manual = settings.get('allow_manual', False)  # Manual-only models as tiers
+        self.require_json = settings.get('require_json', True)
+        self.min_steps = settings.get('min_steps', 3)
+        self.min_confidence = settings.get('min_confidence', 0.7)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Any] = {'plans': 0, 'escalations': 0, 'exhausted': 0}
+        self.answered_by: Dict[str, int] = {}
+    
+    def assess(self, content: str) -> List[str]:
+        """
+        Check a plan answer
+        
+        Returns:
+            Reasons the answer is not confident enough (empty if it passes)
+        """
+        reasons = []
+        data = extract_json(content)
+        if data is None and self.require_json:
+            reasons.append("malformed JSON")
+        
+        if data is not None and isinstance(data.get('steps'), list):
+            steps = len([s for s in data['steps'] if s])
+        else:
+            steps = len(_NUMBERED_LINE.findall(content))
+        if steps < self.min_steps:
+            reasons.append(f"missing steps ({steps} < {self.min_steps})")
+        
+        score = None
+        if data is not None and isinstance(data.get('confidence'), (int, float)):
+            score = _normalise_score(float(data['confidence']))
+        elif data is None:
+            match = _CONFIDENCE.search(content)
+            if match:
+                score = _normalise_score(float(match.group(1)), bool(match.group(2)))
+        if score is None:
+            reasons.append("no confidence score")
+        elif score < self.min_confidence:
+            reasons.append(f"low confidence ({score:.2f})")
+        
+        return reasons
+    
+    def record(self, answered_by: Optional[str], escalations: int):
+        """Count a finished cascade"""
+        with self._lock:
+            self.stats['plans'] += 1
+            self.stats['escalations'] += escalations
+            if answered_by is None:
+                self.stats['exhausted'] += 1
+            else:
+                self.answered_by[answered_by] = self.answered_by.get(answered_by, 0) + 1
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get cascade counters and plans answered per tier"""
+        with self._lock:
+            result = {'all': dict(self.stats)}
+            for ai_id, answered in self.answered_by.items():
+                result[ai_id] = {'answered': answered}
+            return result
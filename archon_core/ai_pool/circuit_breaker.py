@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Provider Circuit Breaker
+Version: 2.5.1
+Purpose: Stop waiting on AI providers that are down or degraded
+
+This module:
+1. Tracks recent call outcomes and latency per model
+2. Opens a model's circuit when its error or slow-call rate is too high
+3. Lets a limited number of half-open probes through after a cool-down
+4. Persists breaker state to SQLite so short-lived CLI runs share it
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict, Any, Optional
+
+try:
+    from ..storage.sqlite_storage import get_storage
+    from ..storage.migrations import migrate
+except ImportError:
+    from storage.sqlite_storage import get_storage
+    from storage.migrations import migrate
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderCircuit:
+    """Circuit state and outcome window for one model"""
+    
+    def __init__(self):
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.outcomes: deque = deque()  # (timestamp, success, slow)
+        self.probes_in_flight = 0
+        self.probe_started_at = 0.0
+        self.stats = {'calls': 0, 'failures': 0, 'slow_calls': 0,
+                      'rejected': 0, 'opened': 0, 'closed': 0}
+
+
+class CircuitBreaker:
+    """
+    ARCHON Circuit Breaker
+    Closed / open / half-open breaker keyed by AI model id
+    """
+    
+    def __init__(self, settings: Dict[str, Any], db_path: Optional[str] = None):
+        self.enabled = settings.get('enabled', True)
+        self.window_seconds = settings.get('window_seconds', 120)
+        self.min_calls = settings.get('min_calls', 5)
+        self.failure_rate = settings.get('failure_rate', 0.5)
+        self.slow_call_ms = settings.get('slow_call_ms', 30000)
+        self.slow_call_rate = settings.get('slow_call_rate', 0.8)
+        self.open_seconds = settings.get('open_seconds', 60)
+        self.half_open_probes = settings.get('half_open_probes', 1)
+        self.probe_timeout_seconds = settings.get('probe_timeout_seconds', 180)
+        self.db_path = db_path
+        self._circuits: Dict[str, ProviderCircuit] = {}
+        self._lock = threading.Lock()
+        
+        if self.db_path:
+            self.storage = get_storage(self.db_path)
+            self._init_database()
+    
+    def _init_database(self):
+        """Initialize the shared breaker state table"""
+        try:
+            migrate(self.storage)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not initialize circuit breaker state: {e}")
+            self.db_path = None
+    
+    def allow(self, ai_id: str) -> bool:
+        """
+        Check whether a call to the model may be sent
+        
+        Open circuits reject calls until open_seconds have passed, then turn
+        half-open and admit up to half_open_probes trial calls.
+        """
+        if not self.enabled:
+            return True
+        
+        with self._lock:
+            circuit = self._load(ai_id)
+            now = time.time()
+            
+            if circuit.state == OPEN:
+                if now - circuit.opened_at < self.open_seconds:
+                    circuit.stats['rejected'] += 1
+                    return False
+                circuit.state = HALF_OPEN
+                circuit.probes_in_flight = 0
+            
+            if circuit.state == HALF_OPEN:
+                # A probe that never reported back (e.g. cancelled) frees its slot
+                if circuit.probes_in_flight and now - circuit.probe_started_at > self.probe_timeout_seconds:
+                    circuit.probes_in_flight = 0
+                if circuit.probes_in_flight >= self.half_open_probes:
+                    circuit.stats['rejected'] += 1
+                    return False
+                circuit.probes_in_flight += 1
+                circuit.probe_started_at = now
+            
+            return True
+    
+    def record(self, ai_id: str, success: bool, latency_ms: float):
+        """
+        Record a call outcome and open or close the circuit accordingly
+        
+        With shared state the load, update and save run in one BEGIN IMMEDIATE
+        transaction, so processes recording at once never drop each other's outcomes.
+        """
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            try:
+                with self.storage.transaction() if self.db_path else nullcontext():
+                    self._record(ai_id, success, latency_ms)
+            except sqlite3.Error as e:
+                print(f"Warning: Could not update circuit breaker state: {e}")
+    
+    def _record(self, ai_id: str, success: bool, latency_ms: float):
+        """Load, update and save a circuit for one outcome (lock held)"""
+        circuit = self._load(ai_id)
+        now = time.time()
+        slow = latency_ms >= self.slow_call_ms
+        
+        circuit.stats['calls'] += 1
+        circuit.stats['failures'] += not success
+        circuit.stats['slow_calls'] += slow
+        
+        if circuit.state == HALF_OPEN:
+            circuit.probes_in_flight = max(0, circuit.probes_in_flight - 1)
+            if success and not slow:
+                self._transition(circuit, CLOSED, now)
+            else:
+                self._transition(circuit, OPEN, now)
+        elif circuit.state == CLOSED:
+            circuit.outcomes.append((now, success, slow))
+            self._trim(circuit, now)
+            if self._should_open(circuit):
+                self._transition(circuit, OPEN, now)
+        
+        self._save(ai_id, circuit, now)
+    
+    def release(self, ai_id: str):
+        """Give back an admitted call that was never sent (or was cancelled)"""
+        with self._lock:
+            circuit = self._circuits.get(ai_id)
+            if circuit is not None and circuit.state == HALF_OPEN:
+                circuit.probes_in_flight = max(0, circuit.probes_in_flight - 1)
+    
+    def state(self, ai_id: str) -> str:
+        """Get the current state of a model's circuit"""
+        with self._lock:
+            circuit = self._load(ai_id)
+            if circuit.state == OPEN and time.time() - circuit.opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return circuit.state
+    
+    def retry_after(self, ai_id: str) -> float:
+        """Seconds until an open circuit admits a probe"""
+        with self._lock:
+            circuit = self._circuits.get(ai_id)
+            if circuit is None or circuit.state != OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.time() - circuit.opened_at))
+    
+    def _should_open(self, circuit: ProviderCircuit) -> bool:
+        """Error or slow-call rate over the window exceeds its threshold"""
+        total = len(circuit.outcomes)
+        if total < self.min_calls:
+            return False
+        failures = sum(1 for _, success, _ in circuit.outcomes if not success)
+        slow = sum(1 for _, _, is_slow in circuit.outcomes if is_slow)
+        return failures / total >= self.failure_rate or slow / total >= self.slow_call_rate
+    
+    def _transition(self, circuit: ProviderCircuit, state: str, now: float):
+        """Move a circuit to a new state (lock held)"""
+        circuit.state = state
+        circuit.outcomes.clear()
+        circuit.probes_in_flight = 0
+        if state == OPEN:
+            circuit.opened_at = now
+            circuit.stats['opened'] += 1
+        else:
+            circuit.stats['closed'] += 1
+    
+    def _trim(self, circuit: ProviderCircuit, now: float):
+        """Drop outcomes older than the window (lock held)"""
+        while circuit.outcomes and now - circuit.outcomes[0][0] > self.window_seconds:
+            circuit.outcomes.popleft()
+    
+    # ================================
+    # SHARED STATE
+    # ================================
+    
+    def _load(self, ai_id: str) -> ProviderCircuit:
+        """Get a circuit, refreshed from the shared table (lock held)"""
+        circuit = self._circuits.get(ai_id)
+        if circuit is None:
+            circuit = self._circuits[ai_id] = ProviderCircuit()
+        
+        if not self.db_path:
+            return circuit
+        
+        try:
+            row = self.storage.query_one(
+                "SELECT state, opened_at, outcomes FROM circuit_breakers WHERE ai_id = ?",
+                (ai_id,)
+            )
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read circuit breaker state: {e}")
+            return circuit
+        
+        if row:
+            state, opened_at, outcomes = row
+            # Half-open is local: each process probes an expired open circuit itself
+            if not (state == OPEN and circuit.state == HALF_OPEN and opened_at == circuit.opened_at):
+                if opened_at != circuit.opened_at:
+                    circuit.probes_in_flight = 0
+                circuit.state = state
+                circuit.opened_at = opened_at
+            circuit.outcomes = deque(tuple(o) for o in json.loads(outcomes))
+            self._trim(circuit, time.time())
+        
+        return circuit
+    
+    def _save(self, ai_id: str, circuit: ProviderCircuit, now: float):
+        """Write a circuit to the shared table (lock held)"""
+        if not self.db_path:
+            return
+        
+        try:
+            self.storage.execute("""
+                INSERT OR REPLACE INTO circuit_breakers (ai_id, state, opened_at, outcomes, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (ai_id, circuit.state, circuit.opened_at,
+                  json.dumps(list(circuit.outcomes)), now))
+        except sqlite3.Error as e:
+            print(f"Warning: Could not persist circuit breaker state: {e}")
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get state and counters per model"""
+        with self._lock:
+            now = time.time()
+            result = {}
+            for ai_id, circuit in self._circuits.items():
+                entry = dict(circuit.stats)
+                entry['state'] = circuit.state
+                entry['is_open'] = int(circuit.state == OPEN)
+                entry['window_calls'] = len(circuit.outcomes)
+                if circuit.state == OPEN:
+                    entry['retry_after_s'] = round(
+                        max(0.0, self.open_seconds - (now - circuit.opened_at)), 2)
+                result[ai_id] = entry
+            return result
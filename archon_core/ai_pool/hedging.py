@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Hedged Request Support
+Version: 2.5.1
+Purpose: Bound AI pool tail latency with duplicate (hedged) requests
+
+This module:
+1. Tracks rolling per-model latency, seeded from the ai_performance table
+2. Derives an adaptive hedge threshold from the rolling p90
+3. Limits how many hedges may be sent with an earned budget
+"""
+
+import os
+import sqlite3
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+try:
+    from ..storage.sqlite_storage import get_storage
+except ImportError:
+    from storage.sqlite_storage import get_storage
+
+
+class LatencyTracker:
+    """Rolling latency window per model"""
+    
+    def __init__(self, window: int = 200, db_path: Optional[str] = None):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        
+        if db_path:
+            self._seed_from_db(db_path)
+    
+    def _seed_from_db(self, db_path: str):
+        """Load recent per-model latencies recorded in ai_performance"""
+        if not os.path.exists(db_path):
+            return
+        
+        try:
+            rows = get_storage(db_path).query("""
+                SELECT ai_id, avg_latency_ms
+                FROM ai_performance
+                WHERE avg_latency_ms > 0
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (self.window * 5,))
+        except sqlite3.Error:
+            return  # No ai_performance history yet
+        
+        # Oldest first so the newest samples stay in the window
+        for ai_id, latency_ms in reversed(rows):
+            self.record(ai_id, latency_ms)
+    
+    def record(self, ai_id: str, latency_ms: float):
+        """Add a successful call latency"""
+        with self._lock:
+            samples = self._samples.get(ai_id)
+            if samples is None:
+                samples = self._samples[ai_id] = deque(maxlen=self.window)
+            samples.append(latency_ms)
+    
+    def percentile(self, ai_id: str, pct: float) -> Optional[float]:
+        """Get a latency percentile (nearest rank), or None without samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(ai_id, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(pct * len(samples))) - 1))
+        return samples[index]
+    
+    def count(self, ai_id: str) -> int:
+        with self._lock:
+            return len(self._samples.get(ai_id, ()))
+
+
+class HedgeBudget:
+    """
+    Earned hedge budget
+    
+    Every hedge-eligible call deposits `ratio` credits and each hedge spends
+    one, so hedges stay below roughly ratio x calls (plus a small burst).
+    """
+    
+    def __init__(self, ratio: float = 0.10, burst: float = 1.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.credits = burst
+        self._lock = threading.Lock()
+    
+    def deposit(self):
+        with self._lock:
+            self.credits = min(self.burst, self.credits + self.ratio)
+    
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.credits >= 1.0:
+                self.credits -= 1.0
+                return True
+            return False
+
+
+class HedgePolicy:
+    """Adaptive hedge threshold and budget for the AI pool"""
+    
+    def __init__(self, settings: Dict[str, Any], db_path: Optional[str] = None):
+        self.enabled = settings.get('enabled', True)
+        self.percentile = settings.get('percentile', 0.90)
+        self.min_samples = settings.get('min_samples', 20)
+        self.default_threshold_ms = settings.get('default_threshold_ms', 15000)
+        self.min_threshold_ms = settings.get('min_threshold_ms', 500)
+        self.latency = LatencyTracker(settings.get('window', 200), db_path)
+        self.budget = HedgeBudget(settings.get('budget_ratio', 0.10),
+                                  settings.get('budget_burst', 2.0))
+        self.max_abandoned = settings.get('max_abandoned', 4)
+        self.abandoned = 0  # Losing blocking requests still running
+        self._lock = threading.Lock()
+        self.stats = {'eligible_calls': 0, 'hedges': 0, 'hedge_wins': 0, 'budget_denied': 0,
+                      'abandon_denied': 0}
+    
+    def threshold_ms(self, ai_id: str) -> float:
+        """Delay before a hedge is sent: rolling p90, or the default until warmed up"""
+        if self.latency.count(ai_id) < self.min_samples:
+            return self.default_threshold_ms
+        return max(self.min_threshold_ms, self.latency.percentile(ai_id, self.percentile))
+    
+    def may_abandon(self) -> bool:
+        """Whether a blocking hedge may leave one more losing request running"""
+        with self._lock:
+            return self.abandoned < self.max_abandoned
+    
+    def track_abandoned(self, delta: int):
+        with self._lock:
+            self.abandoned += delta
+    
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'abandoned': self.abandoned}
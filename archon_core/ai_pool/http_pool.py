@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Provider HTTP Session Pool
+Version: 2.5.1
+Purpose: Keep-alive connection pools shared by every AI provider caller
+
+This module:
+1. Holds one requests.Session per provider with a sized connection pool
+2. Reuses TCP/TLS connections across AIPoolManager and GPT5Optimizer calls
+3. Counts connection reuse and handshake time for telemetry
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class ConnectionStats:
+    """Thread-safe connection reuse counters per provider"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+    
+    def _entry(self, provider: str) -> Dict[str, float]:
+        return self._stats.setdefault(provider, {
+            'requests': 0,
+            'new_connections': 0,
+            'handshake_ms_total': 0.0
+        })
+    
+    def record_request(self, provider: str):
+        """Count a request sent through the provider pool"""
+        with self._lock:
+            self._entry(provider)['requests'] += 1
+    
+    def record_connect(self, provider: str, handshake_ms: float):
+        """Count a new connection and its DNS/TCP/TLS setup time"""
+        with self._lock:
+            entry = self._entry(provider)
+            entry['new_connections'] += 1
+            entry['handshake_ms_total'] += handshake_ms
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Get per-provider stats with derived reuse figures"""
+        with self._lock:
+            result = {}
+            for provider, entry in self._stats.items():
+                requests_sent = entry['requests']
+                new_connections = entry['new_connections']
+                reused = max(0, requests_sent - new_connections)
+                result[provider] = {
+                    'requests': requests_sent,
+                    'reuse_hits': reused,
+                    'new_connections': new_connections,
+                    'reuse_rate': reused / requests_sent if requests_sent else 0.0,
+                    'handshake_ms_total': round(entry['handshake_ms_total'], 2),
+                    'avg_handshake_ms': round(entry['handshake_ms_total'] / new_connections, 2)
+                    if new_connections else 0.0
+                }
+            return result
+
+
+def _timed_pool_class(base: type, provider: str, stats: ConnectionStats) -> type:
+    """Build a urllib3 pool class that times connection setup"""
+    
+    class TimedConnectionPool(base):
+        def _new_conn(self):
+            conn = super()._new_conn()
+            connect = conn.connect
+            
+            def timed_connect():
+                start = time.perf_counter()
+                connect()
+                stats.record_connect(provider, (time.perf_counter() - start) * 1000)
+            
+            conn.connect = timed_connect
+            return conn
+    
+    return TimedConnectionPool
+
+
+class ProviderAdapter(HTTPAdapter):
+    """HTTPAdapter that reports connection reuse for one provider"""
+    
+    def __init__(self, provider: str, stats: ConnectionStats, **kwargs):
+        self.provider = provider
+        self.stats = stats
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _timed_pool_class(HTTPConnectionPool, self.provider, self.stats),
+            'https': _timed_pool_class(HTTPSConnectionPool, self.provider, self.stats)
+        }
+    
+    def send(self, request, **kwargs):
+        self.stats.record_request(self.provider)
+        return super().send(request, **kwargs)
+
+
+class ProviderSessionPool:
+    """
+    ARCHON Provider Session Pool
+    One keep-alive session per provider (openai, anthropic, google, deepseek)
+    """
+    
+    def __init__(self, pool_size: int = 10, block: bool = False,
+                 provider_sizes: Optional[Dict[str, int]] = None):
+        self.pool_size = pool_size
+        self.block = block
+        self.provider_sizes = provider_sizes or {}
+        self.stats = ConnectionStats()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+    
+    def session(self, provider: str) -> requests.Session:
+        """Get (or create) the pooled session for a provider"""
+        with self._lock:
+            session = self._sessions.get(provider)
+            if session is None:
+                size = self.provider_sizes.get(provider, self.pool_size)
+                adapter = ProviderAdapter(
+                    provider, self.stats,
+                    pool_connections=4,
+                    pool_maxsize=size,
+                    pool_block=self.block
+                )
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[provider] = session
+            return session
+    
+    def post(self, provider: str, url: str, **kwargs) -> requests.Response:
+        """POST through the provider's pooled session"""
+        return self.session(provider).post(url, **kwargs)
+    
+    def get(self, provider: str, url: str, **kwargs) -> requests.Response:
+        """GET through the provider's pooled session"""
+        return self.session(provider).get(url, **kwargs)
+    
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get connection reuse statistics per provider"""
+        return self.stats.snapshot()
+    
+    def close(self):
+        """Close all provider sessions"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# Process-wide pool shared by AIPoolManager and GPT5Optimizer
+_shared_pool: Optional[ProviderSessionPool] = None
+_shared_lock = threading.Lock()
+
+
+def get_session_pool(settings: Optional[Dict[str, Any]] = None) -> ProviderSessionPool:
+    """
+    Get the process-wide provider session pool
+    
+    Args:
+        settings: pool_settings.connection_pool from decision_pool.yaml;
+                  only applied by the first caller that creates the pool
+    """
+    global _shared_pool
+    
+    with _shared_lock:
+        if _shared_pool is None:
+            settings = settings or {}
+            _shared_pool = ProviderSessionPool(
+                pool_size=settings.get('pool_size', 10),
+                block=settings.get('block', False),
+                provider_sizes=settings.get('providers', {})
+            )
+        return _shared_pool
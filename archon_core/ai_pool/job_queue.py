@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Plan Job Queue
+Version: 2.5.1
+Purpose: Persistent SQLite queue of plan requests for the AI pool worker
+
+This module:
+1. Lets the supervisor and production line enqueue plan requests
+2. Lets workers atomically claim queued jobs under a lease
+3. Stores plan results (or errors) for callers to collect
+4. Re-queues jobs whose worker died mid-plan; live workers renew their leases
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+try:
+    from ..storage.sqlite_storage import get_storage
+    from ..storage.migrations import migrate
+except ImportError:
+    from storage.sqlite_storage import get_storage
+    from storage.migrations import migrate
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+COLLECTED = "collected"  # Done and handed to the supervisor
+
+
+class PlanJobQueue:
+    """
+    ARCHON Plan Job Queue
+    SQLite-backed job table shared by producers and pool workers
+    """
+    
+    def __init__(self, db_path: str, max_attempts: int = 2, lease_seconds: float = 600):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.storage = get_storage(db_path)
+        self._init_database()
+    
+    def _init_database(self):
+        """Initialize the job table"""
+        migrate(self.storage)
+    
+    def enqueue(self, task: str, description: str, **options) -> str:
+        """
+        Queue a plan request
+        
+        Args:
+            task: Task name
+            description: Detailed task description
+            **options: Further AIPoolManager.generate_plan keyword arguments
+        
+        Returns:
+            Job id
+        """
+        job_id = f"job-{uuid.uuid4().hex[:12]}"
+        payload = {'task': task, 'description': description, **options}
+        self.storage.execute(
+            "INSERT INTO plan_jobs (id, status, payload, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(payload), datetime.now(timezone.utc).isoformat())
+        )
+        return job_id
+    
+    def claim(self, worker: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Atomically take up to `limit` queued jobs, oldest first
+        
+        Returns:
+            Claimed jobs as dicts with id, payload and attempts
+        """
+        if limit <= 0:
+            return []
+        
+        with self.storage.transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, payload, attempts FROM plan_jobs WHERE status = ? ORDER BY created_at LIMIT ?",
+                (QUEUED, limit)
+            ).fetchall()
+            now = time.time()
+            conn.executemany(
+                "UPDATE plan_jobs SET status = ?, worker = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(RUNNING, worker, now, job_id) for job_id, _, _ in rows]
+            )
+        
+        return [{'id': job_id, 'payload': json.loads(payload), 'attempts': attempts + 1}
+                for job_id, payload, attempts in rows]
+    
+    def complete(self, job_id: str, worker: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a finished plan
+        
+        Returns:
+            False if the worker no longer holds the job (its lease expired)
+        """
+        return self._finish(job_id, worker, DONE, result=json.dumps(result))
+    
+    def fail(self, job_id: str, worker: str, error: str, attempts: int) -> bool:
+        """Record a failed attempt; the job is re-queued until max_attempts"""
+        if attempts < self.max_attempts:
+            return self.storage.execute(
+                "UPDATE plan_jobs SET status = ?, worker = NULL, started_at = NULL, error = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (QUEUED, error, job_id, worker, RUNNING)
+            ).rowcount > 0
+        return self._finish(job_id, worker, FAILED, error=error)
+    
+    def _finish(self, job_id: str, worker: str, status: str, result: Optional[str] = None,
+                error: Optional[str] = None) -> bool:
+        # Only the lease holder may finish a job; a re-queued one belongs to its new worker
+        return self.storage.execute(
+            "UPDATE plan_jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (status, result, error, datetime.now(timezone.utc).isoformat(), job_id, worker, RUNNING)
+        ).rowcount > 0
+    
+    def renew(self, worker: str, job_ids: List[str]) -> int:
+        """Extend the leases of a worker's running jobs (heartbeat)"""
+        if not job_ids:
+            return 0
+        return self.storage.executemany(
+            "UPDATE plan_jobs SET started_at = ? WHERE id = ? AND worker = ? AND status = ?",
+            [(time.time(), job_id, worker, RUNNING) for job_id in job_ids]
+        ).rowcount
+    
+    def take_results(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Atomically hand over finished plans that have not been collected yet"""
+        with self.storage.transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, payload, result FROM plan_jobs WHERE status = ? ORDER BY finished_at LIMIT ?",
+                (DONE, limit)
+            ).fetchall()
+            conn.executemany("UPDATE plan_jobs SET status = ? WHERE id = ?",
+                             [(COLLECTED, job_id) for job_id, _, _ in rows])
+        
+        return [{'id': job_id, 'payload': json.loads(payload), 'result': json.loads(result)}
+                for job_id, payload, result in rows]
+    
+    def requeue_expired(self) -> int:
+        """
+        Put running jobs whose lease expired (worker died) back in the queue
+        
+        Jobs that already used max_attempts fail instead of running again.
+        
+        Returns:
+            Number of re-queued jobs
+        """
+        expired_before = time.time() - self.lease_seconds
+        with self.storage.transaction() as conn:
+            failed = conn.execute(
+                "UPDATE plan_jobs SET status = ?, error = ?, finished_at = ? "
+                "WHERE status = ? AND started_at < ? AND attempts >= ?",
+                (FAILED, "Lease expired on the last attempt", datetime.now(timezone.utc).isoformat(),
+                 RUNNING, expired_before, self.max_attempts)
+            ).rowcount
+            requeued = conn.execute(
+                "UPDATE plan_jobs SET status = ?, worker = NULL, started_at = NULL WHERE status = ? AND started_at < ?",
+                (QUEUED, RUNNING, expired_before)
+            ).rowcount
+        
+        if failed:
+            print(f"Warning: {failed} plan job(s) failed after their lease expired on the last attempt")
+        return requeued
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job with its status and result"""
+        cursor = self.storage.connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        row = cursor.execute("SELECT * FROM plan_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+    
+    def wait(self, job_id: str, timeout: float, poll_interval: float = 0.5) -> Optional[Dict[str, Any]]:
+        """Poll until a job is done or failed; returns None on timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is not None and job['status'] in (DONE, FAILED, COLLECTED):
+                return job
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+    
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        rows = self.storage.query("SELECT status, COUNT(*) FROM plan_jobs GROUP BY status")
+        return {status: count for status, count in rows}
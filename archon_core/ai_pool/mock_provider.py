@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Mock Provider Server
+Version: 2.5.1
+Purpose: Local stand-in for the OpenAI, Anthropic, Gemini and DeepSeek APIs
+
+This module:
+1. Serves the chat endpoints used by pool_manager.py (plain and SSE streaming)
+2. Draws response latency from a fixed, uniform or lognormal distribution
+3. Injects provider errors (429 with Retry-After, 5xx) at a configured rate
+4. Reports realistic token usage, including max_tokens truncation
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+
+
+# z-score of the 99th percentile, for fitting a lognormal to (median, p99)
+_Z99 = 2.326
+
+PROVIDER_NAMES = ('openai', 'anthropic', 'gemini', 'deepseek')
+
+
+@dataclass
+class ProviderProfile:
+    """Simulated behaviour of one provider"""
+    latency: str = "lognormal"        # fixed, uniform or lognormal
+    latency_ms: float = 800.0         # Fixed value, or lognormal median
+    latency_p99_ms: float = 4000.0    # Lognormal tail
+    latency_min_ms: float = 200.0     # Uniform bounds
+    latency_max_ms: float = 2000.0
+    error_rate: float = 0.0           # Fraction of requests answered with an error
+    error_statuses: Tuple[int, ...] = (429, 500, 503)
+    retry_after_seconds: Optional[float] = 1.0  # Sent with 429 answers
+    completion_tokens: int = 600      # Mean completion length
+    completion_tokens_stddev: int = 200
+    
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> 'ProviderProfile':
+        defaults = cls()
+        return cls(
+            latency=settings.get('latency', defaults.latency),
+            latency_ms=settings.get('latency_ms', defaults.latency_ms),
+            latency_p99_ms=settings.get('latency_p99_ms', defaults.latency_p99_ms),
+            latency_min_ms=settings.get('latency_min_ms', defaults.latency_min_ms),
+            latency_max_ms=settings.get('latency_max_ms', defaults.latency_max_ms),
+            error_rate=settings.get('error_rate', defaults.error_rate),
+            error_statuses=tuple(settings.get('error_statuses', defaults.error_statuses)),
+            retry_after_seconds=settings.get('retry_after_seconds', defaults.retry_after_seconds),
+            completion_tokens=settings.get('completion_tokens', defaults.completion_tokens),
+            completion_tokens_stddev=settings.get('completion_tokens_stddev',
+                                                  defaults.completion_tokens_stddev)
+        )
+    
+    def sample_latency(self, rng: random.Random) -> float:
+        """Response time of one request in seconds"""
+        if self.latency == 'fixed':
+            latency_ms = self.latency_ms
+        elif self.latency == 'uniform':
+            latency_ms = rng.uniform(self.latency_min_ms, self.latency_max_ms)
+        else:
+            sigma = max(0.0, math.log(max(self.latency_p99_ms, self.latency_ms) / self.latency_ms)) / _Z99
+            latency_ms = rng.lognormvariate(math.log(self.latency_ms), sigma)
+        return max(0.0, latency_ms) / 1000
+    
+    def sample_completion(self, rng: random.Random) -> int:
+        """Completion length of one answer before max_tokens is applied"""
+        return max(1, int(round(rng.gauss(self.completion_tokens, self.completion_tokens_stddev))))
+
+
+def _provider_for(path: str, body: Dict[str, Any]) -> Optional[str]:
+    """Which provider API a request path belongs to"""
+    if path.endswith('/messages'):
+        return 'anthropic'
+    if ':generateContent' in path or ':streamGenerateContent' in path:
+        return 'gemini'
+    if path.endswith('/chat/completions'):
+        return 'deepseek' if str(body.get('model', '')).startswith('deepseek') else 'openai'
+    return None
+
+
+def _plan_text(tokens: int) -> str:
+    """Plan-shaped answer of roughly `tokens` tokens (about four characters each)"""
+    plan = json.dumps({
+        "steps": [f"Mock step {i + 1}" for i in range(5)],
+        "estimated_tokens": tokens,
+        "estimated_cost_usd": 0.0,
+        "risks": ["Mock risk"],
+        "success_criteria": ["Mock criterion"],
+        "confidence": 0.9
+    })
+    filler = max(0, tokens * 4 - len(plan))
+    return plan + (" lorem" * (filler // 6 + 1))[:filler]
+
+
+class _MockProviderHandler(BaseHTTPRequestHandler):
+    """Answers one request in the format of the provider its path belongs to"""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            body = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            return self._send_error(400, {})
+        
+        provider = _provider_for(self.path.split('?')[0], body)
+        if provider is None:
+            return self._send_error(404, {})
+        
+        stream = bool(body.get('stream')) or ':streamGenerateContent' in self.path
+        max_tokens = body.get('max_tokens') or body.get('generationConfig', {}).get('maxOutputTokens')
+        outcome = self.server.mock.draw(provider, len(raw) // 4, max_tokens, stream)
+        
+        if outcome['status'] != 200:
+            time.sleep(outcome['latency'])
+            headers = {}
+            if outcome['status'] == 429 and outcome['retry_after'] is not None:
+                headers['Retry-After'] = str(outcome['retry_after'])
+            return self._send_error(outcome['status'], headers)
+        
+        if stream:
+            return self._stream(provider, outcome, body)
+        time.sleep(outcome['latency'])
+        self._send_json(self._body(provider, outcome))
+    
+    def _body(self, provider: str, outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """Non-streaming response body"""
+        text = _plan_text(outcome['completion_tokens'])
+        prompt_tokens, completion_tokens = outcome['prompt_tokens'], outcome['completion_tokens']
+        truncated = outcome['truncated']
+        
+        if provider == 'anthropic':
+            return {"content": [{"type": "text", "text": text}],
+                    "stop_reason": "max_tokens" if truncated else "end_turn",
+                    "usage": {"input_tokens": prompt_tokens, "output_tokens": completion_tokens}}
+        if provider == 'gemini':
+            return {"candidates": [{"content": {"parts": [{"text": text}]},
+                                    "finishReason": "MAX_TOKENS" if truncated else "STOP"}],
+                    "usageMetadata": {"promptTokenCount": prompt_tokens,
+                                      "candidatesTokenCount": completion_tokens,
+                                      "totalTokenCount": prompt_tokens + completion_tokens}}
+        return {"choices": [{"message": {"role": "assistant", "content": text},
+                             "finish_reason": "length" if truncated else "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens}}
+    
+    def _stream(self, provider: str, outcome: Dict[str, Any], body: Dict[str, Any]):
+        """SSE response: the latency is spread over the chunks of the answer"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        text = _plan_text(outcome['completion_tokens'])
+        size = max(1, len(text) // 8)
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        pause = outcome['latency'] / len(chunks)
+        prompt_tokens, completion_tokens = outcome['prompt_tokens'], outcome['completion_tokens']
+        truncated = outcome['truncated']
+        
+        if provider == 'anthropic':
+            events = [{"type": "message_start", "message": {"usage": {"input_tokens": prompt_tokens}}}]
+            events += [{"type": "content_block_delta", "delta": {"type": "text_delta", "text": chunk}}
+                       for chunk in chunks]
+            events += [{"type": "message_delta",
+                        "delta": {"stop_reason": "max_tokens" if truncated else "end_turn"},
+                        "usage": {"output_tokens": completion_tokens}},
+                       {"type": "message_stop"}]
+        elif provider == 'gemini':
+            events = [{"candidates": [{"content": {"parts": [{"text": chunk}]}}]} for chunk in chunks]
+            events[-1]["candidates"][0]["finishReason"] = "MAX_TOKENS" if truncated else "STOP"
+            events[-1]["usageMetadata"] = {"promptTokenCount": prompt_tokens,
+                                           "candidatesTokenCount": completion_tokens,
+                                           "totalTokenCount": prompt_tokens + completion_tokens}
+        else:
+            events = [{"choices": [{"delta": {"content": chunk}}]} for chunk in chunks]
+            events.append({"choices": [{"delta": {}, "finish_reason": "length" if truncated else "stop"}]})
+            if body.get('stream_options', {}).get('include_usage'):
+                events.append({"choices": [], "usage": {
+                    "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens}})
+        
+        try:
+            for event in events:
+                if event.get('type') not in ('message_start', 'message_delta', 'message_stop'):
+                    time.sleep(pause)
+                self._send_chunk(f"data: {json.dumps(event)}\n\n".encode())
+            if provider not in ('anthropic', 'gemini'):
+                self._send_chunk(b"data: [DONE]\n\n")
+            self._send_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Client stopped reading early
+    
+    def _send_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+    
+    def _send_json(self, data: Dict[str, Any]):
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _send_error(self, status: int, headers: Dict[str, str]):
+        payload = json.dumps({"error": {"message": f"mock provider error {status}"}}).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, *args):
+        pass
+
+
+class MockProviderServer:
+    """
+    ARCHON Mock Provider Server
+    Threaded HTTP stand-in for the pool's providers with simulated latency and errors
+    
+    Profiles come from benchmark.mock_providers in decision_pool.yaml: a
+    `defaults` block plus overrides per provider (openai, anthropic,
+    gemini, deepseek).
+    """
+    
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, host: str = "127.0.0.1",
+                 port: int = 0, seed: Optional[int] = None):
+        settings = settings or {}
+        defaults = settings.get('defaults') or {}
+        self.profiles: Dict[str, ProviderProfile] = {
+            name: ProviderProfile.from_settings({**defaults, **(settings.get(name) or {})})
+            for name in PROVIDER_NAMES
+        }
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _MockProviderHandler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {name: {'requests': 0, 'errors': 0, 'streamed': 0, 'truncated': 0,
+                              'prompt_tokens': 0, 'completion_tokens': 0}
+                       for name in PROVIDER_NAMES}
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> str:
+        """Serve in a background thread; returns the base URL"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever,
+                                            name="archon-mock-provider", daemon=True)
+            self._thread.start()
+        return self.base_url
+    
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+    
+    def stop(self):
+        """Stop serving and release the port"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+    
+    def __enter__(self) -> 'MockProviderServer':
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def draw(self, provider: str, prompt_tokens: int, max_tokens: Optional[int],
+             stream: bool) -> Dict[str, Any]:
+        """
+        Decide the outcome of one request
+        
+        Returns:
+            Dict with status, latency (seconds), retry_after, prompt_tokens,
+            completion_tokens and truncated
+        """
+        profile = self.profiles[provider]
+        with self._lock:
+            latency = profile.sample_latency(self._rng)
+            failed = self._rng.random() < profile.error_rate
+            status = self._rng.choice(profile.error_statuses) if failed and profile.error_statuses else 200
+            completion = profile.sample_completion(self._rng)
+            truncated = bool(max_tokens) and completion > max_tokens
+            if truncated:
+                completion = max_tokens
+            
+            stats = self._stats[provider]
+            stats['requests'] += 1
+            if status != 200:
+                stats['errors'] += 1
+            else:
+                stats['streamed'] += stream
+                stats['truncated'] += truncated
+                stats['prompt_tokens'] += prompt_tokens
+                stats['completion_tokens'] += completion
+        
+        return {'status': status, 'latency': latency, 'retry_after': profile.retry_after_seconds,
+                'prompt_tokens': max(1, prompt_tokens), 'completion_tokens': completion,
+                'truncated': truncated}
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get requests, injected errors and served tokens per provider"""
+        with self._lock:
+            result = {'all': {key: sum(s[key] for s in self._stats.values())
+                              for key in ('requests', 'errors', 'streamed', 'truncated')}}
+            for name, stats in self._stats.items():
+                if stats['requests']:
+                    result[name] = dict(stats)
+            return result
+
+
+# ================================
+# MAIN EXECUTION
+# ================================
+
+def main():
+    """Run the mock provider server in the foreground"""
+    import argparse
+    import os
+    import yaml
+    
+    parser = argparse.ArgumentParser(description="ARCHON mock provider server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(__file__),
+                                                         "../config/decision_pool.yaml"))
+    args = parser.parse_args()
+    
+    with open(args.config) as f:
+        settings = (yaml.safe_load(f) or {}).get('benchmark', {})
+    
+    server = MockProviderServer(settings.get('mock_providers'), port=args.port, seed=args.seed)
+    print(f"🧪 ARCHON mock providers on {server.base_url} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Served: {json.dumps(server.get_stats(), indent=2)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Self-Tuning Output Budgets
+Version: 2.5.1
+Purpose: Request only as many output tokens as a role and task type need
+
+This module:
+1. Keeps a rolling window of completion lengths per role and task type
+2. Sets max_tokens to a high percentile of that window plus headroom
+3. Grows the budget for a retry when a completion was truncated
+4. Persists the windows next to memory_store.sqlite every save_every
+   completions and on close, so a crash loses little of what was learned
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    from ..storage.sqlite_storage import get_storage
+    from ..storage.migrations import migrate
+except ImportError:
+    from storage.sqlite_storage import get_storage
+    from storage.migrations import migrate
+
+
+# Provider finish reasons meaning "stopped at max_tokens"
+TRUNCATION_REASONS = frozenset({'length', 'max_tokens', 'MAX_TOKENS'})
+
+
+class OutputBudget:
+    """
+    ARCHON Output Budget
+    Learned max_tokens per (role, task type)
+    
+    Until min_samples completions have been seen for a key, calls use the
+    provider's configured max_tokens, which also caps every learned budget.
+    """
+    
+    def __init__(self, settings: Dict[str, Any], providers: Dict[str, Dict[str, Any]],
+                 db_path: Optional[str] = None):
+        self.providers = providers
+        self.enabled = settings.get('enabled', True)
+        self.percentile = settings.get('percentile', 0.95)
+        self.headroom = settings.get('headroom', 0.25)
+        self.min_samples = settings.get('min_samples', 20)
+        self.window = settings.get('window', 200)
+        self.min_tokens = settings.get('min_tokens', 256)
+        self.growth = settings.get('growth', 2.0)
+        self.round_to = settings.get('round_to', 64)
+        self.db_path = db_path if settings.get('persist', True) else None
+        self.save_every = settings.get('save_every', 50)
+        self._samples: Dict[Tuple[str, str], deque] = {}
+        self._unsaved = 0  # Completions recorded since the last save
+        self._lock = threading.Lock()
+        self.stats = {'learned_calls': 0, 'default_calls': 0, 'truncated': 0, 'grown': 0}
+        
+        if self.db_path:
+            self._load()
+    
+    def _key(self, ai_id: str, task_type: Optional[str]) -> Tuple[str, str]:
+        return self.providers[ai_id]['role'], task_type or 'default'
+    
+    def ceiling(self, ai_id: str) -> int:
+        """Configured max_tokens of the model (upper bound of every budget)"""
+        return self.providers[ai_id]['max_tokens']
+    
+    def learned(self, ai_id: str, task_type: Optional[str]) -> Optional[int]:
+        """Percentile-plus-headroom budget, or None until enough completions were seen"""
+        with self._lock:
+            samples = sorted(self._samples.get(self._key(ai_id, task_type), ()))
+        if len(samples) < self.min_samples:
+            return None
+        
+        index = min(len(samples) - 1, max(0, int(round(self.percentile * len(samples))) - 1))
+        budget = samples[index] * (1 + self.headroom)
+        budget = math.ceil(budget / self.round_to) * self.round_to
+        return int(min(self.ceiling(ai_id), max(self.min_tokens, budget)))
+    
+    def max_tokens(self, ai_id: str, task_type: Optional[str]) -> int:
+        """max_tokens to request for a call"""
+        budget = self.learned(ai_id, task_type) if self.enabled else None
+        with self._lock:
+            self.stats['default_calls' if budget is None else 'learned_calls'] += 1
+        return self.ceiling(ai_id) if budget is None else budget
+    
+    def grow(self, ai_id: str, current: int) -> Optional[int]:
+        """
+        Larger budget for retrying a truncated completion
+        
+        Returns:
+            The new max_tokens, or None if the call already used the ceiling
+        """
+        ceiling = self.ceiling(ai_id)
+        if current >= ceiling:
+            return None
+        with self._lock:
+            self.stats['grown'] += 1
+        return min(ceiling, int(current * self.growth))
+    
+    def record(self, ai_id: str, task_type: Optional[str], output_tokens: int, truncated: bool = False):
+        """Add an observed completion length (saves the windows every save_every completions)"""
+        if output_tokens <= 0:
+            return
+        with self._lock:
+            if truncated:
+                self.stats['truncated'] += 1
+            key = self._key(ai_id, task_type)
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(output_tokens)
+            self._unsaved += 1
+            due = bool(self.db_path) and self._unsaved >= self.save_every
+        
+        if due:
+            self.save()
+    
+    def _load(self):
+        """Seed the windows from the output_budget table"""
+        if not os.path.exists(self.db_path):
+            return
+        
+        try:
+            rows = get_storage(self.db_path).query("SELECT role, task_type, samples FROM output_budget")
+        except sqlite3.Error:
+            return  # No saved budgets yet
+        
+        for role, task_type, samples in rows:
+            self._samples[(role, task_type)] = deque(json.loads(samples), maxlen=self.window)
+    
+    def save(self):
+        """Write the windows to the output_budget table"""
+        if not self.db_path:
+            return
+        
+        with self._lock:
+            rows = [(role, task_type, json.dumps(list(samples)), datetime.now(timezone.utc).isoformat())
+                    for (role, task_type), samples in self._samples.items()]
+            self._unsaved = 0
+        if not rows:
+            return
+        
+        try:
+            storage = get_storage(self.db_path)
+            migrate(storage)
+            storage.executemany("INSERT OR REPLACE INTO output_budget VALUES (?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not save output budgets: {e}")
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get budget counters and the current budget per role and task type"""
+        with self._lock:
+            keys = list(self._samples)
+            result = {'all': dict(self.stats)}
+        ai_ids = {spec['role']: ai_id for ai_id, spec in self.providers.items()}
+        for role, task_type in keys:
+            ai_id = ai_ids.get(role)
+            if ai_id is None:
+                continue
+            with self._lock:
+                samples = len(self._samples[(role, task_type)])
+            result[f"{role}:{task_type}"] = {
+                'samples': samples,
+                'max_tokens': self.learned(ai_id, task_type) or self.ceiling(ai_id)
+            }
+        return result
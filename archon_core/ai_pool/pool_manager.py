@@ -6,21 +6,61 @@ Purpose: Manage and coordinate AI decision pool (GPT-4o, Claude, Gemini, DeepSee
 
 This module:
 1. Loads AI configurations from decision_pool.yaml
-2. Routes requests to appropriate AI models
+2. Routes requests to appropriate AI models (concurrent fan-out)
 3. Aggregates responses for Supervisor evaluation
 4. Tracks usage and performance metrics
 """
 
 import json
 import os
+import sys
+import time
 import yaml
-import requests
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import hashlib
 
+# archon_core root, for cross-package imports when run as a script
+ARCHON_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ARCHON_ROOT not in sys.path:
+    sys.path.append(ARCHON_ROOT)
+
+try:
+    from .http_pool import get_session_pool
+    from .response_cache import ResponseCache
+    from .rate_limiter import ProviderRateLimiter, RateLimitTimeout
+    from .hedging import HedgePolicy
+    from .streaming import StreamAccumulator, iter_sse_events
+    from .circuit_breaker import CircuitBreaker
+    from .router import ModelRouter
+    from .single_flight import SingleFlight
+    from .prompt_cache import anthropic_system, prompt_cache_key, cached_tokens
+    from .batch import OpenAIBatchClient, AnthropicBatchClient, BatchError, wait_for_batches
+    from .token_estimator import TokenEstimator
+    from .cascade import PlanCascade, CASCADE_PLAN_FORMAT
+    from .usage_ledger import UsageLedger
+    from .retry import ProviderRetries, parse_retry_after
+    from .output_budget import OutputBudget, TRUNCATION_REASONS
+except ImportError:
+    from http_pool import get_session_pool
+    from response_cache import ResponseCache
+    from rate_limiter import ProviderRateLimiter, RateLimitTimeout
+    from hedging import HedgePolicy
+    from streaming import StreamAccumulator, iter_sse_events
+    from circuit_breaker import CircuitBreaker
+    from router import ModelRouter
+    from single_flight import SingleFlight
+    from prompt_cache import anthropic_system, prompt_cache_key, cached_tokens
+    from batch import OpenAIBatchClient, AnthropicBatchClient, BatchError, wait_for_batches
+    from token_estimator import TokenEstimator
+    from cascade import PlanCascade, CASCADE_PLAN_FORMAT
+    from usage_ledger import UsageLedger
+    from retry import ProviderRetries, parse_retry_after
+    from output_budget import OutputBudget, TRUNCATION_REASONS
+
 
 class AIRole(Enum):
     """AI model roles in the federation"""
@@ -43,6 +83,33 @@ class AIResponse:
     timestamp: str
     success: bool
     error: Optional[str] = None
+    cached: bool = False
+    hedged: bool = False
+    coalesced: bool = False  # Shared another caller's in-flight request
+    ttft_ms: Optional[float] = None  # Time to first token (streaming only)
+    stopped_early: bool = False
+    cached_prompt_tokens: int = 0  # Prompt tokens served from the provider's prefix cache
+    escalations: int = 0  # Cascade tiers tried before this answer
+    cascade_tier: Optional[str] = None  # Model that answered the planner slot (cascade mode)
+    status_code: Optional[int] = None  # HTTP status of a failed call (None if no response)
+    retry_after_s: Optional[float] = None  # Provider-requested pause of a failed call
+    retries: int = 0  # Attempts repeated after transient failures
+    retry_latency_ms: float = 0.0  # Time spent on failed attempts and backoff
+    output_tokens: int = 0  # Completion tokens (reported, or counted locally)
+    truncated: bool = False  # Generation stopped at max_tokens
+    budget_retries: int = 0  # Resends with a larger max_tokens after truncation
+
+
+@dataclass
+class CallOptions:
+    """Per-call behaviour for AI model calls"""
+    hedge: bool = False  # Send a duplicate request if the first is slow
+    stream: bool = False  # Consume the provider SSE stream incrementally
+    stop_when: Optional[Callable[[str], bool]] = None  # Stop streaming once True for the text so far
+    priority: Optional[str] = None  # Rate-limiter class (pool_settings.priorities)
+    deadline: Optional[float] = None  # Plan deadline (time.monotonic()); no retries past it
+    max_tokens: Optional[int] = None  # Fixed output budget (default: learned per role and task type)
+    task_type: Optional[str] = None  # Plan task type; keys the learned output budget
 
 
 @dataclass
@@ -56,6 +123,73 @@ class AggregatedPlan:
     estimated_tokens: int
     risk_level: str
     created_at: str
+    pending: List[str] = field(default_factory=list)  # Models cut off by deadline or quorum
+
+
+# Provider protocol defaults (overridable per model in decision_pool.yaml)
+PROVIDERS: Dict[str, Dict[str, Any]] = {
+    'gpt4o': {
+        'role': 'planner_coder',
+        'api': 'openai',
+        'api_key': 'openai',
+        'endpoint': 'https://api.openai.com/v1/chat/completions',
+        'model': 'gpt-4o',
+        'system': "You are the Chief Planner of ARCHON AI Federation. Create detailed, actionable plans with cost estimates.",
+        'max_tokens': 4096,
+        'temperature': 0.7,
+        'timeout': 60,
+        'cost_per_token': 0.00001  # Approximate cost
+    },
+    'claude': {
+        'role': 'deploy_architect',
+        'api': 'anthropic',
+        'api_key': 'anthropic',
+        'endpoint': 'https://api.anthropic.com/v1/messages',
+        'model': 'claude-sonnet-4-20250514',
+        'system': "You are the Deployment Architect of ARCHON. Design CI/CD pipelines, Dockerfiles, and infrastructure configurations.",
+        'max_tokens': 4096,
+        'temperature': 0.7,
+        'timeout': 60,
+        'cost_per_token': 0.000015
+    },
+    'gemini': {
+        'role': 'research_analyst',
+        'api': 'gemini',
+        'api_key': 'google',
+        'endpoint': 'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent',
+        'model': 'gemini-2.0-flash',
+        'system': None,
+        'max_tokens': 4096,
+        'temperature': 0.7,
+        'timeout': 60,
+        'cost_per_token': 0.000005
+    },
+    'deepseek': {
+        'role': 'performance_analyst',
+        'api': 'openai',
+        'api_key': 'deepseek',
+        'endpoint': 'https://api.deepseek.com/v1/chat/completions',
+        'model': 'deepseek-coder',
+        'system': "You are the Performance Analyst of ARCHON. Analyze code quality, performance metrics, and suggest optimizations.",
+        'max_tokens': 4096,
+        'temperature': 0.3,
+        'timeout': 60,
+        'cost_per_token': 0.000002
+    },
+    'gpt5': {
+        'role': 'meta_strategist',
+        'api': 'openai',
+        'api_key': 'openai',
+        'endpoint': 'https://api.openai.com/v1/chat/completions',
+        'model': 'gpt-5',
+        'system': "You are the Meta Strategist of ARCHON. Analyze system performance and optimize AI model weights for better outcomes. Focus on long-term structural improvements.",
+        'max_tokens': 8192,
+        'temperature': 0.5,
+        'timeout': 120,
+        'cost_per_token': 0.00003,  # GPT-5 is more expensive
+        'manual_only': True
+    }
+}
 
 
 class AIPoolManager:
@@ -68,6 +202,59 @@ class AIPoolManager:
         self.config_path = os.path.join(os.path.dirname(__file__), config_path)
         self.config = self._load_config()
         self.ai_pool = self.config.get('ai_pool', {})
+        self.pool_settings = self.config.get('pool_settings', {})
+        
+        # Keep-alive connection pools shared with GPT5Optimizer
+        self.http = get_session_pool(self.pool_settings.get('connection_pool', {}))
+        
+        # Optional response cache for repeated prompts (retries, self-heal)
+        self.cache = self._init_cache(self.pool_settings.get('cache', {}))
+        
+        # Local token counts and price-table costs, checked before dispatch
+        self.estimator = TokenEstimator(self.ai_pool, PROVIDERS, self.pool_settings.get('preflight', {}))
+        
+        # Token-bucket enforcement of ai_pool.<model>.rate_limit
+        rate_settings = self.pool_settings.get('rate_limiting', {})
+        self.rate_limiter = ProviderRateLimiter(
+            self.ai_pool if rate_settings.get('enabled', True) else {},
+            self.pool_settings.get('priorities')
+        )
+        self.rate_limit_max_wait = rate_settings.get('max_wait_seconds', 30)
+        
+        # Jittered retries of transient failures (429, 5xx), honouring Retry-After
+        self.retries = ProviderRetries(self.pool_settings.get('retry', {}), self.ai_pool, PROVIDERS)
+        
+        # Hedged requests for latency-critical plans (threshold from ai_performance)
+        self.memory_db = os.path.join(
+            ARCHON_ROOT, self.config.get('telemetry', {}).get('storage', 'telemetry/memory_store.sqlite')
+        )
+        self.hedging = HedgePolicy(self.pool_settings.get('hedging', {}), self.memory_db)
+        self._hedge_executor = ThreadPoolExecutor(max_workers=self.pool_settings.get('hedge_workers', 16),
+                                                  thread_name_prefix="archon-hedge")
+        
+        # Per-provider circuit breakers, shared across processes via SQLite
+        self.breakers = self._init_breakers(self.pool_settings.get('circuit_breaker', {}))
+        
+        # Provider-side caching of the fixed system prompt prefixes
+        self.prompt_caching = self.pool_settings.get('prompt_caching', {}).get('enabled', True)
+        
+        # Identical concurrent requests share one provider call
+        self.single_flight = SingleFlight() \
+            if self.pool_settings.get('single_flight', {}).get('enabled', True) else None
+        
+        # max_tokens learned per role and task type from observed completions
+        self.output_budget = OutputBudget(self.pool_settings.get('output_budget', {}), PROVIDERS,
+                                          self.memory_db)
+        
+        # Cheap-first planner cascade with confidence-based escalation
+        self.cascade = PlanCascade(self.pool_settings.get('cascade', {}))
+        
+        # Task-type routing from rolling latency, success rate and cost
+        self.router = ModelRouter(
+            self.pool_settings.get('routing', {}),
+            {ai_id: (cfg or {}).get('trust_weight', 0.0) for ai_id, cfg in self.ai_pool.items()},
+            self.memory_db
+        )
         
         # Load API keys from environment (AWS Secrets Manager in production)
         self.api_keys = {
@@ -77,12 +264,8 @@ class AIPoolManager:
             'deepseek': os.environ.get('DEEPSEEK_API_KEY', '')
         }
         
-        # Usage tracking
-        self.session_usage = {
-            'total_tokens': 0,
-            'total_cost': 0.0,
-            'requests': []
-        }
+        # Bounded usage tracking, batch-written to ai_performance
+        self.usage = UsageLedger(self.pool_settings.get('usage_ledger', {}), self.memory_db)
     
     def _load_config(self) -> Dict:
         """Load configuration from YAML"""
@@ -93,6 +276,30 @@ class AIPoolManager:
             print(f"Warning: Could not load config: {e}")
             return {}
     
+    def _init_cache(self, cache_settings: Dict[str, Any]) -> Optional[ResponseCache]:
+        """Create the response cache if enabled in pool_settings.cache"""
+        if not cache_settings.get('enabled', False):
+            return None
+        
+        db_path = None
+        if cache_settings.get('persistent', True):
+            db_path = os.path.join(ARCHON_ROOT, cache_settings.get('path', 'telemetry/response_cache.sqlite'))
+        
+        return ResponseCache(
+            max_entries=cache_settings.get('max_entries', 512),
+            ttl_seconds=cache_settings.get('ttl_seconds', 3600),
+            db_path=db_path,
+            purge_every=cache_settings.get('purge_every', 1000)
+        )
+    
+    def _init_breakers(self, breaker_settings: Dict[str, Any]) -> CircuitBreaker:
+        """Create the circuit breakers from pool_settings.circuit_breaker"""
+        db_path = None
+        if breaker_settings.get('persistent', True):
+            db_path = os.path.join(ARCHON_ROOT, breaker_settings.get('path', 'telemetry/memory_store.sqlite'))
+        
+        return CircuitBreaker(breaker_settings, db_path)
+    
     def _generate_request_id(self) -> str:
         """Generate unique request ID"""
         timestamp = datetime.now(timezone.utc).isoformat()
@@ -102,302 +309,669 @@ class AIPoolManager:
     # AI MODEL CALLERS
     # ================================
     
-    def call_gpt4o(self, prompt: str, task_type: str = "planning") -> AIResponse:
+    def call_gpt4o(self, prompt: str, task_type: str = "planning",
+                   options: Optional[CallOptions] = None) -> AIResponse:
         """
         Call GPT-4o for task planning and code generation
         Role: Chief Planner & Coder
         """
-        ai_config = self.ai_pool.get('gpt4o', {})
+        return self._call_provider('gpt4o', prompt, task_type, options)
+    
+    def call_claude(self, prompt: str, task_type: str = "deployment",
+                    options: Optional[CallOptions] = None) -> AIResponse:
+        """
+        Call Claude for CI/CD and deployment architecture
+        Role: Deployment Architect
+        """
+        return self._call_provider('claude', prompt, task_type, options)
+    
+    def call_gemini(self, prompt: str, task_type: str = "research",
+                    options: Optional[CallOptions] = None) -> AIResponse:
+        """
+        Call Gemini for web research and insights
+        Role: Research Analyst
+        """
+        return self._call_provider('gemini', prompt, task_type, options)
+    
+    def call_deepseek(self, prompt: str, task_type: str = "analysis",
+                      options: Optional[CallOptions] = None) -> AIResponse:
+        """
+        Call DeepSeek for code analysis and performance metrics
+        Role: Performance Analyst
+        """
+        return self._call_provider('deepseek', prompt, task_type, options)
+    
+    def call_gpt5(self, prompt: str, task_type: str = "strategy",
+                  options: Optional[CallOptions] = None) -> AIResponse:
+        """
+        Call GPT-5 for meta-strategic optimization (manual trigger only)
+        Role: Meta Strategist
+        """
+        return self._call_provider('gpt5', prompt, task_type, options)
+    
+    def call_planner_cascade(self, prompt: str, task_type: str = "planning",
+                             options: Optional[CallOptions] = None) -> AIResponse:
+        """
+        Plan with the cheapest cascade tier whose answer passes the confidence check
+        
+        Tiers (pool_settings.cascade.tiers) are tried in order, escalating
+        on errors, malformed JSON, missing steps or a low self-reported
+        confidence. The returned response stands in for the GPT-4o planner
+        and carries the tokens, cost and latency of every tier tried.
+        """
+        prompt = prompt + CASCADE_PLAN_FORMAT
+        attempts = []
         
-        if not ai_config.get('active', False):
-            return self._inactive_response('gpt4o', 'planner_coder')
+        for ai_id in self._cascade_tiers():
+            response = getattr(self, f"call_{ai_id}")(prompt, task_type, options)
+            attempts.append(response)
+            if self._cascade_accepts(response):
+                return self._cascade_response(attempts, response)
         
-        start_time = datetime.now()
+        return self._cascade_response(attempts, None)
+    
+    def _call_provider(self, ai_id: str, prompt: str, task_type: str,
+                       options: Optional[CallOptions] = None) -> AIResponse:
+        """Run a provider call through the cache and single-flight group"""
+        role = PROVIDERS[ai_id]['role']
+        options = options or CallOptions()
+        
+        if not self._is_active(ai_id):
+            return self._inactive_response(ai_id, role)
+        
+        prompt, error = self.estimator.fit(ai_id, prompt)
+        if error:
+            return self._error_response(ai_id, role, error, 0)
+        
+        budget_task = options.task_type or task_type
+        learned = options.max_tokens is None
+        if learned:
+            options = replace(options, max_tokens=self.output_budget.max_tokens(ai_id, budget_task))
+        
+        cache_key = self._cache_key(ai_id, prompt, options)
+        cached = self._cache_lookup(ai_id, cache_key)
+        if cached is not None:
+            return cached
+        
+        # Early-stop predicates make answers caller-specific; never share them
+        if self.single_flight is None or options.stop_when is not None:
+            return self._call_upstream(ai_id, prompt, options, cache_key, budget_task, learned)
+        
+        response, shared = self.single_flight.do(
+            self._request_key(ai_id, prompt, options),
+            lambda: self._call_upstream(ai_id, prompt, options, cache_key, budget_task, learned),
+            self.rate_limiter.priority(options.priority).rank
+        )
+        return self._coalesced_response(response) if shared else response
+    
+    def _call_upstream(self, ai_id: str, prompt: str, options: CallOptions,
+                       cache_key: Optional[str], budget_task: Optional[str] = None,
+                       learned: bool = False) -> AIResponse:
+        """
+        Send a provider call through the circuit breaker, rate limiter and hedging
+        
+        learned marks an options.max_tokens taken from the output budget,
+        which is grown and resent if the answer comes back truncated.
+        """
+        role = PROVIDERS[ai_id]['role']
         
+        if not self.breakers.allow(ai_id):
+            return self._circuit_open_response(ai_id, role)
+        
+        estimated_tokens = self._estimate_tokens(ai_id, prompt, options.max_tokens)
         try:
-            response = requests.post(
-                ai_config.get('endpoint', 'https://api.openai.com/v1/chat/completions'),
-                headers={
-                    "Authorization": f"Bearer {self.api_keys['openai']}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": ai_config.get('model', 'gpt-4o'),
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are the Chief Planner of ARCHON AI Federation. Create detailed, actionable plans with cost estimates."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    "max_tokens": 4096,
-                    "temperature": 0.7
-                },
-                timeout=60
-            )
-            
-            latency = (datetime.now() - start_time).total_seconds() * 1000
-            
-            if response.ok:
-                data = response.json()
-                content = data['choices'][0]['message']['content']
-                tokens = data.get('usage', {}).get('total_tokens', 0)
-                cost = tokens * 0.00001  # Approximate cost
-                
-                return AIResponse(
-                    ai_id='gpt4o',
-                    role='planner_coder',
-                    content=content,
-                    tokens_used=tokens,
-                    latency_ms=latency,
-                    cost_usd=cost,
-                    timestamp=datetime.now(timezone.utc).isoformat(),
-                    success=True
-                )
-            else:
-                return self._error_response('gpt4o', 'planner_coder', 
-                                           f"API error: {response.status_code}", latency)
-                
-        except Exception as e:
-            latency = (datetime.now() - start_time).total_seconds() * 1000
-            return self._error_response('gpt4o', 'planner_coder', str(e), latency)
+            self.rate_limiter.acquire(ai_id, estimated_tokens, self.rate_limit_max_wait, options.priority)
+        except RateLimitTimeout as e:
+            self.breakers.release(ai_id)
+            return self._error_response(ai_id, role, str(e), 0)
+        
+        response = self._send_with_retries(ai_id, prompt, estimated_tokens, options)
+        self.rate_limiter.reconcile(ai_id, estimated_tokens, response.tokens_used)
+        if learned:
+            response = self._grow_truncated(ai_id, prompt, options, response)
+        self._record_call(response, budget_task, cache_key)
+        return response
     
-    def call_claude(self, prompt: str, task_type: str = "deployment") -> AIResponse:
+    def _send_with_retries(self, ai_id: str, prompt: str, estimated_tokens: int,
+                           options: CallOptions) -> AIResponse:
         """
-        Call Claude for CI/CD and deployment architecture
-        Role: Deployment Architect
+        Send (hedged if requested), retrying transient failures
+        
+        Each retry waits for rate-limiter capacity again and is skipped if
+        its backoff would run past the plan deadline. The returned response
+        carries the retry count and the latency the retries added.
         """
-        ai_config = self.ai_pool.get('claude', {})
+        start = time.monotonic()
+        attempt = 0
+        delay = 0.0
+        
+        while True:
+            attempt += 1
+            if options.hedge and self.hedging.enabled:
+                response = self._send_hedged(ai_id, prompt, estimated_tokens, options)
+            else:
+                response = self._send(ai_id, prompt, options)
+            if response.success:
+                break
+            
+            delay = self.retries.plan_retry(ai_id, attempt, delay, response.status_code,
+                                            response.retry_after_s, options.deadline)
+            if delay is None:
+                break
+            self.rate_limiter.reconcile(ai_id, estimated_tokens, 0)
+            time.sleep(delay)
+            try:
+                self.rate_limiter.acquire(ai_id, estimated_tokens, self.rate_limit_max_wait, options.priority)
+            except RateLimitTimeout:
+                # Nothing is held after the refund above; offset the caller's reconcile
+                self.rate_limiter.reconcile(ai_id, 0, estimated_tokens)
+                break
+        
+        return self._retried_response(response, attempt, start)
+    
+    def _retried_response(self, response: AIResponse, attempts: int, start: float) -> AIResponse:
+        """Record retries and their added latency on the final response"""
+        if attempts > 1:
+            response.retries = attempts - 1
+            response.retry_latency_ms = max(0.0, (time.monotonic() - start) * 1000 - response.latency_ms)
+            self.retries.record(response.ai_id, response.success, response.retry_latency_ms)
+        return response
+    
+    def _grow_truncated(self, ai_id: str, prompt: str, options: CallOptions,
+                        response: AIResponse) -> AIResponse:
+        """Resend a completion cut off at a learned max_tokens with a larger budget"""
+        while self._should_grow(response, options):
+            options = replace(options, max_tokens=self.output_budget.grow(ai_id, options.max_tokens))
+            estimated_tokens = self._estimate_tokens(ai_id, prompt, options.max_tokens)
+            try:
+                self.rate_limiter.acquire(ai_id, estimated_tokens, self.rate_limit_max_wait, options.priority)
+            except RateLimitTimeout:
+                break
+            
+            retry = self._send_with_retries(ai_id, prompt, estimated_tokens, options)
+            self.rate_limiter.reconcile(ai_id, estimated_tokens, retry.tokens_used)
+            if not retry.success:
+                break
+            response = self._merge_truncated(response, retry)
+        return response
+    
+    def _should_grow(self, response: AIResponse, options: CallOptions) -> bool:
+        """A truncated answer below the model's ceiling, with time left before the deadline"""
+        return (response.success and response.truncated
+                and options.max_tokens < self.output_budget.ceiling(response.ai_id)
+                and (options.deadline is None or time.monotonic() < options.deadline))
+    
+    def _merge_truncated(self, truncated: AIResponse, retry: AIResponse) -> AIResponse:
+        """Charge the truncated attempt's tokens, cost and time to the answer that replaced it"""
+        retry.tokens_used += truncated.tokens_used
+        retry.cost_usd += truncated.cost_usd
+        retry.retries += truncated.retries
+        retry.retry_latency_ms += truncated.latency_ms + truncated.retry_latency_ms
+        retry.budget_retries = truncated.budget_retries + 1
+        return retry
+    
+    def _record_call(self, response: AIResponse, budget_task: Optional[str], cache_key: Optional[str]):
+        """Record a finished call everywhere it is tracked (may write SQLite)"""
+        self._record_outcome(response)
+        
+        if response.success:
+            self.hedging.latency.record(response.ai_id, response.latency_ms)
+            self.output_budget.record(response.ai_id, budget_task, response.output_tokens, response.truncated)
         
-        if not ai_config.get('active', False):
-            return self._inactive_response('claude', 'deploy_architect')
+        # Early-stopped streams are partial answers; never serve them from cache
+        if response.success and not response.stopped_early:
+            self._cache_store(cache_key, response.content, response.tokens_used, response.cost_usd)
+    
+    def _record_outcome(self, response: AIResponse):
+        """Feed a provider call outcome to the breaker, router and usage ledger"""
+        self.breakers.record(response.ai_id, response.success, response.latency_ms)
+        self.router.record(response.ai_id, response.success, response.latency_ms, response.cost_usd)
+        self.usage.record(response.ai_id, response.success, response.tokens_used,
+                          response.cost_usd, response.latency_ms)
+    
+    def _send(self, ai_id: str, prompt: str,
+              options: Optional[CallOptions] = None) -> AIResponse:
+        """Send a blocking request to a provider and wrap the result"""
+        max_tokens = options.max_tokens if options is not None else None
+        if options is not None and options.stream:
+            return self._send_streaming(ai_id, prompt, options.stop_when, max_tokens)
         
+        role = PROVIDERS[ai_id]['role']
+        request = self._build_request(ai_id, prompt, max_tokens=max_tokens)
         start_time = datetime.now()
         
         try:
-            response = requests.post(
-                ai_config.get('endpoint', 'https://api.anthropic.com/v1/messages'),
-                headers={
-                    "x-api-key": self.api_keys['anthropic'],
-                    "anthropic-version": "2023-06-01",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": ai_config.get('model', 'claude-sonnet-4-20250514'),
-                    "max_tokens": 4096,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ],
-                    "system": "You are the Deployment Architect of ARCHON. Design CI/CD pipelines, Dockerfiles, and infrastructure configurations."
-                },
-                timeout=60
+            response = self.http.post(
+                PROVIDERS[ai_id]['api_key'],
+                request['url'],
+                headers=request['headers'],
+                json=request['json'],
+                timeout=request['timeout']
             )
             
             latency = (datetime.now() - start_time).total_seconds() * 1000
             
             if response.ok:
                 data = response.json()
-                content = data['content'][0]['text']
-                tokens = data.get('usage', {}).get('input_tokens', 0) + data.get('usage', {}).get('output_tokens', 0)
-                cost = tokens * 0.000015
-                
-                return AIResponse(
-                    ai_id='claude',
-                    role='deploy_architect',
-                    content=content,
-                    tokens_used=tokens,
-                    latency_ms=latency,
-                    cost_usd=cost,
-                    timestamp=datetime.now(timezone.utc).isoformat(),
-                    success=True
-                )
+                content, tokens, cost, cached = self._parse_response(ai_id, data)
+                return self._completed_response(ai_id, data, content, tokens, cost, latency, cached)
             else:
-                return self._error_response('claude', 'deploy_architect',
-                                           f"API error: {response.status_code}", latency)
-                
+                return self._error_response(ai_id, role,
+                                           f"API error: {response.status_code}", latency,
+                                           response.status_code, parse_retry_after(response.headers))
+        
         except Exception as e:
             latency = (datetime.now() - start_time).total_seconds() * 1000
-            return self._error_response('claude', 'deploy_architect', str(e), latency)
+            return self._error_response(ai_id, role, str(e), latency)
     
-    def call_gemini(self, prompt: str, task_type: str = "research") -> AIResponse:
-        """
-        Call Gemini for web research and insights
-        Role: Research Analyst
+    def _send_streaming(self, ai_id: str, prompt: str,
+                        stop_when: Optional[Callable[[str], bool]] = None,
+                        max_tokens: Optional[int] = None) -> AIResponse:
         """
-        ai_config = self.ai_pool.get('gemini', {})
-        
-        if not ai_config.get('active', False):
-            return self._inactive_response('gemini', 'research_analyst')
+        Stream a provider response, recording time to first token
         
+        If stop_when returns True for the text received so far, the stream
+        is closed and the partial answer returned with stopped_early set.
+        """
+        spec = PROVIDERS[ai_id]
+        role = spec['role']
+        request = self._build_request(ai_id, prompt, stream=True, max_tokens=max_tokens)
         start_time = datetime.now()
+        ttft = None
+        stopped_early = False
         
         try:
-            response = requests.post(
-                f"{ai_config.get('endpoint', 'https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent')}?key={self.api_keys['google']}",
-                headers={"Content-Type": "application/json"},
-                json={
-                    "contents": [{"parts": [{"text": prompt}]}],
-                    "generationConfig": {
-                        "maxOutputTokens": 4096,
-                        "temperature": 0.7
-                    }
-                },
-                timeout=60
+            response = self.http.post(
+                spec['api_key'],
+                request['url'],
+                headers=request['headers'],
+                json=request['json'],
+                timeout=request['timeout'],
+                stream=True
             )
             
-            latency = (datetime.now() - start_time).total_seconds() * 1000
-            
-            if response.ok:
-                data = response.json()
-                content = data['candidates'][0]['content']['parts'][0]['text']
-                tokens = len(content.split()) * 1.3  # Approximate
-                cost = tokens * 0.000005
-                
-                return AIResponse(
-                    ai_id='gemini',
-                    role='research_analyst',
-                    content=content,
-                    tokens_used=int(tokens),
-                    latency_ms=latency,
-                    cost_usd=cost,
-                    timestamp=datetime.now(timezone.utc).isoformat(),
-                    success=True
-                )
-            else:
-                return self._error_response('gemini', 'research_analyst',
-                                           f"API error: {response.status_code}", latency)
+            try:
+                if not response.ok:
+                    latency = (datetime.now() - start_time).total_seconds() * 1000
+                    return self._error_response(ai_id, role,
+                                               f"API error: {response.status_code}", latency,
+                                               response.status_code, parse_retry_after(response.headers))
                 
+                stream = StreamAccumulator(spec['api'])
+                for event in iter_sse_events(
+                        response.iter_lines(chunk_size=None, decode_unicode=True)):
+                    delta = stream.feed(event)
+                    if not delta:
+                        continue
+                    if ttft is None:
+                        ttft = (datetime.now() - start_time).total_seconds() * 1000
+                    if stop_when is not None and stop_when(stream.text):
+                        stopped_early = True
+                        break
+            finally:
+                response.close()
+            
+            latency = (datetime.now() - start_time).total_seconds() * 1000
+            return self._stream_response(ai_id, prompt, stream, latency, ttft, stopped_early)
+        
         except Exception as e:
             latency = (datetime.now() - start_time).total_seconds() * 1000
-            return self._error_response('gemini', 'research_analyst', str(e), latency)
+            return self._error_response(ai_id, role, str(e), latency)
     
-    def call_deepseek(self, prompt: str, task_type: str = "analysis") -> AIResponse:
+    def _stream_response(self, ai_id: str, prompt: str, stream: StreamAccumulator,
+                         latency: float, ttft: Optional[float],
+                         stopped_early: bool) -> AIResponse:
+        """Wrap a finished (or early-stopped) stream as an AIResponse"""
+        content = stream.text
+        
+        # Usage arrives at the end of the stream; count it locally if we stopped first
+        if stream.tokens:
+            input_tokens, output_tokens = stream.input_tokens, stream.output_tokens
+        else:
+            input_tokens = self.estimator.count_input(ai_id, prompt)
+            output_tokens = self.estimator.count(ai_id, content)
+        tokens = stream.tokens or input_tokens + output_tokens
+        
+        cost = self._usage_cost(ai_id, tokens, input_tokens, output_tokens, stream.cached_tokens)
+        result = self._success_response(ai_id, content, tokens, cost, latency,
+                                        stream.cached_tokens)
+        result.ttft_ms = ttft
+        result.stopped_early = stopped_early
+        result.output_tokens = output_tokens
+        result.truncated = stream.finish_reason in TRUNCATION_REASONS
+        return result
+    
+    def _send_hedged(self, ai_id: str, prompt: str, estimated_tokens: int,
+                     options: Optional[CallOptions] = None) -> AIResponse:
         """
-        Call DeepSeek for code analysis and performance metrics
-        Role: Performance Analyst
+        Send a request and, if it is slower than the model's rolling p90,
+        a duplicate; the first successful answer wins
+        
+        A blocking HTTP call cannot be aborted mid-flight, so the losing
+        request is abandoned: its result is discarded and its connection
+        returns to the pool when it finishes. At most hedging.max_abandoned
+        losers run at once, so they never take over the hedge workers.
         """
-        ai_config = self.ai_pool.get('deepseek', {})
+        self.hedging.count('eligible_calls')
+        self.hedging.budget.deposit()
+        threshold_s = self.hedging.threshold_ms(ai_id) / 1000
         
-        if not ai_config.get('active', False):
-            return self._inactive_response('deepseek', 'performance_analyst')
+        primary = self._hedge_executor.submit(self._send, ai_id, prompt, options)
+        done, _ = wait([primary], timeout=threshold_s)
+        if done:
+            return primary.result()
         
-        start_time = datetime.now()
+        if not self.hedging.may_abandon():
+            self.hedging.count('abandon_denied')
+            return primary.result()
+        if not self.hedging.budget.try_spend():
+            self.hedging.count('budget_denied')
+            return primary.result()
+        if self.rate_limiter.try_acquire(ai_id, estimated_tokens, options.priority if options else None) > 0:
+            return primary.result()
         
-        try:
-            response = requests.post(
-                ai_config.get('endpoint', 'https://api.deepseek.com/v1/chat/completions'),
-                headers={
-                    "Authorization": f"Bearer {self.api_keys['deepseek']}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": ai_config.get('model', 'deepseek-coder'),
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are the Performance Analyst of ARCHON. Analyze code quality, performance metrics, and suggest optimizations."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    "max_tokens": 4096,
-                    "temperature": 0.3
-                },
-                timeout=60
-            )
-            
-            latency = (datetime.now() - start_time).total_seconds() * 1000
-            
-            if response.ok:
-                data = response.json()
-                content = data['choices'][0]['message']['content']
-                tokens = data.get('usage', {}).get('total_tokens', 0)
-                cost = tokens * 0.000002
-                
-                return AIResponse(
-                    ai_id='deepseek',
-                    role='performance_analyst',
-                    content=content,
-                    tokens_used=tokens,
-                    latency_ms=latency,
-                    cost_usd=cost,
-                    timestamp=datetime.now(timezone.utc).isoformat(),
-                    success=True
-                )
-            else:
-                return self._error_response('deepseek', 'performance_analyst',
-                                           f"API error: {response.status_code}", latency)
-                
-        except Exception as e:
-            latency = (datetime.now() - start_time).total_seconds() * 1000
-            return self._error_response('deepseek', 'performance_analyst', str(e), latency)
+        self.hedging.count('hedges')
+        hedge = self._hedge_executor.submit(self._send, ai_id, prompt, options)
+        pending = {primary, hedge}
+        winner = primary
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if future.result().success), next(iter(done)))
+            if winner.result().success:
+                break
+        
+        # The caller settles one reservation against the answer; the duplicate's goes with the loser
+        self._settle_hedge_loser(ai_id, estimated_tokens, hedge if winner is primary else primary)
+        response = winner.result()
+        if response.success:
+            if winner is hedge:
+                self.hedging.count('hedge_wins')
+            response.hedged = True
+        return response
     
-    def call_gpt5(self, prompt: str, task_type: str = "strategy") -> AIResponse:
+    def _settle_hedge_loser(self, ai_id: str, estimated_tokens: int, loser: Future):
+        """Reconcile the duplicate's rate-limit reservation once the losing request ends"""
+        abandoned = not loser.cancel() and not loser.done()
+        if abandoned:
+            self.hedging.track_abandoned(1)
+        
+        def settle(future: Future):
+            failed = future.cancelled() or future.exception() is not None
+            self.rate_limiter.reconcile(ai_id, estimated_tokens, 0 if failed else future.result().tokens_used)
+            if abandoned:
+                self.hedging.track_abandoned(-1)
+        
+        loser.add_done_callback(settle)
+    
+    def _cascade_tiers(self) -> List[str]:
+        """Active cascade tiers; manual-only models (GPT-5) also need cascade.allow_manual"""
+        return [ai_id for ai_id in self.cascade.tiers
+                if self._is_active(ai_id)
+                and (self.cascade.allow_manual or not PROVIDERS[ai_id].get('manual_only'))]
+    
+    def _cascade_accepts(self, response: AIResponse) -> bool:
+        """Confidence check for one cascade tier's answer"""
+        reasons = self.cascade.assess(response.content) if response.success else [response.error]
+        if reasons:
+            print(f"   ↗️  {response.ai_id} escalated: {', '.join(str(r) for r in reasons)}")
+        return not reasons
+    
+    def _cascade_response(self, attempts: List[AIResponse],
+                          answer: Optional[AIResponse]) -> AIResponse:
         """
-        Call GPT-5 for meta-strategic optimization (manual trigger only)
-        Role: Meta Strategist
+        Final cascade answer in the planner slot, charged for every tier tried
+        
+        The answer keeps the planner's ai_id and role, so a cheap tier that also
+        serves another consultation (Gemini research) is not counted twice.
         """
-        ai_config = self.ai_pool.get('gpt5', {})
+        if not attempts:
+            return self._error_response('gpt4o', PROVIDERS['gpt4o']['role'],
+                                        "No active cascade tier", 0)
         
-        # GPT-5 is manual-only
-        if ai_config.get('active') != 'manual':
-            return self._inactive_response('gpt5', 'meta_strategist')
+        final = answer or next((r for r in reversed(attempts) if r.success), attempts[-1])
+        self.cascade.record(answer.ai_id if answer else None, len(attempts) - 1)
+        return replace(
+            final,
+            ai_id='gpt4o',
+            role=PROVIDERS['gpt4o']['role'],
+            tokens_used=sum(r.tokens_used for r in attempts),
+            cost_usd=sum(r.cost_usd for r in attempts),
+            latency_ms=sum(r.latency_ms for r in attempts),
+            escalations=len(attempts) - 1,
+            cascade_tier=final.ai_id
+        )
+    
+    def _estimate_tokens(self, ai_id: str, prompt: str, max_tokens: Optional[int] = None) -> int:
+        """Pre-flight token reservation for rate limiting (prompt plus max_tokens)"""
+        return self.estimator.count_input(ai_id, prompt) + (max_tokens or PROVIDERS[ai_id]['max_tokens'])
+    
+    # ================================
+    # RESPONSE CACHE
+    # ================================
+    
+    def _cache_key(self, ai_id: str, prompt: str,
+                   options: Optional[CallOptions] = None) -> Optional[str]:
+        """Content address of a model request, or None when caching is off"""
+        if self.cache is None:
+            return None
+        return self._request_key(ai_id, prompt, options)
+    
+    def _request_key(self, ai_id: str, prompt: str,
+                     options: Optional[CallOptions] = None) -> str:
+        """
+        Content address of a model request (cache and single-flight key)
+        
+        Covers the output budget and streaming mode actually requested, so
+        a call never gets an answer generated under a smaller max_tokens.
+        """
+        spec = PROVIDERS[ai_id]
+        options = options or CallOptions()
+        return ResponseCache.make_key(
+            ai_id,
+            self.ai_pool.get(ai_id, {}).get('model', spec['model']),
+            spec['system'],
+            prompt,
+            {'max_tokens': options.max_tokens or spec['max_tokens'],
+             'temperature': spec['temperature'],
+             'stream': options.stream}
+        )
+    
+    def _cache_lookup(self, ai_id: str, cache_key: Optional[str]) -> Optional[AIResponse]:
+        """Serve a response from cache; cached answers cost no tokens"""
+        if cache_key is None:
+            return None
         
         start_time = datetime.now()
+        hit = self.cache.get(cache_key)
+        if hit is None:
+            return None
         
-        try:
-            response = requests.post(
-                ai_config.get('endpoint', 'https://api.openai.com/v1/chat/completions'),
-                headers={
-                    "Authorization": f"Bearer {self.api_keys['openai']}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": ai_config.get('model', 'gpt-5'),
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are the Meta Strategist of ARCHON. Analyze system performance and optimize AI model weights for better outcomes. Focus on long-term structural improvements."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    "max_tokens": 8192,
-                    "temperature": 0.5
-                },
-                timeout=120
-            )
-            
-            latency = (datetime.now() - start_time).total_seconds() * 1000
-            
-            if response.ok:
-                data = response.json()
-                content = data['choices'][0]['message']['content']
-                tokens = data.get('usage', {}).get('total_tokens', 0)
-                cost = tokens * 0.00003  # GPT-5 is more expensive
-                
-                return AIResponse(
-                    ai_id='gpt5',
-                    role='meta_strategist',
-                    content=content,
-                    tokens_used=tokens,
-                    latency_ms=latency,
-                    cost_usd=cost,
-                    timestamp=datetime.now(timezone.utc).isoformat(),
-                    success=True
-                )
-            else:
-                return self._error_response('gpt5', 'meta_strategist',
-                                           f"API error: {response.status_code}", latency)
-                
-        except Exception as e:
-            latency = (datetime.now() - start_time).total_seconds() * 1000
-            return self._error_response('gpt5', 'meta_strategist', str(e), latency)
+        latency = (datetime.now() - start_time).total_seconds() * 1000
+        response = self._success_response(ai_id, hit['content'], 0, 0.0, latency)
+        response.cached = True
+        return response
+    
+    def _cache_store(self, cache_key: Optional[str], content: str, tokens: int, cost: float):
+        """Remember a successful response"""
+        if cache_key is not None:
+            self.cache.put(cache_key, {'content': content, 'tokens_used': tokens, 'cost_usd': cost})
+    
+    # ================================
+    # PROVIDER PROTOCOLS
+    # ================================
+    
+    def _is_active(self, ai_id: str) -> bool:
+        """Check whether a model may be called automatically"""
+        active = self.ai_pool.get(ai_id, {}).get('active', False)
+        
+        # GPT-5 is manual-only
+        if PROVIDERS[ai_id].get('manual_only'):
+            return active == 'manual'
+        return bool(active)
+    
+    def _build_request(self, ai_id: str, prompt: str, stream: bool = False,
+                       max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Build the HTTP request for a provider
+        
+        Args:
+            ai_id: Model identifier
+            prompt: User prompt
+            stream: Request a server-sent event stream
+            max_tokens: Output budget (defaults to the model's max_tokens)
+        
+        Returns:
+            Dict with url, headers, json body and timeout
+        """
+        spec = PROVIDERS[ai_id]
+        max_tokens = max_tokens or spec['max_tokens']
+        ai_config = self.ai_pool.get(ai_id, {})
+        endpoint = ai_config.get('endpoint', spec['endpoint'])
+        model = ai_config.get('model', spec['model'])
+        api = spec['api']
+        
+        if api == 'anthropic':
+            url = endpoint
+            headers = {
+                "x-api-key": self.api_keys[spec['api_key']],
+                "anthropic-version": "2023-06-01",
+                "Content-Type": "application/json"
+            }
+            body = {
+                "model": model,
+                "max_tokens": max_tokens,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ],
+                "system": anthropic_system(spec['system']) if self.prompt_caching else spec['system']
+            }
+        elif api == 'gemini':
+            if stream:
+                endpoint = endpoint.replace(':generateContent', ':streamGenerateContent')
+            url = f"{endpoint}?key={self.api_keys[spec['api_key']]}"
+            if stream:
+                url += "&alt=sse"
+            headers = {"Content-Type": "application/json"}
+            body = {
+                "contents": [{"parts": [{"text": prompt}]}],
+                "generationConfig": {
+                    "maxOutputTokens": max_tokens,
+                    "temperature": spec['temperature']
+                }
+            }
+        else:
+            url = endpoint
+            headers = {
+                "Authorization": f"Bearer {self.api_keys[spec['api_key']]}",
+                "Content-Type": "application/json"
+            }
+            body = {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": spec['system']},
+                    {"role": "user", "content": prompt}
+                ],
+                "max_tokens": max_tokens,
+                "temperature": spec['temperature']
+            }
+            # The system prompt leads the messages, so it forms the cached prefix
+            if self.prompt_caching and spec['api_key'] == 'openai':
+                body["prompt_cache_key"] = prompt_cache_key(ai_id, spec['system'])
+            if stream:
+                body["stream_options"] = {"include_usage": True}
+        
+        if stream and api != 'gemini':
+            body["stream"] = True
+        
+        return {
+            "url": url,
+            "headers": headers,
+            "json": body,
+            "timeout": spec['timeout']
+        }
+    
+    def _parse_response(self, ai_id: str, data: Dict[str, Any]) -> Tuple[str, int, float, int]:
+        """
+        Extract content, token usage and cost from a provider response body
+        
+        Returns:
+            Tuple of (content, tokens, cost_usd, cached_prompt_tokens)
+        """
+        spec = PROVIDERS[ai_id]
+        api = spec['api']
+        
+        if api == 'anthropic':
+            content = data['content'][0]['text']
+            usage = data.get('usage', {})
+            # input_tokens excludes prompt tokens read from or written to the cache
+            input_tokens = (usage.get('input_tokens', 0)
+                            + (usage.get('cache_creation_input_tokens') or 0)
+                            + (usage.get('cache_read_input_tokens') or 0))
+            output_tokens = usage.get('output_tokens', 0)
+            tokens = input_tokens + output_tokens
+        elif api == 'gemini':
+            content = data['candidates'][0]['content']['parts'][0]['text']
+            usage = data.get('usageMetadata', {})
+            input_tokens = usage.get('promptTokenCount', 0)
+            output_tokens = (usage.get('candidatesTokenCount', 0)
+                             + usage.get('thoughtsTokenCount', 0))
+            if not usage:
+                output_tokens = self.estimator.count(ai_id, content)  # Local count
+            tokens = usage.get('totalTokenCount') or input_tokens + output_tokens
+        else:
+            content = data['choices'][0]['message']['content']
+            usage = data.get('usage', {})
+            input_tokens = usage.get('prompt_tokens', 0)
+            output_tokens = usage.get('completion_tokens', 0)
+            tokens = usage.get('total_tokens') or input_tokens + output_tokens
+        
+        cached = cached_tokens(usage)
+        return content, tokens, self._usage_cost(ai_id, tokens, input_tokens, output_tokens, cached), cached
+    
+    def _completed_response(self, ai_id: str, data: Dict[str, Any], content: str, tokens: int,
+                            cost: float, latency: float, cached: int) -> AIResponse:
+        """Success response with the completion length and truncation flag of a provider body"""
+        api = PROVIDERS[ai_id]['api']
+        
+        if api == 'anthropic':
+            output_tokens = data.get('usage', {}).get('output_tokens', 0)
+            finish_reason = data.get('stop_reason')
+        elif api == 'gemini':
+            usage = data.get('usageMetadata', {})
+            output_tokens = usage.get('candidatesTokenCount', 0) + usage.get('thoughtsTokenCount', 0)
+            finish_reason = data['candidates'][0].get('finishReason')
+        else:
+            output_tokens = data.get('usage', {}).get('completion_tokens', 0)
+            finish_reason = data['choices'][0].get('finish_reason')
+        
+        response = self._success_response(ai_id, content, tokens, cost, latency, cached)
+        response.output_tokens = output_tokens or self.estimator.count(ai_id, content)
+        response.truncated = finish_reason in TRUNCATION_REASONS
+        return response
+    
+    def _usage_cost(self, ai_id: str, tokens: int, input_tokens: int,
+                    output_tokens: int, cached: int) -> float:
+        """Price reported usage; totals without an input/output split use the flat rate"""
+        if output_tokens:
+            self.estimator.observe(ai_id, output_tokens)
+        if input_tokens + output_tokens < tokens:
+            return self.estimator.flat_cost(ai_id, tokens, cached)
+        return self.estimator.cost(ai_id, input_tokens, output_tokens, cached)
     
     # ================================
     # AGGREGATION & CONSENSUS
     # ================================
     
     def generate_plan(self, task: str, description: str, 
-                      include_research: bool = True) -> AggregatedPlan:
+                      include_research: bool = True,
+                      concurrent: Optional[bool] = None,
+                      latency_critical: bool = False,
+                      deadline_s: Optional[float] = None,
+                      quorum: Optional[int] = None,
+                      task_type: Optional[str] = None,
+                      cascade: Optional[bool] = None,
+                      priority: Optional[str] = None) -> AggregatedPlan:
         """
         Generate an aggregated plan from multiple AI models
         
@@ -405,9 +979,25 @@ class AIPoolManager:
             task: Task name
             description: Detailed task description
             include_research: Whether to include Gemini research
-            
+            concurrent: Fan out to all models at once (defaults to
+                        pool_settings.fan_out in decision_pool.yaml)
+            latency_critical: Hedge slow model calls with a duplicate request
+            deadline_s: Return the best partial plan after this many seconds
+                        (defaults to pool_settings.plan_deadline_seconds)
+            quorum: Return as soon as this many models answered successfully
+                    (defaults to pool_settings.plan_quorum)
+            task_type: Route to the models that best serve this task type
+                       (profiles in pool_settings.routing.task_types)
+            cascade: Answer the planner consultation cheap model first,
+                     escalating on low confidence (defaults to
+                     pool_settings.cascade.enabled)
+            priority: Rate-limiter class of the plan's calls: interactive,
+                      pipeline or background (defaults to
+                      pool_settings.priorities.default)
+        
         Returns:
-            AggregatedPlan with consensus from multiple AIs
+            AggregatedPlan with consensus from multiple AIs; models still
+            running at the deadline or quorum are listed in `pending`
         """
         print(f"\n{'='*60}")
         print(f"🧠 ARCHON AI POOL: Generating Plan")
@@ -415,42 +1005,108 @@ class AIPoolManager:
         print(f"Task: {task}")
         print(f"Description: {description[:100]}...")
         
-        responses = []
+        consultations = self._plan_consultations(task, description, include_research)
+        consultations = self._route_consultations(consultations, task_type)
         
-        # 1. GPT-4o: Primary planning
-        print("\n📋 Consulting GPT-4o (Planner)...")
-        gpt4o_response = self.call_gpt4o(
-            f"Task: {task}\nDescription: {description}\n\nCreate a detailed execution plan with:\n1. Step-by-step actions\n2. Estimated tokens and cost\n3. Risk assessment\n4. Success criteria"
-        )
-        responses.append(gpt4o_response)
-        print(f"   {'✅' if gpt4o_response.success else '❌'} GPT-4o: {gpt4o_response.tokens_used} tokens")
+        if concurrent is None:
+            concurrent = self.pool_settings.get('fan_out', 'concurrent') == 'concurrent'
+        
+        if deadline_s is None:
+            deadline_s = self.pool_settings.get('plan_deadline_seconds')
+        if quorum is None:
+            quorum = self.pool_settings.get('plan_quorum')
+        deadline = time.monotonic() + deadline_s if deadline_s else None
+        if cascade is None:
+            cascade = self.cascade.enabled
+        
+        options = CallOptions(hedge=latency_critical, priority=priority, deadline=deadline,
+                              task_type=task_type)
+        responses = self._run_consultations(consultations, concurrent, options, deadline, quorum,
+                                            cascade)
+        
+        answered = {r.ai_id for r in responses}
+        pending = [ai_id for ai_id, _, _ in consultations if ai_id not in answered]
+        
+        return self._aggregate_plan(task, description, responses, pending)
+    
+    def _plan_consultations(self, task: str, description: str,
+                            include_research: bool) -> List[Tuple[str, str, str]]:
+        """Build the consultations for a plan in order: (ai_id, label, prompt)"""
+        consultations = [
+            ('gpt4o', "📋 Consulting GPT-4o (Planner)...",
+             f"Task: {task}\nDescription: {description}\n\nCreate a detailed execution plan with:\n1. Step-by-step actions\n2. Estimated tokens and cost\n3. Risk assessment\n4. Success criteria")
+        ]
         
-        # 2. Gemini: Research (optional)
         if include_research:
-            print("\n🔍 Consulting Gemini (Research)...")
-            gemini_response = self.call_gemini(
-                f"Research task: {task}\n\nProvide insights on:\n1. Best practices\n2. Potential issues\n3. Community recommendations"
+            consultations.append(
+                ('gemini', "🔍 Consulting Gemini (Research)...",
+                 f"Research task: {task}\n\nProvide insights on:\n1. Best practices\n2. Potential issues\n3. Community recommendations")
             )
-            responses.append(gemini_response)
-            print(f"   {'✅' if gemini_response.success else '❌'} Gemini: {gemini_response.tokens_used} tokens")
         
-        # 3. Claude: Deployment architecture
-        print("\n🚀 Consulting Claude (Deployment)...")
-        claude_response = self.call_claude(
-            f"Design deployment for: {task}\n\nProvide:\n1. CI/CD pipeline structure\n2. Docker configuration\n3. Environment setup"
+        consultations.append(
+            ('claude', "🚀 Consulting Claude (Deployment)...",
+             f"Design deployment for: {task}\n\nProvide:\n1. CI/CD pipeline structure\n2. Docker configuration\n3. Environment setup")
+        )
+        consultations.append(
+            ('deepseek', "📊 Consulting DeepSeek (Analysis)...",
+             f"Analyze task: {task}\n\nProvide:\n1. Code quality considerations\n2. Performance metrics to track\n3. Optimization suggestions")
         )
-        responses.append(claude_response)
-        print(f"   {'✅' if claude_response.success else '❌'} Claude: {claude_response.tokens_used} tokens")
         
-        # 4. DeepSeek: Performance analysis
-        print("\n📊 Consulting DeepSeek (Analysis)...")
-        deepseek_response = self.call_deepseek(
-            f"Analyze task: {task}\n\nProvide:\n1. Code quality considerations\n2. Performance metrics to track\n3. Optimization suggestions"
+        return consultations
+    
+    def _route_consultations(self, consultations: List[Tuple[str, str, str]],
+                             task_type: Optional[str]) -> List[Tuple[str, str, str]]:
+        """Keep only the consultations the router selects for the task type"""
+        selected = self.router.select(
+            [ai_id for ai_id, _, _ in consultations], task_type,
+            available=lambda ai_id: self.breakers.state(ai_id) != 'open'
         )
-        responses.append(deepseek_response)
-        print(f"   {'✅' if deepseek_response.success else '❌'} DeepSeek: {deepseek_response.tokens_used} tokens")
+        return [c for c in consultations if c[0] in selected]
+    
+    def estimate_plan(self, task: str, description: str,
+                      include_research: bool = True,
+                      task_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Predict the tokens and cost of generate_plan before sending anything
+        
+        The result carries estimated_tokens and estimated_cost like
+        export_plan_json, so TrustEngine.evaluate_cost_efficiency can score
+        a plan before it is paid for.
         
-        # Calculate consensus and aggregate
+        Returns:
+            Dict with plan totals, the worst-case cost and per-model estimates
+        """
+        consultations = self._plan_consultations(task, description, include_research)
+        consultations = self._route_consultations(consultations, task_type)
+        
+        models = {}
+        for ai_id, _, prompt in consultations:
+            if not self._is_active(ai_id):
+                continue
+            prompt, error = self.estimator.fit(ai_id, prompt)
+            estimate = self.estimator.estimate(ai_id, prompt)
+            models[ai_id] = {
+                'input_tokens': estimate.input_tokens,
+                'output_tokens': estimate.output_tokens,
+                'cost_usd': estimate.cost_usd,
+                'max_cost_usd': estimate.max_cost_usd,
+                'tokenizer': estimate.tokenizer,
+                'rejected': error
+            }
+        
+        sent = [m for m in models.values() if not m['rejected']]
+        return {
+            'task': task,
+            'estimated_tokens': sum(m['input_tokens'] + m['output_tokens'] for m in sent),
+            'estimated_cost': sum(m['cost_usd'] for m in sent),
+            'max_cost': sum(m['max_cost_usd'] for m in sent),
+            'models': models
+        }
+    
+    def _aggregate_plan(self, task: str, description: str,
+                        responses: List[AIResponse],
+                        pending: Optional[List[str]] = None) -> AggregatedPlan:
+        """Calculate consensus over the models that responded and build the plan"""
         successful = [r for r in responses if r.success]
         consensus = len(successful) / len(responses) if responses else 0
         
@@ -473,34 +1129,110 @@ class AIPoolManager:
             estimated_cost=total_cost,
             estimated_tokens=total_tokens,
             risk_level=risk_level,
-            created_at=datetime.now(timezone.utc).isoformat()
+            created_at=datetime.now(timezone.utc).isoformat(),
+            pending=list(pending or [])
         )
         
         print(f"\n📊 Plan Summary:")
         print(f"   Consensus: {consensus:.1%}")
+        if plan.pending:
+            print(f"   Cut off: {', '.join(plan.pending)}")
         print(f"   Total Tokens: {total_tokens}")
         print(f"   Estimated Cost: ${total_cost:.4f}")
         print(f"   Risk Level: {risk_level}")
         
-        # Track usage
-        self.session_usage['total_tokens'] += total_tokens
-        self.session_usage['total_cost'] += total_cost
-        
         return plan
     
+    def _run_consultations(self, consultations: List[Tuple[str, str, str]], 
+                           concurrent: bool,
+                           options: Optional[CallOptions] = None,
+                           deadline: Optional[float] = None,
+                           quorum: Optional[int] = None,
+                           cascade: bool = False) -> List[AIResponse]:
+        """
+        Run model consultations sequentially or as a concurrent fan-out
+        
+        Responses are always returned in consultation order so the
+        resulting AggregatedPlan is identical in both modes. With a
+        deadline (time.monotonic() value) or quorum, only the models that
+        answered before the cut-off are returned.
+        """
+        if not concurrent or len(consultations) < 2:
+            responses = []
+            for ai_id, label, prompt in consultations:
+                if self._cut_off(responses, deadline, quorum):
+                    break
+                print(f"\n{label}")
+                response = self._consultation_caller(ai_id, cascade)(prompt, options=options)
+                self._report_response(response)
+                responses.append(response)
+            return responses
+        
+        for _, label, _ in consultations:
+            print(f"\n{label}")
+        
+        max_workers = self.pool_settings.get('max_workers', len(consultations))
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(consultations))))
+        futures = [
+            executor.submit(self._consultation_caller(ai_id, cascade), prompt, options=options)
+            for ai_id, _, prompt in consultations
+        ]
+        
+        pending = set(futures)
+        finished = []
+        while pending and not self._cut_off(finished, deadline, quorum):
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            finished.extend(future.result() for future in done)
+        
+        # Queued stragglers are cancelled; running blocking calls are abandoned
+        # and their results discarded, as with hedged requests
+        executor.shutdown(wait=False, cancel_futures=True)
+        responses = [future.result() for future in futures if future.done() and future not in pending]
+        
+        print()
+        for response in responses:
+            self._report_response(response)
+        
+        return responses
+    
+    def _consultation_caller(self, ai_id: str, cascade: bool) -> Callable:
+        """Model caller for a consultation; the planner goes through the cascade"""
+        if cascade and ai_id == 'gpt4o':
+            return self.call_planner_cascade
+        return getattr(self, f"call_{ai_id}")
+    
+    def _cut_off(self, responses: List[AIResponse], deadline: Optional[float],
+                 quorum: Optional[int]) -> bool:
+        """Check whether the plan deadline passed or the quorum answered"""
+        if deadline is not None and time.monotonic() >= deadline:
+            return True
+        return bool(quorum) and sum(1 for r in responses if r.success) >= quorum
+    
+    def _report_response(self, response: AIResponse):
+        """Print a one-line consultation result"""
+        names = {'gpt4o': 'GPT-4o', 'gemini': 'Gemini', 'claude': 'Claude',
+                 'deepseek': 'DeepSeek', 'gpt5': 'GPT-5'}
+        print(f"   {'✅' if response.success else '❌'} {names.get(response.ai_id, response.ai_id)}: {response.tokens_used} tokens")
+    
     def request_optimization(self, telemetry_summary: Dict) -> AIResponse:
         """
         Request meta-optimization from GPT-5 (weekly strategy review)
         
         Args:
             telemetry_summary: Summary of recent build performance
-            
+        
         Returns:
             GPT-5 optimization recommendations
         """
         print("\n🧠 Requesting GPT-5 Meta-Optimization...")
         
-        prompt = f"""
+        return self.call_gpt5(self._optimization_prompt(telemetry_summary), task_type="optimization",
+                              options=CallOptions(priority="background"))
+    
+    def _optimization_prompt(self, telemetry_summary: Dict) -> str:
+        """Build the GPT-5 weekly strategy review prompt"""
+        return f"""
         ARCHON System Performance Review
         
         Telemetry Summary:
@@ -521,8 +1253,152 @@ class AIPoolManager:
         
         Output as JSON with new_weights and recommendations.
         """
+    
+    # ================================
+    # BATCH MODE
+    # ================================
+    
+    def generate_plans_batch(self, tasks: List[Tuple[str, str]],
+                             include_research: bool = True) -> List[AggregatedPlan]:
+        """
+        Generate many plans through provider batch jobs (offline, batch pricing)
         
-        return self.call_gpt5(prompt, task_type="optimization")
+        OpenAI and Anthropic consultations are grouped into one batch job
+        per model and polled until done; models without a batch API are
+        called directly while the jobs run. Cache hits are served first and
+        batch answers are cached.
+        
+        Args:
+            tasks: (task, description) pairs
+            include_research: Whether to include Gemini research
+        
+        Returns:
+            One AggregatedPlan per task, in input order
+        """
+        settings = self.pool_settings.get('batch', {})
+        print(f"\n🧠 ARCHON AI POOL (batch): {len(tasks)} plans")
+        
+        consultations = [self._plan_consultations(task, description, include_research)
+                         for task, description in tasks]
+        responses: Dict[str, AIResponse] = {}
+        batched: Dict[str, Dict[str, str]] = {}  # ai_id -> custom_id -> prompt
+        direct: List[Tuple[str, str, str]] = []
+        
+        for index, plan_consultations in enumerate(consultations):
+            for ai_id, _, prompt in plan_consultations:
+                custom_id = f"plan-{index}-{ai_id}"
+                if not self._is_active(ai_id):
+                    responses[custom_id] = self._inactive_response(ai_id, PROVIDERS[ai_id]['role'])
+                    continue
+                prompt, error = self.estimator.fit(ai_id, prompt)
+                if error:
+                    responses[custom_id] = self._error_response(ai_id, PROVIDERS[ai_id]['role'], error, 0)
+                    continue
+                cached = self._cache_lookup(ai_id, self._cache_key(ai_id, prompt))
+                if cached is not None:
+                    responses[custom_id] = cached
+                elif self._supports_batch(ai_id):
+                    batched.setdefault(ai_id, {})[custom_id] = prompt
+                else:
+                    direct.append((custom_id, ai_id, prompt))
+        
+        start_time = datetime.now()
+        jobs = []
+        job_requests: Dict[str, Tuple[str, Dict[str, str]]] = {}
+        for ai_id, prompts in batched.items():
+            bodies = {custom_id: self._build_request(ai_id, prompt)['json']
+                      for custom_id, prompt in prompts.items()}
+            try:
+                client = self._batch_client(ai_id, settings)
+                batch_id = client.submit(bodies)
+            except Exception as e:
+                for custom_id in prompts:
+                    responses[custom_id] = self._error_response(ai_id, PROVIDERS[ai_id]['role'], str(e), 0)
+                continue
+            print(f"   📦 {ai_id}: batch {batch_id} ({len(prompts)} requests)")
+            jobs.append((client, batch_id))
+            job_requests[batch_id] = (ai_id, prompts)
+        
+        # Direct calls overlap with batch processing (preemptible by interactive plans)
+        options = CallOptions(priority="background")
+        with ThreadPoolExecutor(max_workers=max(1, self.pool_settings.get('max_workers', 4))) as executor:
+            futures = {
+                custom_id: executor.submit(getattr(self, f"call_{ai_id}"), prompt, options=options)
+                for custom_id, ai_id, prompt in direct
+            }
+            for custom_id, future in futures.items():
+                responses[custom_id] = future.result()
+        
+        outcomes = wait_for_batches(jobs, settings.get('poll_interval_seconds', 30),
+                                    settings.get('max_wait_seconds', 86400))
+        latency = (datetime.now() - start_time).total_seconds() * 1000
+        for batch_id, (ai_id, prompts) in job_requests.items():
+            batch_responses = self._batch_responses(ai_id, prompts, outcomes.get(batch_id), latency, settings)
+            for response in batch_responses.values():
+                self.usage.record(ai_id, response.success, response.tokens_used,
+                                  response.cost_usd, response.latency_ms)
+            responses.update(batch_responses)
+        
+        plans = []
+        for index, (task, description) in enumerate(tasks):
+            plan_responses = [responses[f"plan-{index}-{ai_id}"] for ai_id, _, _ in consultations[index]]
+            plans.append(self._aggregate_plan(task, description, plan_responses))
+        return plans
+    
+    def _supports_batch(self, ai_id: str) -> bool:
+        """OpenAI and Anthropic models have a batch API"""
+        spec = PROVIDERS[ai_id]
+        return spec['api'] == 'anthropic' or spec['api_key'] == 'openai'
+    
+    def _batch_client(self, ai_id: str, settings: Dict[str, Any]):
+        """Batch API client for a model's provider"""
+        spec = PROVIDERS[ai_id]
+        endpoint = self.ai_pool.get(ai_id, {}).get('endpoint', spec['endpoint'])
+        api_key = self.api_keys[spec['api_key']]
+        
+        if spec['api'] == 'anthropic':
+            return AnthropicBatchClient(self.http, spec['api_key'], api_key, endpoint)
+        return OpenAIBatchClient(self.http, spec['api_key'], api_key, endpoint,
+                                 settings.get('completion_window', '24h'))
+    
+    def _batch_responses(self, ai_id: str, prompts: Dict[str, str], outcome: Any,
+                         latency: float, settings: Dict[str, Any]) -> Dict[str, AIResponse]:
+        """Turn one batch job's results into AIResponses (batch-discounted cost)"""
+        role = PROVIDERS[ai_id]['role']
+        discount = settings.get('cost_discount', 0.5)
+        
+        if outcome is None:
+            error = f"Batch not finished within {settings.get('max_wait_seconds', 86400)}s"
+            return {custom_id: self._error_response(ai_id, role, error, latency) for custom_id in prompts}
+        if isinstance(outcome, BatchError):
+            return {custom_id: self._error_response(ai_id, role, str(outcome), latency) for custom_id in prompts}
+        
+        responses = {}
+        for custom_id, prompt in prompts.items():
+            data, error = outcome.get(custom_id, (None, "Missing from batch results"))
+            if data is None:
+                responses[custom_id] = self._error_response(ai_id, role, error, latency)
+                continue
+            try:
+                content, tokens, cost, cached = self._parse_response(ai_id, data)
+            except (KeyError, IndexError, TypeError) as e:
+                responses[custom_id] = self._error_response(ai_id, role, f"Malformed batch result: {e}", latency)
+                continue
+            responses[custom_id] = self._success_response(ai_id, content, tokens,
+                                                          cost * (1 - discount), latency, cached)
+            self._cache_store(self._cache_key(ai_id, prompt), content, tokens, cost * (1 - discount))
+        return responses
+    
+    def replan_blueprint(self, blueprint_path: Optional[str] = None,
+                         include_research: bool = False) -> List[AggregatedPlan]:
+        """Nightly re-planning of every product_blueprint.json module in one batch"""
+        blueprint_path = blueprint_path or os.path.join(ARCHON_ROOT, 'production_line', 'product_blueprint.json')
+        with open(blueprint_path, 'r') as f:
+            modules = json.load(f).get('modules', [])
+        
+        tasks = [(f"replan_{m['name'].lower().replace(' ', '_')}", m.get('description', ''))
+                 for m in modules]
+        return self.generate_plans_batch(tasks, include_research=include_research)
     
     # ================================
     # HELPER METHODS
@@ -542,7 +1418,36 @@ class AIPoolManager:
             error="AI model is inactive"
         )
     
-    def _error_response(self, ai_id: str, role: str, error: str, latency: float) -> AIResponse:
+    def _circuit_open_response(self, ai_id: str, role: str) -> AIResponse:
+        """Return a fast error while the model's circuit is open"""
+        return self._error_response(
+            ai_id, role,
+            f"Circuit open: {ai_id} is failing, retry in {self.breakers.retry_after(ai_id):.0f}s", 0
+        )
+    
+    def _coalesced_response(self, response: AIResponse) -> AIResponse:
+        """Copy of a shared response; the tokens were paid for by the leader"""
+        return replace(response, tokens_used=0, cost_usd=0.0, coalesced=True)
+    
+    def _success_response(self, ai_id: str, content: str, tokens: int,
+                          cost: float, latency: float,
+                          cached_prompt_tokens: int = 0) -> AIResponse:
+        """Return successful response"""
+        return AIResponse(
+            ai_id=ai_id,
+            role=PROVIDERS[ai_id]['role'],
+            content=content,
+            tokens_used=tokens,
+            latency_ms=latency,
+            cost_usd=cost,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            success=True,
+            cached_prompt_tokens=cached_prompt_tokens
+        )
+    
+    def _error_response(self, ai_id: str, role: str, error: str, latency: float,
+                        status_code: Optional[int] = None,
+                        retry_after: Optional[float] = None) -> AIResponse:
         """Return error response"""
         return AIResponse(
             ai_id=ai_id,
@@ -553,7 +1458,9 @@ class AIPoolManager:
             cost_usd=0,
             timestamp=datetime.now(timezone.utc).isoformat(),
             success=False,
-            error=error
+            error=error,
+            status_code=status_code,
+            retry_after_s=retry_after
         )
     
     def get_active_models(self) -> List[str]:
@@ -566,10 +1473,62 @@ class AIPoolManager:
     def get_session_usage(self) -> Dict[str, Any]:
         """Get current session usage statistics"""
         return {
-            **self.session_usage,
-            'active_models': self.get_active_models()
+            **self.usage.get_totals(),
+            'models': self.usage.get_stats(),
+            'active_models': self.get_active_models(),
+            'connections': self.http.get_stats(),
+            'cache': self.cache.get_stats() if self.cache else {'enabled': False},
+            'rate_limits': self.rate_limiter.get_stats(),
+            'hedging': self.hedging.get_stats(),
+            'circuit_breakers': self.breakers.get_stats(),
+            'routing': self.router.get_stats(),
+            'preflight': self.estimator.get_stats(),
+            'cascade': self.cascade.get_stats(),
+            'retries': self.retries.get_stats(),
+            'output_budget': self.output_budget.get_stats(),
+            'single_flight': self.single_flight.get_stats() if self.single_flight else {'enabled': False}
         }
     
+    def report_metrics(self, collector=None) -> Dict[str, Any]:
+        """
+        Write pool metrics (connection reuse, etc.) to telemetry
+        
+        Args:
+            collector: TelemetryCollector to write to (created if omitted)
+        
+        Returns:
+            The metrics that were written, keyed by component
+        """
+        if collector is None:
+            from telemetry.telemetry_collector import TelemetryCollector
+            collector = TelemetryCollector()
+        
+        metrics = {
+            'http_pool': self.http.get_stats(),
+            'rate_limiter': self.rate_limiter.get_stats(),
+            'hedging': {'all': self.hedging.get_stats()},
+            'circuit_breaker': self.breakers.get_stats(),
+            'router': self.router.get_stats(),
+            'cascade': self.cascade.get_stats(),
+            'retries': self.retries.get_stats(),
+            'output_budget': self.output_budget.get_stats(),
+            'usage_ledger': self.usage.get_stats()
+        }
+        if self.single_flight:
+            metrics['single_flight'] = {'all': self.single_flight.get_stats()}
+        if self.cache:
+            metrics['response_cache'] = {'all': self.cache.get_stats()}
+        for component, scoped in metrics.items():
+            collector.collect_pool_metrics(component, scoped)
+        
+        return metrics
+    
+    def close(self):
+        """Flush the usage ledger and output budgets and stop background work"""
+        self.usage.close()
+        self.output_budget.save()
+        self._hedge_executor.shutdown(wait=False)
+    
     def export_plan_json(self, plan: AggregatedPlan) -> str:
         """Export plan to JSON for Supervisor"""
         return json.dumps({
@@ -578,15 +1537,18 @@ class AIPoolManager:
             "consensus_score": plan.consensus_score,
             "estimated_cost": plan.estimated_cost,
             "estimated_tokens": plan.estimated_tokens,
+            "estimated_time_seconds": max((r.latency_ms for r in plan.responses), default=0) / 1000,
             "risk_level": plan.risk_level,
             "created_at": plan.created_at,
+            "pending": plan.pending,
             "ai_responses": [
                 {
                     "ai_id": r.ai_id,
                     "role": r.role,
                     "success": r.success,
                     "tokens_used": r.tokens_used,
-                    "cost_usd": r.cost_usd
+                    "cost_usd": r.cost_usd,
+                    "retries": r.retries
                 }
                 for r in plan.responses
             ]
@@ -619,6 +1581,7 @@ def main():
     # Show usage
     usage = pool.get_session_usage()
     print(f"\n📊 Session Usage: {json.dumps(usage, indent=2)}")
+    pool.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Provider Prompt Caching
+Version: 2.5.1
+Purpose: Let providers reuse the fixed ARCHON system prompts between calls
+
+This module:
+1. Marks system prompts as cacheable prefixes (Anthropic cache_control blocks)
+2. Derives stable OpenAI prompt_cache_key values so calls land on warm caches
+3. Reads cached prompt token counts from each provider's usage block
+4. Prices cached tokens at the provider's discounted rate
+"""
+
+import hashlib
+from typing import Dict, Any, List, Optional
+
+
+# Share of the per-token price saved on cached prompt tokens
+CACHED_TOKEN_DISCOUNT: Dict[str, float] = {
+    'openai': 0.50,
+    'anthropic': 0.90,
+    'deepseek': 0.90,
+    'google': 0.75
+}
+
+
+def anthropic_system(system: str) -> List[Dict[str, Any]]:
+    """System prompt as a content block ending the cacheable prefix"""
+    return [{
+        "type": "text",
+        "text": system,
+        "cache_control": {"type": "ephemeral"}
+    }]
+
+
+def prompt_cache_key(scope: str, system: Optional[str]) -> str:
+    """
+    Stable routing key for OpenAI prompt caching
+    
+    Requests sharing a key (and prefix) are routed to the same cache, so
+    every call with the same role prompt reuses it.
+    """
+    digest = hashlib.sha256((system or '').encode()).hexdigest()[:16]
+    return f"archon-{scope}-{digest}"
+
+
+def cached_tokens(usage: Dict[str, Any]) -> int:
+    """Cached prompt tokens reported in a usage block (any provider format)"""
+    if not usage:
+        return 0
+    # OpenAI
+    details = usage.get('prompt_tokens_details') or {}
+    if details.get('cached_tokens'):
+        return details['cached_tokens']
+    # DeepSeek, Anthropic, Gemini
+    for field in ('prompt_cache_hit_tokens', 'cache_read_input_tokens', 'cachedContentTokenCount'):
+        if usage.get(field):
+            return usage[field]
+    return 0
+
+
+def cached_cost(tokens: int, cached: int, cost_per_token: float, api_key: str) -> float:
+    """Cost of a call with `cached` of its tokens served from the prompt cache"""
+    discount = CACHED_TOKEN_DISCOUNT.get(api_key, 0.0)
+    return (tokens - cached * discount) * cost_per_token
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - AI Pool Rate Limiter
+Version: 2.5.1
+Purpose: Enforce decision_pool.yaml rate limits before requests are sent
+
+This module:
+1. Keeps request and token buckets per model (requests/tokens per minute)
+2. Queues callers by priority class with weighted fair queuing per model
+3. Holds back preemptible (background) calls while higher classes wait
+4. Reconciles estimated token usage with the provider's actual count
+5. Tracks queue depth and wait time per model and class for telemetry
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a call would wait longer than allowed for capacity"""
+    pass
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate_per_minute"""
+    
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.refill_per_second = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+    
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.available = min(self.capacity, self.available + elapsed * self.refill_per_second)
+        self.updated_at = now
+    
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be consumed (0 if available now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_per_second
+    
+    def consume(self, amount: float):
+        self.available -= min(amount, self.capacity)
+    
+    def refund(self, amount: float):
+        self.available = min(self.capacity, self.available + amount)
+
+
+class ProviderLimits:
+    """Request and token buckets for one model"""
+    
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+    
+    def wait_time(self, tokens: float, now: float, reserve: float = 0.0) -> float:
+        """Seconds until the call fits, leaving `reserve` of each bucket untouched"""
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1 + reserve * self.requests.capacity, now))
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.wait_time(tokens + reserve * self.tokens.capacity, now))
+        return wait
+    
+    def consume(self, tokens: float):
+        if self.requests:
+            self.requests.consume(1)
+        if self.tokens and tokens:
+            self.tokens.consume(tokens)
+
+
+@dataclass
+class PriorityClass:
+    """Scheduling class of a caller (pool_settings.priorities.classes)"""
+    name: str
+    weight: float = 1.0               # Share of a model's capacity under contention
+    preemptible: bool = False         # Yield to waiting calls of non-preemptible classes
+    reserve: float = 0.0              # Fraction of each bucket this class may not use
+    max_wait: Optional[float] = None  # Overrides rate_limiting.max_wait_seconds
+    
+    @property
+    def rank(self) -> Tuple[bool, float]:
+        """Orders classes by urgency: non-preemptible first, then by weight"""
+        return not self.preemptible, self.weight
+
+
+DEFAULT_PRIORITIES: Dict[str, Any] = {
+    'default': 'interactive',
+    'classes': {
+        'interactive': {'weight': 8},
+        'pipeline': {'weight': 3},
+        'background': {'weight': 1, 'preemptible': True, 'reserve': 0.2}
+    }
+}
+
+
+class _Waiter:
+    """A queued acquire call with its fair-queuing tags"""
+    
+    __slots__ = ('priority', 'start', 'finish')
+    
+    def __init__(self, priority: PriorityClass, start: float, finish: float):
+        self.priority = priority
+        self.start = start
+        self.finish = finish
+
+
+class ProviderRateLimiter:
+    """
+    ARCHON Provider Rate Limiter
+    Token-bucket scheduler keyed by AI model id
+    
+    Waiting callers are served in order of their weighted fair queuing
+    finish tag, so each priority class gets capacity in proportion to its
+    weight. Preemptible classes are held back while any other class is
+    waiting on the same model and never use their reserved headroom.
+    """
+    
+    def __init__(self, ai_pool: Dict[str, Any], priorities: Optional[Dict[str, Any]] = None):
+        self.limits: Dict[str, ProviderLimits] = {}
+        for ai_id, ai_config in ai_pool.items():
+            rate_limit = (ai_config or {}).get('rate_limit', {})
+            if rate_limit.get('requests_per_minute') or rate_limit.get('tokens_per_minute'):
+                self.limits[ai_id] = ProviderLimits(
+                    rate_limit.get('requests_per_minute'),
+                    rate_limit.get('tokens_per_minute')
+                )
+        
+        priorities = priorities or DEFAULT_PRIORITIES
+        self.classes: Dict[str, PriorityClass] = {
+            name: self._priority_class(name, cfg or {})
+            for name, cfg in (priorities.get('classes') or DEFAULT_PRIORITIES['classes']).items()
+        }
+        self.default_class = priorities.get('default', 'interactive')
+        if self.default_class not in self.classes:
+            self.classes[self.default_class] = PriorityClass(self.default_class)
+        
+        self._cond = threading.Condition()
+        self._queues: Dict[str, List[_Waiter]] = {ai_id: [] for ai_id in self.limits}
+        self._virtual_time: Dict[str, float] = {ai_id: 0.0 for ai_id in self.limits}
+        self._last_finish: Dict[str, Dict[str, float]] = {ai_id: {} for ai_id in self.limits}
+        self._stats: Dict[str, Dict[str, float]] = {
+            ai_id: {
+                'acquired': 0,
+                'throttled': 0,
+                'rejected': 0,
+                'queue_depth': 0,
+                'max_queue_depth': 0,
+                'total_wait_ms': 0.0,
+                'max_wait_ms': 0.0
+            }
+            for ai_id in self.limits
+        }
+        self._class_stats: Dict[str, Dict[str, Dict[str, float]]] = {ai_id: {} for ai_id in self.limits}
+    
+    @staticmethod
+    def _priority_class(name: str, cfg: Dict[str, Any]) -> PriorityClass:
+        """Build a class from its config; weights must be positive (finish tags divide by them)"""
+        weight = cfg.get('weight', 1.0)
+        if not isinstance(weight, (int, float)) or weight <= 0:
+            print(f"Warning: Priority class '{name}' has invalid weight {weight!r}, using 1")
+            weight = 1.0
+        return PriorityClass(name, float(weight), cfg.get('preemptible', False),
+                             cfg.get('reserve', 0.0), cfg.get('max_wait_seconds'))
+    
+    def priority(self, name: Optional[str]) -> PriorityClass:
+        """Scheduling class by name (unknown names get the default class)"""
+        return self.classes.get(name or self.default_class) or self.classes[self.default_class]
+    
+    def acquire(self, ai_id: str, tokens: float = 0,
+                max_wait: Optional[float] = None,
+                priority: Optional[str] = None) -> float:
+        """
+        Block until the model has request and token capacity, then consume it
+        
+        Args:
+            ai_id: Model identifier
+            tokens: Estimated tokens for the call
+            max_wait: Give up after this many seconds (the class's
+                      max_wait_seconds takes precedence)
+            priority: Scheduling class (defaults to pool_settings.priorities.default)
+        
+        Returns:
+            Seconds spent waiting
+        
+        Raises:
+            RateLimitTimeout: If capacity would not free up within max_wait
+        """
+        limits = self.limits.get(ai_id)
+        if limits is None:
+            return 0.0
+        
+        priority_class = self.priority(priority)
+        if priority_class.max_wait is not None:
+            max_wait = priority_class.max_wait
+        start = time.monotonic()
+        stats = self._stats[ai_id]
+        held_back = False
+        
+        with self._cond:
+            queue = self._queues[ai_id]
+            ticket = self._enqueue(ai_id, priority_class, tokens if limits.tokens and tokens else 1)
+            stats['queue_depth'] = len(queue)
+            stats['max_queue_depth'] = max(stats['max_queue_depth'], len(queue))
+            
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    
+                    # Only the next waiter in fair-queuing order may take capacity
+                    head = self._next_waiter(queue)
+                    if head is ticket:
+                        wait = limits.wait_time(tokens, now, priority_class.reserve)
+                        if wait <= 0:
+                            limits.consume(tokens)
+                            # Self-clocked: virtual time is the finish tag in service
+                            self._virtual_time[ai_id] = max(self._virtual_time[ai_id], ticket.finish)
+                            break
+                    elif priority_class.preemptible and not head.priority.preemptible:
+                        held_back = True
+                    
+                    if max_wait is not None:
+                        remaining = max_wait - (now - start)
+                        if remaining <= 0 or (wait is not None and wait > remaining):
+                            stats['rejected'] += 1
+                            self._withdraw(ai_id, ticket)
+                            raise RateLimitTimeout(
+                                f"{ai_id} rate limit: no capacity within {max_wait:.0f}s"
+                            )
+                        wait = remaining if wait is None else wait
+                    
+                    self._cond.wait(wait)
+            finally:
+                queue.remove(ticket)
+                stats['queue_depth'] = len(queue)
+                self._cond.notify_all()
+            
+            waited = time.monotonic() - start
+            self._record_wait(ai_id, priority_class.name, waited, held_back)
+        
+        return waited
+    
+    def _enqueue(self, ai_id: str, priority_class: PriorityClass, cost: float) -> _Waiter:
+        """
+        Queue a waiter with its fair-queuing tags (lock held)
+        
+        A class's next call starts where its previous call finished (or at
+        the model's virtual time if the class was idle) and finishes
+        cost / weight later, so heavier classes advance more slowly.
+        """
+        last_finish = self._last_finish[ai_id]
+        start = max(self._virtual_time[ai_id], last_finish.get(priority_class.name, 0.0))
+        waiter = _Waiter(priority_class, start, start + cost / priority_class.weight)
+        last_finish[priority_class.name] = waiter.finish
+        self._queues[ai_id].append(waiter)
+        return waiter
+    
+    def _withdraw(self, ai_id: str, ticket: _Waiter):
+        """
+        Give back the virtual time of a waiter that timed out (lock held)
+        
+        Its class was charged cost / weight at enqueue time; without the
+        refund, every timeout would push the class's later calls back.
+        """
+        name = ticket.priority.name
+        charge = ticket.finish - ticket.start
+        for waiter in self._queues[ai_id]:
+            if waiter.priority.name == name and waiter.finish > ticket.finish:
+                waiter.start -= charge
+                waiter.finish -= charge
+        last_finish = self._last_finish[ai_id]
+        last_finish[name] = max(ticket.start, last_finish[name] - charge)
+    
+    @staticmethod
+    def _next_waiter(queue: List[_Waiter]) -> _Waiter:
+        """Waiter served next: smallest finish tag, preemptible classes last"""
+        urgent = [w for w in queue if not w.priority.preemptible]
+        return min(urgent or queue, key=lambda w: w.finish)
+    
+    def try_acquire(self, ai_id: str, tokens: float = 0,
+                    priority: Optional[str] = None) -> float:
+        """
+        Non-blocking acquire for event-loop callers
+        
+        Returns:
+            0 if capacity was consumed, otherwise seconds to wait before retrying
+        """
+        limits = self.limits.get(ai_id)
+        if limits is None:
+            return 0.0
+        
+        priority_class = self.priority(priority)
+        with self._cond:
+            queue = self._queues[ai_id]
+            if queue and (priority_class.preemptible
+                          or any(not w.priority.preemptible for w in queue)):
+                return 0.05  # Let blocking callers ahead in the queue go first
+            wait = limits.wait_time(tokens, time.monotonic(), priority_class.reserve)
+            if wait <= 0:
+                limits.consume(tokens)
+            return wait
+    
+    def record_async_wait(self, ai_id: str, waited: float, priority: Optional[str] = None):
+        """Record time an event-loop caller spent waiting for capacity"""
+        if ai_id in self._stats:
+            with self._cond:
+                self._record_wait(ai_id, self.priority(priority).name, waited)
+    
+    def _record_wait(self, ai_id: str, priority: str, waited: float, held_back: bool = False):
+        """Update wait counters for the model and the priority class (lock held)"""
+        waited_ms = waited * 1000
+        for stats in (self._stats[ai_id],
+                      self._class_stats[ai_id].setdefault(
+                          priority, {'acquired': 0, 'throttled': 0, 'held_back': 0,
+                                     'total_wait_ms': 0.0, 'max_wait_ms': 0.0})):
+            stats['acquired'] += 1
+            if waited_ms > 1:
+                stats['throttled'] += 1
+            stats['total_wait_ms'] += waited_ms
+            stats['max_wait_ms'] = max(stats['max_wait_ms'], waited_ms)
+        if held_back:
+            self._class_stats[ai_id][priority]['held_back'] += 1
+    
+    def reconcile(self, ai_id: str, estimated_tokens: float, actual_tokens: float):
+        """Return over-estimated tokens to the bucket (or charge the shortfall)"""
+        limits = self.limits.get(ai_id)
+        if limits is None or limits.tokens is None:
+            return
+        
+        with self._cond:
+            difference = estimated_tokens - actual_tokens
+            if difference > 0:
+                limits.tokens.refund(difference)
+            else:
+                limits.tokens.consume(-difference)
+            self._cond.notify_all()
+    
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get queue depth and wait time per model"""
+        with self._cond:
+            now = time.monotonic()
+            result = {}
+            for ai_id, stats in self._stats.items():
+                limits = self.limits[ai_id]
+                entry = dict(stats)
+                entry['total_wait_ms'] = round(entry['total_wait_ms'], 2)
+                entry['max_wait_ms'] = round(entry['max_wait_ms'], 2)
+                entry['avg_wait_ms'] = round(stats['total_wait_ms'] / stats['acquired'], 2) \
+                    if stats['acquired'] else 0.0
+                if limits.requests:
+                    limits.requests._refill(now)
+                    entry['requests_available'] = round(limits.requests.available, 2)
+                if limits.tokens:
+                    limits.tokens._refill(now)
+                    entry['tokens_available'] = round(limits.tokens.available, 2)
+                entry['priorities'] = {
+                    name: {**counters,
+                           'total_wait_ms': round(counters['total_wait_ms'], 2),
+                           'max_wait_ms': round(counters['max_wait_ms'], 2),
+                           'avg_wait_ms': round(counters['total_wait_ms'] / counters['acquired'], 2)}
+                    for name, counters in self._class_stats[ai_id].items()
+                }
+                result[ai_id] = entry
+            return result
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - AI Response Cache
+Version: 2.5.1
+Purpose: Content-addressed cache for AI pool model responses
+
+This module:
+1. Keys responses by provider, model, prompts and generation parameters
+2. Serves hot entries from an in-memory LRU tier with TTL
+3. Persists entries to a SQLite tier next to memory_store.sqlite
+4. Purges expired SQLite entries on start-up and every purge_every stores
+5. Counts hits, misses and evictions for usage reporting
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    from ..storage.sqlite_storage import get_storage
+    from ..storage.migrations import migrate
+except ImportError:
+    from storage.sqlite_storage import get_storage
+    from storage.migrations import migrate
+
+
+class ResponseCache:
+    """
+    ARCHON Response Cache
+    Two-tier (memory LRU + SQLite) cache of successful model responses
+    """
+    
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600,
+                 db_path: Optional[str] = None, purge_every: int = 1000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.purge_every = purge_every
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'stores': 0
+        }
+        
+        if self.db_path:
+            self.storage = get_storage(self.db_path)
+            self._init_database()
+    
+    def _init_database(self):
+        """Initialize the persistent cache tier and drop what expired while it was closed"""
+        try:
+            migrate(self.storage)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not initialize response cache: {e}")
+            self.db_path = None
+            return
+        self.purge_expired()
+    
+    @staticmethod
+    def make_key(provider: str, model: str, system: Optional[str], prompt: str,
+                 params: Dict[str, Any]) -> str:
+        """Build the content address for a model request"""
+        material = json.dumps({
+            'provider': provider,
+            'model': model,
+            'system': system,
+            'prompt': prompt,
+            'params': params
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+        
+        Returns:
+            Cached response fields, or None on a miss
+        """
+        now = time.time()
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats['hits'] += 1
+                    self.stats['memory_hits'] += 1
+                    return value
+                del self._memory[key]
+                self.stats['expirations'] += 1
+        
+        value, expires_at = self._disk_get(key, now)
+        
+        with self._lock:
+            if value is None:
+                self.stats['misses'] += 1
+                return None
+            
+            self.stats['hits'] += 1
+            self.stats['disk_hits'] += 1
+            self._memory_put(key, value, expires_at)
+            return value
+    
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store a response in both tiers"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        
+        with self._lock:
+            self._memory_put(key, value, expires_at)
+            self.stats['stores'] += 1
+            purge = bool(self.purge_every) and self.stats['stores'] % self.purge_every == 0
+        
+        if self.db_path:
+            try:
+                self.storage.execute("""
+                    INSERT OR REPLACE INTO response_cache (key, value, created_at, expires_at)
+                    VALUES (?, ?, ?, ?)
+                """, (key, json.dumps(value), now, expires_at))
+            except Exception as e:
+                print(f"Warning: Could not persist cached response: {e}")
+            if purge:
+                self.purge_expired()
+    
+    def _memory_put(self, key: str, value: Dict[str, Any], expires_at: float):
+        """Insert into the LRU tier, evicting the oldest entries (lock held)"""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+    
+    def _disk_get(self, key: str, now: float) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Look up the persistent tier"""
+        if not self.db_path:
+            return None, 0.0
+        
+        try:
+            row = self.storage.query_one(
+                "SELECT value, expires_at FROM response_cache WHERE key = ? AND expires_at > ?",
+                (key, now)
+            )
+        except Exception as e:
+            print(f"Warning: Could not read response cache: {e}")
+            return None, 0.0
+        
+        if not row:
+            return None, 0.0
+        return json.loads(row[0]), row[1]
+    
+    def purge_expired(self) -> int:
+        """Remove expired entries from the persistent tier"""
+        if not self.db_path:
+            return 0
+        
+        try:
+            removed = self.storage.execute(
+                "DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+        except sqlite3.Error as e:
+            print(f"Warning: Could not purge response cache: {e}")
+            return 0
+        
+        with self._lock:
+            self.stats['expirations'] += removed
+        return removed
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._memory),
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+            }
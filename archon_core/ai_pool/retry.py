@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - AI Pool Retry Policies
+Version: 2.5.1
+Purpose: Retry transient provider failures without blowing the plan deadline
+
+This module:
+1. Builds a retry policy per model (pool_settings.retry, per-API and per-model overrides)
+2. Classifies failed calls as retryable (429, 5xx, network errors)
+3. Honours Retry-After / retry-after-ms and otherwise backs off with decorrelated jitter
+4. Counts retries, recoveries and added latency per model for telemetry
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple
+
+
+DEFAULT_STATUSES = (408, 409, 429, 500, 502, 503, 504)
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """
+    Seconds to wait from retry-after-ms or Retry-After (seconds or HTTP date)
+    
+    Returns:
+        Delay in seconds, or None if the provider did not send one
+    """
+    if not headers:
+        return None
+    
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """Retry behaviour for one model"""
+    max_attempts: int = 3             # Including the first call
+    base_delay: float = 0.25          # Seconds
+    max_delay: float = 8.0
+    max_retry_after: float = 30.0     # Give up if the provider asks for a longer pause
+    statuses: Tuple[int, ...] = DEFAULT_STATUSES
+    network_errors: bool = True       # Retry calls that failed without an HTTP status
+    
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> 'RetryPolicy':
+        return cls(
+            max_attempts=settings.get('max_attempts', 3),
+            base_delay=settings.get('base_delay_ms', 250) / 1000,
+            max_delay=settings.get('max_delay_ms', 8000) / 1000,
+            max_retry_after=settings.get('max_retry_after_seconds', 30),
+            statuses=tuple(settings.get('statuses', DEFAULT_STATUSES)),
+            network_errors=settings.get('network_errors', True)
+        )
+    
+    def retryable(self, status_code: Optional[int]) -> bool:
+        """Whether a failed call with this HTTP status (None = no response) may be retried"""
+        if status_code is None:
+            return self.network_errors
+        return status_code in self.statuses
+    
+    def next_delay(self, previous: float, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Pause before the next attempt
+        
+        Decorrelated jitter: uniform between the base delay and three times
+        the previous pause, capped at max_delay. A provider Retry-After is
+        used as the lower bound.
+        
+        Returns:
+            Seconds to wait, or None if the provider asked for too long a pause
+        """
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return None
+        delay = min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+        return max(delay, retry_after or 0.0)
+
+
+@dataclass
+class RetryCounters:
+    retries: int = 0
+    recovered: int = 0          # Calls that succeeded after retrying
+    exhausted: int = 0          # Calls still failing after max_attempts
+    deadline_skipped: int = 0   # Retries dropped: past the plan deadline or Retry-After too long
+    retry_after_honoured: int = 0
+    added_latency_ms: float = 0.0
+    by_status: Dict[str, int] = field(default_factory=dict)
+
+
+class ProviderRetries:
+    """
+    ARCHON Provider Retries
+    Retry policies and counters keyed by AI model id
+    """
+    
+    def __init__(self, settings: Dict[str, Any], ai_pool: Dict[str, Any],
+                 providers: Dict[str, Dict[str, Any]]):
+        self.enabled = settings.get('enabled', True)
+        defaults = {k: v for k, v in settings.items() if k not in ('enabled', 'providers')}
+        per_api = settings.get('providers') or {}
+        
+        self.policies: Dict[str, RetryPolicy] = {}
+        for ai_id, spec in providers.items():
+            merged = {**defaults, **(per_api.get(spec['api']) or {}),
+                      **((ai_pool.get(ai_id) or {}).get('retry') or {})}
+            self.policies[ai_id] = RetryPolicy.from_settings(merged)
+        
+        self._lock = threading.Lock()
+        self._counters: Dict[str, RetryCounters] = {}
+    
+    def policy(self, ai_id: str) -> RetryPolicy:
+        return self.policies.get(ai_id) or RetryPolicy()
+    
+    def plan_retry(self, ai_id: str, attempt: int, previous_delay: float,
+                   status_code: Optional[int], retry_after: Optional[float],
+                   deadline: Optional[float]) -> Optional[float]:
+        """
+        Decide whether a failed attempt is retried
+        
+        Args:
+            ai_id: Model identifier
+            attempt: Attempts made so far
+            previous_delay: Pause before the failed attempt (0 for the first call)
+            status_code: HTTP status of the failure (None if no response)
+            retry_after: Provider-requested pause in seconds
+            deadline: Plan deadline (time.monotonic() value)
+        
+        Returns:
+            Seconds to wait before retrying, or None to give up
+        """
+        policy = self.policy(ai_id)
+        if not self.enabled or not policy.retryable(status_code):
+            return None
+        
+        with self._lock:
+            counters = self._counters.setdefault(ai_id, RetryCounters())
+            if attempt >= policy.max_attempts:
+                counters.exhausted += 1
+                return None
+            
+            delay = policy.next_delay(previous_delay, retry_after)
+            if delay is None or (deadline is not None and time.monotonic() + delay >= deadline):
+                counters.deadline_skipped += 1
+                return None
+            
+            counters.retries += 1
+            if retry_after is not None:
+                counters.retry_after_honoured += 1
+            status = str(status_code) if status_code is not None else 'network'
+            counters.by_status[status] = counters.by_status.get(status, 0) + 1
+            return delay
+    
+    def record(self, ai_id: str, success: bool, added_latency_ms: float):
+        """Record the outcome of a call that was retried"""
+        with self._lock:
+            counters = self._counters.setdefault(ai_id, RetryCounters())
+            if success:
+                counters.recovered += 1
+            counters.added_latency_ms += added_latency_ms
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get retry counters per model"""
+        with self._lock:
+            result = {'all': {'retries': sum(c.retries for c in self._counters.values()),
+                              'recovered': sum(c.recovered for c in self._counters.values()),
+                              'enabled': self.enabled}}
+            for ai_id, counters in self._counters.items():
+                result[ai_id] = {
+                    'retries': counters.retries,
+                    'recovered': counters.recovered,
+                    'exhausted': counters.exhausted,
+                    'deadline_skipped': counters.deadline_skipped,
+                    'retry_after_honoured': counters.retry_after_honoured,
+                    'added_latency_ms': round(counters.added_latency_ms, 2),
+                    'by_status': dict(counters.by_status)
+                }
+            return result
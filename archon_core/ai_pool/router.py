@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Adaptive Model Router
+Version: 2.5.1
+Purpose: Choose which AI pool models to consult for a task type
+
+This module:
+1. Tracks rolling per-model success rate, latency and cost, seeded from ai_performance
+2. Drops slow or failing models from a plan's consultations
+3. Adds models by value (trust x success per latency/cost) until a quality floor is met
+"""
+
+import os
+import sqlite3
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional, Callable
+
+try:
+    from ..storage.sqlite_storage import get_storage
+except ImportError:
+    from storage.sqlite_storage import get_storage
+
+
+class ModelStats:
+    """Rolling outcome window for one model"""
+    
+    def __init__(self, window: int):
+        self.samples: deque = deque(maxlen=window)  # (calls, successes, latency_ms, cost_usd)
+    
+    def add(self, calls: int, successes: int, latency_ms: float, cost_usd: float):
+        self.samples.append((calls, successes, latency_ms, cost_usd))
+    
+    @property
+    def calls(self) -> int:
+        return sum(s[0] for s in self.samples)
+    
+    def summary(self) -> Dict[str, float]:
+        """Success rate, call-weighted latency and cost per call"""
+        calls = self.calls
+        if not calls:
+            return {'calls': 0, 'success_rate': 1.0, 'avg_latency_ms': 0.0, 'cost_per_call': 0.0}
+        return {
+            'calls': calls,
+            'success_rate': sum(s[1] for s in self.samples) / calls,
+            'avg_latency_ms': sum(s[0] * s[2] for s in self.samples) / calls,
+            'cost_per_call': sum(s[3] for s in self.samples) / calls
+        }
+
+
+class ModelRouter:
+    """
+    ARCHON Model Router
+    Latency- and cost-aware selection of plan consultations
+    """
+    
+    def __init__(self, settings: Dict[str, Any], trust_weights: Dict[str, float],
+                 db_path: Optional[str] = None):
+        self.enabled = settings.get('enabled', True)
+        self.window = settings.get('window', 200)
+        self.min_samples = settings.get('min_samples', 10)
+        self.min_success_rate = settings.get('min_success_rate', 0.80)
+        self.max_latency_ms = settings.get('max_latency_ms', 30000)
+        self.latency_weight = settings.get('latency_weight', 1.0)  # Penalty per second
+        self.cost_weight = settings.get('cost_weight', 1.0)        # Penalty per cent
+        self.task_types: Dict[str, Dict[str, Any]] = settings.get('task_types', {})
+        self.trust_weights = trust_weights
+        self._models: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+        self.stats = {'routed_plans': 0, 'consulted': 0, 'skipped': 0, 'unhealthy_skipped': 0,
+                      'floor_missed': 0}
+        
+        if db_path:
+            self._seed_from_db(db_path)
+    
+    def _seed_from_db(self, db_path: str):
+        """Load recent per-model outcomes recorded in ai_performance"""
+        if not os.path.exists(db_path):
+            return
+        
+        try:
+            rows = get_storage(db_path).query("""
+                SELECT ai_id, success_count, failure_count, avg_latency_ms, total_cost_usd
+                FROM ai_performance
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (self.window * 5,))
+        except sqlite3.Error:
+            return  # No ai_performance history yet
+        
+        # Oldest first so the newest rows stay in the window
+        for ai_id, successes, failures, latency_ms, cost_usd in reversed(rows):
+            calls = (successes or 0) + (failures or 0)
+            if calls:
+                self._stats_for(ai_id).add(calls, successes or 0, latency_ms or 0.0, cost_usd or 0.0)
+    
+    def _stats_for(self, ai_id: str) -> ModelStats:
+        with self._lock:
+            stats = self._models.get(ai_id)
+            if stats is None:
+                stats = self._models[ai_id] = ModelStats(self.window)
+            return stats
+    
+    def record(self, ai_id: str, success: bool, latency_ms: float, cost_usd: float):
+        """Add a live call outcome"""
+        stats = self._stats_for(ai_id)
+        with self._lock:
+            stats.add(1, int(success), latency_ms, cost_usd)
+    
+    def model_summary(self, ai_id: str) -> Dict[str, float]:
+        stats = self._stats_for(ai_id)
+        with self._lock:
+            return stats.summary()
+    
+    def is_healthy(self, ai_id: str) -> bool:
+        """Failing or slow models are skipped once enough samples exist"""
+        summary = self.model_summary(ai_id)
+        if summary['calls'] < self.min_samples:
+            return True
+        return (summary['success_rate'] >= self.min_success_rate
+                and summary['avg_latency_ms'] <= self.max_latency_ms)
+    
+    def expected_quality(self, ai_id: str) -> float:
+        """Trust weight discounted by the model's success rate"""
+        return self.trust_weights.get(ai_id, 0.0) * self.model_summary(ai_id)['success_rate']
+    
+    def value(self, ai_id: str) -> float:
+        """Expected quality per unit of latency and cost penalty"""
+        summary = self.model_summary(ai_id)
+        penalty = (self.latency_weight * summary['avg_latency_ms'] / 1000
+                   + self.cost_weight * summary['cost_per_call'] * 100)
+        return self.expected_quality(ai_id) / (1.0 + penalty)
+    
+    def select(self, ai_ids: List[str], task_type: Optional[str],
+               available: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """
+        Pick the models to consult for a task type
+        
+        Required models from the task type profile are kept when healthy.
+        Remaining healthy models are added best value first until the
+        expected quality reaches the profile's quality_floor (a fraction
+        of the full pool's trust weight). Without a profile, or if the
+        floor cannot be met with healthy models, every model is consulted.
+        
+        Args:
+            ai_ids: Candidate models in consultation order
+            task_type: Task type key under routing.task_types
+            available: Extra availability check (e.g. circuit breaker)
+        
+        Returns:
+            Selected models, in the original consultation order
+        """
+        profile = self.task_types.get(task_type) if task_type else None
+        if not self.enabled or profile is None:
+            return list(ai_ids)
+        
+        full_quality = sum(self.trust_weights.get(ai_id, 0.0) for ai_id in ai_ids)
+        floor = profile.get('quality_floor', 1.0) * full_quality
+        
+        healthy = [ai_id for ai_id in ai_ids
+                   if self.is_healthy(ai_id) and (available is None or available(ai_id))]
+        selected = [ai_id for ai_id in profile.get('required', []) if ai_id in healthy]
+        quality = sum(self.expected_quality(ai_id) for ai_id in selected)
+        
+        for ai_id in sorted((a for a in healthy if a not in selected), key=self.value, reverse=True):
+            if quality >= floor:
+                break
+            selected.append(ai_id)
+            quality += self.expected_quality(ai_id)
+        
+        with self._lock:
+            self.stats['routed_plans'] += 1
+            if quality < floor:
+                self.stats['floor_missed'] += 1
+                self.stats['consulted'] += len(ai_ids)
+                return list(ai_ids)
+            self.stats['unhealthy_skipped'] += len(ai_ids) - len(healthy)
+            self.stats['consulted'] += len(selected)
+            self.stats['skipped'] += len(ai_ids) - len(selected)
+        
+        return [ai_id for ai_id in ai_ids if ai_id in selected]
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get routing counters and per-model rolling stats"""
+        with self._lock:
+            result = {'all': dict(self.stats)}
+            ai_ids = list(self._models)
+        for ai_id in ai_ids:
+            entry = {k: round(v, 6) for k, v in self.model_summary(ai_id).items()}
+            entry['healthy'] = int(self.is_healthy(ai_id))
+            result[ai_id] = entry
+        return result
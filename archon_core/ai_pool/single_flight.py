@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Single-Flight Request Coalescing
+Version: 2.5.1
+Purpose: Share one in-flight model call between identical concurrent requests
+
+This module:
+1. Lets the first caller for a request key make the provider call
+2. Parks concurrent callers with the same key until that call finishes
+3. Lets callers join only calls of equal or higher priority rank
+4. Provides thread and asyncio variants with shared counters
+"""
+
+import asyncio
+import threading
+from typing import Dict, Any, Callable, Awaitable, Optional, Tuple
+
+
+class _Call:
+    """An in-flight call that followers wait on"""
+    
+    def __init__(self, rank: Tuple):
+        self.rank = rank
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    ARCHON Single-Flight Group
+    Coalesces identical concurrent calls made from worker threads
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = {'leaders': 0, 'coalesced': 0, 'outranked': 0}
+    
+    def do(self, key: str, fn: Callable[[], Any], rank: Tuple = ()) -> Tuple[Any, bool]:
+        """
+        Run fn once per key across concurrent callers
+        
+        Args:
+            key: Request key
+            fn: The call to share
+            rank: Priority of the caller; a caller never waits on a call
+                  of lower rank and runs its own instead (later callers
+                  then join the higher-ranked call)
+        
+        Returns:
+            Tuple of (result, shared) where shared is True for callers
+            that received another caller's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None or call.rank < rank
+            if leader:
+                if call is not None:
+                    self.stats['outranked'] += 1
+                call = self._calls[key] = _Call(rank)
+                self.stats['leaders'] += 1
+            else:
+                self.stats['coalesced'] += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        
+        return call.result, False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'in_flight': len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    ARCHON Async Single-Flight Group
+    Coalesces identical concurrent calls on one event loop
+    
+    The shared call runs as its own task. It is cancelled only when every
+    caller waiting on it has been cancelled.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, Tuple[asyncio.Future, list, Tuple]] = {}
+        self.stats = {'leaders': 0, 'coalesced': 0, 'outranked': 0}
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]],
+                 rank: Tuple = ()) -> Tuple[Any, bool]:
+        """Await fn once per key across concurrent callers; see SingleFlight.do"""
+        entry = self._calls.get(key)
+        shared = entry is not None and not entry[2] < rank
+        if shared:
+            self.stats['coalesced'] += 1
+        else:
+            if entry is not None:
+                self.stats['outranked'] += 1
+            task = asyncio.ensure_future(fn())
+            entry = self._calls[key] = (task, [0], rank)
+            self.stats['leaders'] += 1
+            
+            def forget(_):
+                if self._calls.get(key) is entry:
+                    del self._calls[key]
+            task.add_done_callback(forget)
+        
+        task, waiters, _ = entry
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            if not task.done() and waiters[0] == 1:
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'in_flight': len(self._calls)}
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Provider Streaming Support
+Version: 2.5.1
+Purpose: Incremental consumption of provider SSE streams
+
+This module:
+1. Parses server-sent event lines into JSON events
+2. Accumulates text deltas and usage for OpenAI, Anthropic and Gemini streams
+3. Provides stop predicates for ending generation early
+"""
+
+import json
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+try:
+    from .prompt_cache import cached_tokens
+except ImportError:
+    from prompt_cache import cached_tokens
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield JSON payloads from SSE `data:` lines
+    
+    Stops at the OpenAI-style `[DONE]` sentinel; blank lines, comments and
+    `event:` lines are skipped (event types are also present in the payloads).
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line.startswith('data:'):
+            continue
+        
+        data = line[5:].strip()
+        if data == '[DONE]':
+            return
+        if not data:
+            continue
+        
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+class StreamAccumulator:
+    """Collects text and token usage from one provider stream"""
+    
+    def __init__(self, api: str):
+        self.api = api
+        self.parts = []
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.total_tokens = 0
+        self.cached_tokens = 0  # Prompt tokens served from the provider's prefix cache
+        self.finish_reason: Optional[str] = None
+    
+    @property
+    def text(self) -> str:
+        return ''.join(self.parts)
+    
+    @property
+    def tokens(self) -> int:
+        """Reported token usage (0 if the stream ended before usage was sent)"""
+        return self.total_tokens or (self.input_tokens + self.output_tokens)
+    
+    def feed(self, event: Dict[str, Any]) -> str:
+        """
+        Consume one stream event
+        
+        Returns:
+            The text delta carried by the event ('' if none)
+        """
+        if self.api == 'anthropic':
+            delta = self._feed_anthropic(event)
+        elif self.api == 'gemini':
+            delta = self._feed_gemini(event)
+        else:
+            delta = self._feed_openai(event)
+        
+        if delta:
+            self.parts.append(delta)
+        return delta
+    
+    def _feed_openai(self, event: Dict[str, Any]) -> str:
+        usage = event.get('usage') or {}
+        if usage:
+            self.input_tokens = usage.get('prompt_tokens', 0)
+            self.output_tokens = usage.get('completion_tokens', 0)
+            self.total_tokens = usage.get('total_tokens', 0)
+            self.cached_tokens = cached_tokens(usage)
+        
+        choices = event.get('choices') or []
+        if not choices:
+            return ''
+        if choices[0].get('finish_reason'):
+            self.finish_reason = choices[0]['finish_reason']
+        return (choices[0].get('delta') or {}).get('content') or ''
+    
+    def _feed_anthropic(self, event: Dict[str, Any]) -> str:
+        event_type = event.get('type')
+        
+        if event_type == 'message_start':
+            usage = event.get('message', {}).get('usage', {})
+            self.cached_tokens = usage.get('cache_read_input_tokens') or 0
+            self.input_tokens = (usage.get('input_tokens', 0) + self.cached_tokens
+                                 + (usage.get('cache_creation_input_tokens') or 0))
+        elif event_type == 'message_delta':
+            self.output_tokens = event.get('usage', {}).get('output_tokens', self.output_tokens)
+            self.finish_reason = event.get('delta', {}).get('stop_reason') or self.finish_reason
+        elif event_type == 'content_block_delta':
+            return event.get('delta', {}).get('text', '')
+        return ''
+    
+    def _feed_gemini(self, event: Dict[str, Any]) -> str:
+        usage = event.get('usageMetadata') or {}
+        if usage.get('totalTokenCount'):
+            self.input_tokens = usage.get('promptTokenCount', 0)
+            self.output_tokens = usage.get('candidatesTokenCount', 0) + usage.get('thoughtsTokenCount', 0)
+            self.total_tokens = usage['totalTokenCount']
+            self.cached_tokens = cached_tokens(usage)
+        
+        candidates = event.get('candidates') or []
+        if not candidates:
+            return ''
+        if candidates[0].get('finishReason'):
+            self.finish_reason = candidates[0]['finishReason']
+        parts = (candidates[0].get('content') or {}).get('parts') or []
+        return ''.join(part.get('text', '') for part in parts)
+
+
+def json_plan_complete(text: str) -> bool:
+    """
+    Stop predicate: True once the text contains a complete top-level JSON object
+    
+    Useful for plan prompts that ask for JSON output, so generation can stop
+    as soon as the object closes instead of waiting for trailing prose.
+    """
+    start = text.find('{')
+    if start < 0:
+        return False
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                try:
+                    json.loads(text[start:index + 1])
+                    return True
+                except json.JSONDecodeError:
+                    return False
+    return False
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Pre-flight Token & Cost Estimator
+Version: 2.5.1
+Purpose: Count tokens locally and price model calls before they are sent
+
+This module:
+1. Loads a cached local tokenizer per model (tiktoken, character estimate fallback)
+2. Prices input, cached input and output tokens from ai_pool.<model>.pricing
+3. Predicts input/output tokens and dollar cost of a call before dispatch
+4. Rejects or trims prompts that would not fit the model's context window
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency; counts fall back to a character estimate
+    tiktoken = None
+
+try:
+    from .prompt_cache import cached_cost
+except ImportError:
+    from prompt_cache import cached_cost
+
+
+CHARS_PER_TOKEN = 4       # Fallback estimate for English text and code
+MESSAGE_OVERHEAD = 4      # Chat formatting tokens per message
+TRIM_MARKER = "\n...[trimmed]...\n"
+
+
+class CharTokenizer:
+    """Approximate tokenizer used when no local BPE encoding is available"""
+    
+    name = "approximate"
+    exact = False
+    
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Keep the head and tail of the text within max_tokens"""
+        if self.count(text) <= max_tokens:
+            return text
+        keep = max(0, max_tokens - self.count(TRIM_MARKER)) * CHARS_PER_TOKEN
+        head = keep // 2
+        return text[:head] + TRIM_MARKER + text[len(text) - (keep - head):]
+
+
+class BPETokenizer:
+    """tiktoken encoding wrapper"""
+    
+    exact = True
+    
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.name = encoding.name
+    
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+    
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Keep the head and tail of the text within max_tokens"""
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        keep = max(0, max_tokens - self.count(TRIM_MARKER))
+        head = keep // 2
+        return (self.encoding.decode(tokens[:head]) + TRIM_MARKER
+                + self.encoding.decode(tokens[len(tokens) - (keep - head):]))
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(encoding: Optional[str]):
+    """
+    Load a tokenizer once per encoding name
+    
+    tiktoken reads BPE files from TIKTOKEN_CACHE_DIR (downloading them on
+    first use); if the package or the file is unavailable the character
+    estimate is used instead.
+    """
+    if tiktoken is None or not encoding:
+        return CharTokenizer()
+    try:
+        return BPETokenizer(tiktoken.get_encoding(encoding))
+    except Exception:
+        return CharTokenizer()
+
+
+@dataclass
+class ModelPricing:
+    """USD per million tokens"""
+    input: float
+    output: float
+    cached_input: Optional[float] = None
+    
+    def cost(self, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+        """Cost of a call; cached_tokens are part of input_tokens"""
+        cached_rate = self.input if self.cached_input is None else self.cached_input
+        return ((input_tokens - cached_tokens) * self.input
+                + cached_tokens * cached_rate
+                + output_tokens * self.output) / 1_000_000
+
+
+@dataclass
+class TokenEstimate:
+    """Pre-flight prediction for one model call"""
+    ai_id: str
+    input_tokens: int
+    output_tokens: int      # Expected output
+    max_output_tokens: int  # max_tokens requested from the provider
+    cost_usd: float         # Expected cost
+    max_cost_usd: float     # Cost if the full max_tokens is generated
+    context_window: Optional[int]
+    tokenizer: str
+    
+    @property
+    def fits(self) -> bool:
+        """Prompt plus requested output fits the context window"""
+        return (self.context_window is None
+                or self.input_tokens + self.max_output_tokens <= self.context_window)
+
+
+class TokenEstimator:
+    """
+    ARCHON Token Estimator
+    Local token counts and price-table costs for AI pool calls
+    
+    Expected output per model starts at pool_settings.preflight
+    expected_output_tokens and follows observed completions (EWMA).
+    """
+    
+    def __init__(self, ai_pool: Dict[str, Any], providers: Dict[str, Dict[str, Any]],
+                 settings: Dict[str, Any]):
+        self.ai_pool = ai_pool
+        self.providers = providers
+        self.enabled = settings.get('enabled', True)
+        self.oversize = settings.get('oversize', 'trim')  # "trim" or "reject"
+        self.max_input_tokens = settings.get('max_input_tokens')
+        self.expected_output_tokens = settings.get('expected_output_tokens', 1000)
+        self.output_smoothing = settings.get('output_smoothing', 0.2)
+        self._observed_output: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats = {'estimates': 0, 'trimmed': 0, 'rejected': 0}
+    
+    def _config(self, ai_id: str) -> Dict[str, Any]:
+        return self.ai_pool.get(ai_id) or {}
+    
+    def tokenizer(self, ai_id: str):
+        """Cached tokenizer for a model (ai_pool.<model>.tokenizer encoding)"""
+        return get_tokenizer(self._config(ai_id).get('tokenizer'))
+    
+    def pricing(self, ai_id: str) -> Optional[ModelPricing]:
+        """Price table entry for a model, or None if not configured"""
+        prices = self._config(ai_id).get('pricing')
+        if not prices:
+            return None
+        return ModelPricing(prices['input'], prices['output'], prices.get('cached_input'))
+    
+    def count(self, ai_id: str, text: Optional[str]) -> int:
+        """Local token count of a text for a model"""
+        return self.tokenizer(ai_id).count(text) if text else 0
+    
+    def count_input(self, ai_id: str, prompt: str) -> int:
+        """Prompt tokens of a call: system and user messages plus formatting"""
+        system = self.providers[ai_id].get('system')
+        messages = 2 if system else 1
+        return self.count(ai_id, system) + self.count(ai_id, prompt) + messages * MESSAGE_OVERHEAD
+    
+    def expected_output(self, ai_id: str) -> int:
+        """Expected completion tokens, capped by the model's max_tokens"""
+        with self._lock:
+            expected = self._observed_output.get(ai_id, self.expected_output_tokens)
+        return min(int(expected), self.providers[ai_id]['max_tokens'])
+    
+    def observe(self, ai_id: str, output_tokens: int):
+        """Fold a real completion size into the expected output"""
+        if output_tokens <= 0:
+            return
+        with self._lock:
+            previous = self._observed_output.get(ai_id)
+            self._observed_output[ai_id] = (output_tokens if previous is None else
+                                            previous + self.output_smoothing * (output_tokens - previous))
+    
+    def cost(self, ai_id: str, input_tokens: int, output_tokens: int,
+             cached_tokens: int = 0) -> float:
+        """
+        Dollar cost of a call from the price table
+        
+        Without a price table entry the provider default cost_per_token is
+        applied to all tokens, with the provider's cached-token discount.
+        """
+        pricing = self.pricing(ai_id)
+        if pricing is not None:
+            return pricing.cost(input_tokens, output_tokens, cached_tokens)
+        return self.flat_cost(ai_id, input_tokens + output_tokens, cached_tokens)
+    
+    def flat_cost(self, ai_id: str, tokens: int, cached_tokens: int = 0) -> float:
+        """Blended cost_per_token cost for usage reported only as a total"""
+        spec = self.providers[ai_id]
+        return cached_cost(tokens, cached_tokens, spec['cost_per_token'], spec['api_key'])
+    
+    def estimate(self, ai_id: str, prompt: str) -> TokenEstimate:
+        """Predict tokens and cost of a call before it is sent"""
+        spec = self.providers[ai_id]
+        input_tokens = self.count_input(ai_id, prompt)
+        output_tokens = self.expected_output(ai_id)
+        
+        with self._lock:
+            self.stats['estimates'] += 1
+        
+        return TokenEstimate(
+            ai_id=ai_id,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            max_output_tokens=spec['max_tokens'],
+            cost_usd=self.cost(ai_id, input_tokens, output_tokens),
+            max_cost_usd=self.cost(ai_id, input_tokens, spec['max_tokens']),
+            context_window=self._config(ai_id).get('context_window'),
+            tokenizer=self.tokenizer(ai_id).name
+        )
+    
+    def input_budget(self, ai_id: str) -> Optional[int]:
+        """Most prompt tokens a call may use, or None if unlimited"""
+        limits = []
+        context_window = self._config(ai_id).get('context_window')
+        if context_window:
+            limits.append(context_window - self.providers[ai_id]['max_tokens'])
+        if self.max_input_tokens:
+            limits.append(self.max_input_tokens)
+        return min(limits) if limits else None
+    
+    def fit(self, ai_id: str, prompt: str) -> Tuple[str, Optional[str]]:
+        """
+        Check a prompt against the model's input budget
+        
+        Oversized prompts are trimmed (head and tail kept) or rejected
+        according to pool_settings.preflight.oversize.
+        
+        Returns:
+            Tuple of (prompt to send, error message if rejected)
+        """
+        budget = self.input_budget(ai_id)
+        if not self.enabled or budget is None:
+            return prompt, None
+        
+        input_tokens = self.count_input(ai_id, prompt)
+        if input_tokens <= budget:
+            return prompt, None
+        
+        prompt_budget = budget - (input_tokens - self.count(ai_id, prompt))
+        if self.oversize != 'trim' or prompt_budget <= 0:
+            with self._lock:
+                self.stats['rejected'] += 1
+            return prompt, (f"Prompt too large for {ai_id}: "
+                            f"{input_tokens} input tokens, budget {budget}")
+        
+        with self._lock:
+            self.stats['trimmed'] += 1
+        return self.tokenizer(ai_id).truncate(prompt, prompt_budget), None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['expected_output'] = {ai_id: round(tokens, 1)
+                                        for ai_id, tokens in self._observed_output.items()}
+        return stats
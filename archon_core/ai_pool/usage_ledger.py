@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - AI Pool Usage Ledger
+Version: 2.5.1
+Purpose: Bounded per-call usage tracking for long-lived pool processes
+
+This module:
+1. Keeps the most recent provider calls in a fixed-size ring buffer
+2. Maintains running session and per-model aggregates
+3. Batch-writes per-model outcomes to ai_performance from a background thread
+"""
+
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+try:
+    from ..storage.sqlite_storage import get_storage
+    from ..storage.migrations import migrate
+except ImportError:
+    from storage.sqlite_storage import get_storage
+    from storage.migrations import migrate
+
+
+class CallRecord:
+    """One provider call"""
+    
+    __slots__ = ('timestamp', 'ai_id', 'success', 'tokens', 'cost_usd', 'latency_ms')
+    
+    def __init__(self, timestamp: str, ai_id: str, success: bool, tokens: int,
+                 cost_usd: float, latency_ms: float):
+        self.timestamp = timestamp
+        self.ai_id = ai_id
+        self.success = success
+        self.tokens = tokens
+        self.cost_usd = cost_usd
+        self.latency_ms = latency_ms
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ModelUsage:
+    """Running totals for one model"""
+    
+    __slots__ = ('calls', 'successes', 'tokens', 'cost_usd', 'latency_ms',
+                 'failed_latency_ms')
+    
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.tokens = 0
+        self.cost_usd = 0.0
+        self.latency_ms = 0.0         # Sum over successful calls
+        self.failed_latency_ms = 0.0  # Sum over failed calls
+    
+    def add(self, record: CallRecord):
+        self.calls += 1
+        self.tokens += record.tokens
+        self.cost_usd += record.cost_usd
+        if record.success:
+            self.successes += 1
+            self.latency_ms += record.latency_ms
+        else:
+            self.failed_latency_ms += record.latency_ms
+    
+    @property
+    def failures(self) -> int:
+        return self.calls - self.successes
+    
+    @property
+    def avg_latency_ms(self) -> float:
+        """Mean latency of successful calls (of failed calls if none succeeded)"""
+        if self.successes:
+            return self.latency_ms / self.successes
+        return self.failed_latency_ms / self.failures if self.failures else 0.0
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'successes': self.successes,
+            'failures': self.failures,
+            'tokens': self.tokens,
+            'cost_usd': round(self.cost_usd, 6),
+            'avg_latency_ms': round(self.avg_latency_ms, 2)
+        }
+
+
+class UsageLedger:
+    """
+    ARCHON Usage Ledger
+    Ring buffer of recent calls plus running aggregates
+    
+    Outcomes recorded since the last flush are written as one
+    ai_performance row per model, so the table grows with flushes rather
+    than with calls.
+    """
+    
+    def __init__(self, settings: Dict[str, Any], db_path: Optional[str] = None):
+        self.capacity = settings.get('capacity', 1000)
+        self.flush_interval = settings.get('flush_interval_seconds', 30)
+        self.db_path = db_path if settings.get('persist', True) else None
+        self.recent: deque = deque(maxlen=self.capacity)
+        self.totals: Dict[str, ModelUsage] = {}
+        self._pending: Dict[str, ModelUsage] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self.stats = {'flushes': 0, 'rows_written': 0, 'write_errors': 0}
+    
+    def record(self, ai_id: str, success: bool, tokens: int, cost_usd: float, latency_ms: float):
+        """Add a provider call outcome"""
+        record = CallRecord(datetime.now(timezone.utc).isoformat(), ai_id, success,
+                            tokens, cost_usd, latency_ms)
+        with self._lock:
+            self.recent.append(record)
+            self.totals.setdefault(ai_id, ModelUsage()).add(record)
+            if self.db_path:
+                self._pending.setdefault(ai_id, ModelUsage()).add(record)
+                self._start_writer()
+    
+    def _start_writer(self):
+        """Start the background writer on first use (lock held)"""
+        if self._writer is None and not self._stop.is_set():
+            self._writer = threading.Thread(target=self._run_writer, daemon=True,
+                                            name="archon-usage-writer")
+            self._writer.start()
+    
+    def _run_writer(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+    
+    def flush(self) -> int:
+        """
+        Write outcomes recorded since the last flush to ai_performance
+        
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or not self.db_path:
+            return 0
+        
+        timestamp = datetime.now(timezone.utc).isoformat()
+        rows = [(timestamp, ai_id, usage.successes, usage.failures,
+                 usage.avg_latency_ms, usage.cost_usd)
+                for ai_id, usage in pending.items()]
+        
+        try:
+            storage = get_storage(self.db_path)
+            migrate(storage)
+            storage.executemany("""
+                INSERT INTO ai_performance
+                    (timestamp, ai_id, success_count, failure_count, avg_latency_ms, total_cost_usd)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not write ai_performance: {e}")
+            with self._lock:
+                self.stats['write_errors'] += 1
+                # Keep the outcomes for the next flush
+                for ai_id, usage in pending.items():
+                    merged = self._pending.setdefault(ai_id, ModelUsage())
+                    for name in ModelUsage.__slots__:
+                        setattr(merged, name, getattr(merged, name) + getattr(usage, name))
+            return 0
+        
+        with self._lock:
+            self.stats['flushes'] += 1
+            self.stats['rows_written'] += len(rows)
+        return len(rows)
+    
+    def close(self):
+        """Stop the background writer and flush what is left"""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        self.flush()
+    
+    def recent_calls(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent calls, oldest first"""
+        with self._lock:
+            records = list(self.recent)
+        if limit is not None:
+            records = records[-limit:]
+        return [record.to_dict() for record in records]
+    
+    def get_totals(self) -> Dict[str, Any]:
+        """Session totals across all models"""
+        with self._lock:
+            return {
+                'total_tokens': sum(u.tokens for u in self.totals.values()),
+                'total_cost': sum(u.cost_usd for u in self.totals.values()),
+                'requests': sum(u.calls for u in self.totals.values())
+            }
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get ledger counters and per-model totals"""
+        with self._lock:
+            result = {'all': {**self.stats, 'recent': len(self.recent), 'capacity': self.capacity,
+                              'pending_models': len(self._pending)}}
+            for ai_id, usage in self.totals.items():
+                result[ai_id] = usage.summary()
+            return result
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - AI Pool Worker
+Version: 2.5.1
+Purpose: Long-lived plan worker with a warm AI pool
+
+This module:
+1. Loads decision_pool.yaml and the provider connection pools once
+2. Claims plan requests from the persistent job queue
+3. Runs up to `concurrency` plans at a time, claiming only free slots
+4. Writes plan JSON (or the error) back for the supervisor to collect
+"""
+
+import os
+import json
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Set
+
+try:
+    from .pool_manager import AIPoolManager, ARCHON_ROOT
+    from .job_queue import PlanJobQueue
+except ImportError:
+    from pool_manager import AIPoolManager, ARCHON_ROOT
+    from job_queue import PlanJobQueue
+
+
+class PoolWorker:
+    """
+    ARCHON Pool Worker
+    Daemon that serves queued plan requests from one warm AIPoolManager
+    """
+    
+    def __init__(self, pool: Optional[AIPoolManager] = None,
+                 queue: Optional[PlanJobQueue] = None,
+                 settings: Optional[Dict[str, Any]] = None):
+        self.pool = pool or AIPoolManager()
+        if settings is None:
+            settings = self.pool.pool_settings.get('worker', {})
+        self.concurrency = settings.get('concurrency', 4)
+        self.poll_interval = settings.get('poll_interval_seconds', 1.0)
+        self.priority = settings.get('priority', 'pipeline')  # Unless the job names one
+        self.queue = queue or PlanJobQueue(
+            os.path.join(ARCHON_ROOT, settings.get('path', 'telemetry/memory_store.sqlite')),
+            max_attempts=settings.get('max_attempts', 2),
+            lease_seconds=settings.get('lease_seconds', 600)
+        )
+        self.name = f"{socket.gethostname()}-{os.getpid()}"
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                            thread_name_prefix="archon-worker")
+        self._in_flight = 0
+        self._running: Set[str] = set()  # Job ids whose leases this worker renews
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self.stats = {'claimed': 0, 'completed': 0, 'failed': 0, 'requeued': 0, 'lease_lost': 0}
+    
+    def run_once(self) -> int:
+        """
+        Claim as many jobs as there are free slots and start them
+        
+        Returns:
+            Number of jobs started
+        """
+        with self._lock:
+            free = self.concurrency - self._in_flight
+        jobs = self.queue.claim(self.name, free)
+        
+        with self._lock:
+            self._in_flight += len(jobs)
+            self._running.update(job['id'] for job in jobs)
+            self.stats['claimed'] += len(jobs)
+        for job in jobs:
+            self._executor.submit(self._run_job, job)
+        return len(jobs)
+    
+    def _run_job(self, job: Dict[str, Any]):
+        """Generate one plan and store its result"""
+        try:
+            plan = self.pool.generate_plan(**{'priority': self.priority, **job['payload']})
+            held = self.queue.complete(job['id'], self.name, json.loads(self.pool.export_plan_json(plan)))
+            outcome = 'completed'
+        except Exception as e:
+            print(f"Warning: Plan job {job['id']} failed: {e}")
+            held = self.queue.fail(job['id'], self.name, str(e), job['attempts'])
+            outcome = 'failed'
+        if not held:
+            print(f"Warning: Lease of plan job {job['id']} expired; result discarded")
+            outcome = 'lease_lost'
+        
+        with self._idle:
+            self._in_flight -= 1
+            self._running.discard(job['id'])
+            self.stats[outcome] += 1
+            self._idle.notify_all()
+    
+    def serve(self):
+        """Serve the queue until stop() is called"""
+        print(f"🛠️  ARCHON pool worker {self.name}: {self.concurrency} concurrent plans")
+        next_requeue = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() >= next_requeue:
+                with self._lock:
+                    running = list(self._running)
+                self.queue.renew(self.name, running)  # Heartbeat before anyone else expires them
+                requeued = self.queue.requeue_expired()
+                if requeued:
+                    print(f"   ♻️  Re-queued {requeued} expired job(s)")
+                with self._lock:
+                    self.stats['requeued'] += requeued
+                next_requeue = time.monotonic() + self.queue.lease_seconds / 4
+            
+            if not self.run_once():
+                # Queue empty or all slots busy
+                self._stop.wait(self.poll_interval)
+        self._drain()
+    
+    def stop(self):
+        """Stop claiming jobs; serve() finishes the running ones and returns"""
+        self._stop.set()
+    
+    def _drain(self):
+        """Wait for running jobs, then release the pool"""
+        with self._idle:
+            while self._in_flight:
+                self._idle.wait()
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+        print(f"🛑 ARCHON pool worker {self.name} stopped: {self.get_stats()['all']}")
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get worker counters and queue depth"""
+        with self._lock:
+            stats = {**self.stats, 'in_flight': self._in_flight, 'concurrency': self.concurrency}
+        return {'all': stats, 'queue': self.queue.counts()}
+
+
+# ================================
+# MAIN EXECUTION
+# ================================
+
+def main():
+    """Run the AI pool worker until SIGTERM or Ctrl-C"""
+    worker = PoolWorker()
+    
+    def shutdown(signum, frame):
+        print(f"\nReceived signal {signum}, finishing running plans...")
+        worker.stop()
+    
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    worker.serve()
+
+
+if __name__ == "__main__":
+    main()
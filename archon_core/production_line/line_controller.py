@@ -15,13 +15,21 @@ The Production Line:
 import json
 import time
 import os
-import sqlite3
+import sys
 import requests
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+# archon_core root, for the shared storage layer
+ARCHON_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ARCHON_ROOT not in sys.path:
+    sys.path.append(ARCHON_ROOT)
+
+from storage.sqlite_storage import get_storage
+from storage.migrations import migrate
+
 
 class BuildState(Enum):
     """Build state enumeration"""
@@ -75,6 +83,7 @@ class ProductionLineController:
         # Database for cycle tracking
         self.db_path = os.path.join(os.path.dirname(__file__), 
                                     '..', 'telemetry', 'memory_store.sqlite')
+        self.storage = get_storage(self.db_path)
         self._init_database()
     
     def _load_config(self) -> Dict[str, Any]:
@@ -96,28 +105,7 @@ class ProductionLineController:
     
     def _init_database(self):
         """Initialize database tables"""
-        if not os.path.exists(os.path.dirname(self.db_path)):
-            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS production_cycles (
-                id TEXT PRIMARY KEY,
-                started_at TEXT NOT NULL,
-                ended_at TEXT,
-                state TEXT NOT NULL,
-                build_count INTEGER DEFAULT 0,
-                success_count INTEGER DEFAULT 0,
-                failure_count INTEGER DEFAULT 0,
-                last_error TEXT,
-                summary TEXT
-            )
-        """)
-        
-        conn.commit()
-        conn.close()
+        migrate(self.storage)
     
     def start_cycle(self) -> ProductionCycle:
         """Start a new production cycle"""
@@ -146,10 +134,7 @@ class ProductionLineController:
         if not self.current_cycle:
             return
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        self.storage.execute("""
             INSERT OR REPLACE INTO production_cycles 
             (id, started_at, state, build_count, success_count, 
              failure_count, last_error)
@@ -163,9 +148,6 @@ class ProductionLineController:
             self.current_cycle.failure_count,
             self.current_cycle.last_error
         ))
-        
-        conn.commit()
-        conn.close()
     
     def check_supervisor_approval(self) -> Optional[Dict]:
         """Check Supervisor for approved builds"""
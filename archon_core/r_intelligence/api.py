@@ -6,12 +6,19 @@ Purpose: Bridge between R analytics and ARCHON system
 """
 
 import os
+import sys
 import json
-import sqlite3
 import subprocess
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 
+# archon_core root, for the shared storage layer
+ARCHON_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ARCHON_ROOT not in sys.path:
+    sys.path.append(ARCHON_ROOT)
+
+from storage.sqlite_storage import get_storage
+
 class RIntelligenceAPI:
     """
     Python wrapper for R Intelligence Layer
@@ -20,6 +27,7 @@ class RIntelligenceAPI:
     
     def __init__(self, db_path: str = "../telemetry/memory_store.sqlite"):
         self.db_path = os.path.join(os.path.dirname(__file__), db_path)
+        self.storage = get_storage(self.db_path)
         self.reports_dir = os.path.join(os.path.dirname(__file__), "../reports")
         
         # Ensure reports directory exists
@@ -66,8 +74,7 @@ class RIntelligenceAPI:
             Build statistics dict
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self.storage.connection().cursor()
             
             cursor.execute(f"""
                 SELECT 
@@ -80,7 +87,6 @@ class RIntelligenceAPI:
             """)
             
             row = cursor.fetchone()
-            conn.close()
             
             total = row[0] or 0
             successful = row[1] or 0
@@ -105,12 +111,7 @@ class RIntelligenceAPI:
             Dict of AI model weights
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT ai_id, weight FROM ai_weights")
-            rows = cursor.fetchall()
-            conn.close()
+            rows = self.storage.query("SELECT ai_id, weight FROM ai_weights")
             
             return {row[0]: row[1] for row in rows}
         except Exception as e:
@@ -138,30 +139,28 @@ class RIntelligenceAPI:
             return False
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Log history
-            cursor.execute(
-                "SELECT weight FROM ai_weights WHERE ai_id = ?",
-                (ai_id,)
-            )
-            old_weight = cursor.fetchone()
-            old_weight = old_weight[0] if old_weight else 0
-            
-            cursor.execute("""
-                INSERT INTO ai_weights_history (timestamp, ai_id, old_weight, new_weight, reason)
-                VALUES (?, ?, ?, ?, ?)
-            """, (datetime.now(timezone.utc).isoformat(), ai_id, old_weight, new_weight, "R Intelligence optimization"))
-            
-            # Update weight
-            cursor.execute("""
-                INSERT OR REPLACE INTO ai_weights (ai_id, weight, updated_at)
-                VALUES (?, ?, ?)
-            """, (ai_id, new_weight, datetime.now(timezone.utc).isoformat()))
-            
-            conn.commit()
-            conn.close()
+            with self.storage.transaction() as conn:
+                cursor = conn.cursor()
+                
+                # Log history
+                cursor.execute(
+                    "SELECT weight FROM ai_weights WHERE ai_id = ?",
+                    (ai_id,)
+                )
+                old_weight = cursor.fetchone()
+                old_weight = old_weight[0] if old_weight else 0
+                
+                cursor.execute("""
+                    INSERT INTO ai_weights_history (timestamp, ai_id, old_weight, new_weight, reason)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (datetime.now(timezone.utc).isoformat(), ai_id, old_weight, new_weight, "R Intelligence optimization"))
+                
+                # Update weight
+                cursor.execute("""
+                    INSERT OR REPLACE INTO ai_weights (ai_id, weight, updated_at)
+                    VALUES (?, ?, ?)
+                """, (ai_id, new_weight, datetime.now(timezone.utc).isoformat()))
+                
             return True
         except Exception as e:
             print(f"Error updating weight: {e}")
@@ -0,0 +1 @@
+# ARCHON Module
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Schema Migrations
+Version: 2.5.1
+Purpose: Versioned schema of memory_store.sqlite
+
+This module:
+1. Owns every memory_store.sqlite table and index in one ordered list of migrations
+2. Records the applied version in PRAGMA user_version
+3. Applies pending migrations in one BEGIN IMMEDIATE transaction, so concurrent processes migrate once
+4. Rebuilds tables left behind by older, conflicting _init_database schemas
+"""
+
+import sqlite3
+from typing import Callable, Dict, List, Tuple
+
+try:
+    from .sqlite_storage import SQLiteStorage
+except ImportError:
+    from sqlite_storage import SQLiteStorage
+
+
+# Column and constraint definitions per table (baseline, version 1)
+TABLES: Dict[str, List[str]] = {
+    'decisions': [
+        "id TEXT PRIMARY KEY",
+        "timestamp TEXT NOT NULL",
+        "source TEXT NOT NULL",
+        "plan TEXT NOT NULL",
+        "trust_score REAL NOT NULL",
+        "cohesion_score REAL NOT NULL",
+        "cost_efficiency REAL NOT NULL",
+        "status TEXT NOT NULL",
+        "reason TEXT",
+        "build_id TEXT",
+        "created_at TEXT DEFAULT CURRENT_TIMESTAMP"
+    ],
+    'telemetry': [
+        "id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "timestamp TEXT NOT NULL",
+        "decision_id TEXT",
+        "build_status TEXT",
+        "latency_ms REAL DEFAULT 0",
+        "token_usage INTEGER DEFAULT 0",
+        "cost_usd REAL DEFAULT 0",
+        "error_count INTEGER DEFAULT 0",
+        "metadata TEXT",
+        "created_at TEXT DEFAULT CURRENT_TIMESTAMP"
+    ],
+    'daily_metrics': [
+        "date TEXT PRIMARY KEY",
+        "total_builds INTEGER DEFAULT 0",
+        "successful_builds INTEGER DEFAULT 0",
+        "failed_builds INTEGER DEFAULT 0",
+        "avg_latency_ms REAL DEFAULT 0",
+        "total_cost_usd REAL DEFAULT 0",
+        "total_errors INTEGER DEFAULT 0"
+    ],
+    'ai_performance': [
+        "id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "timestamp TEXT NOT NULL",
+        "ai_id TEXT NOT NULL",
+        "success_count INTEGER DEFAULT 0",
+        "failure_count INTEGER DEFAULT 0",
+        "avg_latency_ms REAL DEFAULT 0",
+        "total_cost_usd REAL DEFAULT 0"
+    ],
+    'ai_weights': [
+        "ai_id TEXT PRIMARY KEY",
+        "weight REAL NOT NULL",
+        "updated_at TEXT NOT NULL"
+    ],
+    'ai_weights_history': [
+        "id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "timestamp TEXT NOT NULL",
+        "ai_id TEXT NOT NULL",
+        "old_weight REAL",
+        "new_weight REAL",
+        "reason TEXT"
+    ],
+    'pool_metrics': [
+        "id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "timestamp TEXT NOT NULL",
+        "component TEXT NOT NULL",
+        "scope TEXT NOT NULL",
+        "metric TEXT NOT NULL",
+        "value REAL"
+    ],
+    'production_cycles': [
+        "id TEXT PRIMARY KEY",
+        "started_at TEXT NOT NULL",
+        "ended_at TEXT",
+        "state TEXT NOT NULL",
+        "build_count INTEGER DEFAULT 0",
+        "success_count INTEGER DEFAULT 0",
+        "failure_count INTEGER DEFAULT 0",
+        "last_error TEXT",
+        "summary TEXT"
+    ],
+    'triggers': [
+        "id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "timestamp TEXT NOT NULL",
+        "decision_id TEXT",
+        "source TEXT",
+        "trust_score REAL",
+        "status TEXT",
+        "error TEXT"
+    ],
+    'plan_jobs': [
+        "id TEXT PRIMARY KEY",
+        "status TEXT NOT NULL",
+        "payload TEXT NOT NULL",
+        "attempts INTEGER NOT NULL DEFAULT 0",
+        "worker TEXT",
+        "result TEXT",
+        "error TEXT",
+        "created_at TEXT NOT NULL",
+        "started_at REAL",
+        "finished_at TEXT"
+    ],
+    'circuit_breakers': [
+        "ai_id TEXT PRIMARY KEY",
+        "state TEXT NOT NULL",
+        "opened_at REAL NOT NULL",
+        "outcomes TEXT NOT NULL",
+        "updated_at REAL NOT NULL"
+    ],
+    'output_budget': [
+        "role TEXT NOT NULL",
+        "task_type TEXT NOT NULL",
+        "samples TEXT NOT NULL",
+        "updated_at TEXT NOT NULL",
+        "PRIMARY KEY (role, task_type)"
+    ],
+    'response_cache': [
+        "key TEXT PRIMARY KEY",
+        "value TEXT NOT NULL",
+        "created_at REAL NOT NULL",
+        "expires_at REAL NOT NULL"
+    ]
+}
+
+BASELINE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_timestamp ON telemetry (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_decision ON telemetry (decision_id)",
+    "CREATE INDEX IF NOT EXISTS idx_telemetry_status ON telemetry (build_status)",
+    "CREATE INDEX IF NOT EXISTS idx_pool_metrics_component ON pool_metrics (component, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_plan_jobs_status ON plan_jobs (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_response_cache_expires ON response_cache (expires_at)"
+]
+
+TABLE_CONSTRAINTS = ('PRIMARY KEY', 'UNIQUE', 'FOREIGN KEY', 'CHECK')
+
+
+def _columns(definitions: List[str]) -> List[str]:
+    return [d.split()[0] for d in definitions if not d.startswith(TABLE_CONSTRAINTS)]
+
+
+def _create_table(conn: sqlite3.Connection, name: str, definitions: List[str]):
+    """
+    Create a table, or rebuild an older variant of it that lacks columns
+    
+    SQLite cannot add a column with a non-constant default (created_at), so
+    the table is copied into the new definition instead.
+    """
+    existing = [row[1] for row in conn.execute(f"PRAGMA table_info({name})")]
+    if not existing:
+        conn.execute(f"CREATE TABLE {name} ({', '.join(definitions)})")
+        return
+    
+    wanted = _columns(definitions)
+    if set(wanted) <= set(existing):
+        return
+    
+    shared = ', '.join(column for column in wanted if column in existing)
+    conn.execute(f"CREATE TABLE {name}_migrating ({', '.join(definitions)})")
+    conn.execute(f"INSERT INTO {name}_migrating ({shared}) SELECT {shared} FROM {name}")
+    conn.execute(f"DROP TABLE {name}")
+    conn.execute(f"ALTER TABLE {name}_migrating RENAME TO {name}")
+
+
+def _v1_baseline(conn: sqlite3.Connection):
+    """Tables previously created ad hoc by the components' _init_database methods"""
+    for name, definitions in TABLES.items():
+        _create_table(conn, name, definitions)
+    for statement in BASELINE_INDEXES:
+        conn.execute(statement)
+
+
+def _v2_covering_indexes(conn: sqlite3.Connection):
+    """Covering indexes for the trust, health and optimizer queries"""
+    # TrustEngine.get_historical_trusts / get_ai_performance: source IN (...) AND created_at > ?
+    # GPT5Optimizer.get_telemetry_summary: created_at >= ? GROUP BY source (read in source order)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_decisions_source_created
+        ON decisions (source, created_at, status, trust_score)
+    """)
+    # SupervisorEngine.get_system_health / get_recent_decisions: created_at > ?
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_decisions_created
+        ON decisions (created_at, status, trust_score)
+    """)
+    # GPT5Optimizer.get_telemetry_summary / RIntelligenceAPI.get_build_stats: telemetry by timestamp
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_telemetry_timestamp_covering
+        ON telemetry (timestamp, build_status, latency_ms, cost_usd, token_usage)
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_telemetry_timestamp")  # Prefix of the covering index
+
+
+# (version, description, apply) in order; never edit an applied entry, append a new one
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "baseline tables", _v1_baseline),
+    (2, "covering indexes for hot queries", _v2_covering_indexes)
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(storage: SQLiteStorage) -> int:
+    """Version recorded in the database (0 if it was never migrated)"""
+    return storage.query_one("PRAGMA user_version")[0]
+
+
+def migrate(storage: SQLiteStorage) -> int:
+    """
+    Apply pending migrations
+    
+    Args:
+        storage: Storage of the database to migrate
+    
+    Returns:
+        Schema version after migrating
+    """
+    current = schema_version(storage)
+    if current >= SCHEMA_VERSION:
+        return current
+    
+    with storage.transaction() as conn:
+        # Re-read under the write lock; another process may have just migrated
+        start = version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target, description, apply in MIGRATIONS:
+            if target > version:
+                apply(conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+                version = target
+    
+    if version != start:
+        print(f"🗄️ Schema of {storage.db_path} migrated: v{start} → v{version}")
+    return version
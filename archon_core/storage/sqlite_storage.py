@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Shared SQLite Storage
+Version: 2.5.1
+Purpose: One tuned connection layer for memory_store.sqlite and the other ARCHON databases
+
+This module:
+1. Keeps one long-lived connection per thread and database file
+2. Applies WAL, synchronous=NORMAL, mmap_size and a busy timeout to every connection
+3. Reuses prepared statements through each connection's statement cache
+4. Wraps writes in explicit transactions (BEGIN IMMEDIATE ... COMMIT/ROLLBACK)
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+import yaml
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "../config/decision_pool.yaml")
+
+DEFAULT_SETTINGS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout_ms': 30000,
+    'mmap_size_mb': 256,
+    'cached_statements': 256
+}
+
+
+class SQLiteStorage:
+    """
+    ARCHON SQLite Storage
+    Per-thread pooled connections to one database file
+    
+    Connections run in autocommit mode: single statements commit on their
+    own and multi-statement writes go through transaction(), so a pooled
+    connection never sits on an open write lock.
+    """
+    
+    def __init__(self, db_path: str, settings: Optional[Dict[str, Any]] = None):
+        self.db_path = os.path.abspath(db_path)
+        settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.journal_mode = str(settings['journal_mode']).upper()
+        self.synchronous = str(settings['synchronous']).upper()
+        self.busy_timeout_ms = int(settings['busy_timeout_ms'])
+        self.mmap_size = int(settings['mmap_size_mb']) * 1024 * 1024
+        self.cached_statements = int(settings['cached_statements'])
+        
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, Tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._generation = 0  # Bumped by close(); stale thread connections reopen
+        self._pid = os.getpid()
+        self.stats = {'opened': 0, 'closed': 0, 'transactions': 0, 'rollbacks': 0}
+    
+    def connection(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it on first use"""
+        if self._pid != os.getpid():
+            self._after_fork()
+        
+        cached = getattr(self._local, 'conn', None)
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+        
+        conn = self._open()
+        with self._lock:
+            self._reap_dead_threads()
+            self._connections[threading.get_ident()] = (threading.current_thread(), conn)
+            self._local.conn = (self._generation, conn)
+            self.stats['opened'] += 1
+        return conn
+    
+    def _open(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,           # Autocommit; see transaction()
+            check_same_thread=False,        # Only close() touches other threads' connections
+            cached_statements=self.cached_statements
+        )
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        return conn
+    
+    def _reap_dead_threads(self):
+        """Close connections of threads that have exited (caller holds the lock)"""
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                conn.close()
+                del self._connections[ident]
+                self.stats['closed'] += 1
+    
+    def _after_fork(self):
+        """Forget the parent's connections; SQLite handles must not cross fork()"""
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._local = threading.local()
+        self._pid = os.getpid()
+    
+    @contextmanager
+    def transaction(self, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block of statements atomically
+        
+        Args:
+            immediate: Take the write lock up front (BEGIN IMMEDIATE), so a
+                       read-then-write block cannot fail to upgrade its lock
+        
+        Nested use joins the outer transaction.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            with self._lock:
+                self.stats['rollbacks'] += 1
+            raise
+        conn.execute("COMMIT")
+        with self._lock:
+            self.stats['transactions'] += 1
+    
+    def execute(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """Run one statement on the calling thread's connection"""
+        return self.connection().execute(sql, params)
+    
+    def executemany(self, sql: str, rows: Sequence[Sequence]) -> sqlite3.Cursor:
+        """Run one statement for many rows in a single transaction"""
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows)
+    
+    def query(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        """Run a SELECT and fetch all rows"""
+        return self.connection().execute(sql, params).fetchall()
+    
+    def query_one(self, sql: str, params: Sequence = ()) -> Optional[tuple]:
+        """Run a SELECT and fetch the first row"""
+        return self.connection().execute(sql, params).fetchone()
+    
+    def close_connection(self):
+        """Close the calling thread's connection; other threads keep theirs"""
+        self._local.conn = None
+        with self._lock:
+            entry = self._connections.pop(threading.get_ident(), None)
+            if entry is not None:
+                entry[1].close()
+                self.stats['closed'] += 1
+    
+    def close(self):
+        """
+        Close every thread's connection; later calls open new ones
+        
+        The storage is shared process-wide (get_storage), so components
+        release their own connection with close_connection() instead.
+        """
+        with self._lock:
+            for _, conn in self._connections.values():
+                conn.close()
+            self.stats['closed'] += len(self._connections)
+            self._connections.clear()
+            self._generation += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection counters and the active pragmas"""
+        with self._lock:
+            return {
+                **self.stats,
+                'open': len(self._connections),
+                'journal_mode': self.journal_mode.lower(),
+                'synchronous': self.synchronous.lower(),
+                'mmap_size_mb': self.mmap_size // (1024 * 1024),
+                'busy_timeout_ms': self.busy_timeout_ms
+            }
+
+
+# Process-wide storages, one per database file
+_storages: Dict[str, SQLiteStorage] = {}
+_storages_lock = threading.Lock()
+_settings: Optional[Dict[str, Any]] = None
+
+
+def _load_settings() -> Dict[str, Any]:
+    """storage section of decision_pool.yaml (defaults if unreadable)"""
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            return (yaml.safe_load(f) or {}).get('storage') or {}
+    except Exception as e:
+        print(f"Warning: Could not load storage settings: {e}")
+        return {}
+
+
+def get_storage(db_path: str, settings: Optional[Dict[str, Any]] = None) -> SQLiteStorage:
+    """
+    Get the process-wide storage for a database file
+    
+    Args:
+        db_path: SQLite file (relative paths resolve against the working directory)
+        settings: Overrides of the storage section of decision_pool.yaml;
+                  only applied by the first caller for a file
+    """
+    global _settings
+    
+    key = os.path.realpath(db_path)
+    with _storages_lock:
+        storage = _storages.get(key)
+        if storage is None:
+            if _settings is None:
+                _settings = _load_settings()
+            storage = _storages[key] = SQLiteStorage(key, {**_settings, **(settings or {})})
+        return storage
+
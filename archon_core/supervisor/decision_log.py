@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+ARCHON Compact Federation - Decision Log Writer
+Version: 2.5.1
+Purpose: Keep disk syncs off the Supervisor's evaluation path
+
+This module:
+1. Queues decision inserts and status updates in a bounded FIFO queue
+2. Commits them from a background thread in grouped transactions
+3. Flushes everything still queued on close() and at interpreter exit
+4. Offers async, group and sync durability modes
+"""
+
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Any, List, Optional, Sequence
+
+# archon_core root, for the shared storage layer
+ARCHON_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ARCHON_ROOT not in sys.path:
+    sys.path.append(ARCHON_ROOT)
+
+from storage.sqlite_storage import SQLiteStorage
+
+
+DURABILITY_MODES = ('async', 'group', 'sync')
+
+
+class _Write:
+    """One queued statement (sql None marks a flush barrier)"""
+    
+    __slots__ = ('sql', 'rows', 'done', 'error')
+    
+    def __init__(self, sql: Optional[str], rows: Sequence[Sequence],
+                 done: Optional[threading.Event] = None):
+        self.sql = sql
+        self.rows = rows
+        self.done = done
+        self.error: Optional[Exception] = None
+
+
+_STOP = _Write(None, ())
+
+
+class DecisionLogWriter:
+    """
+    ARCHON Decision Log Writer
+    Group-commits decision log writes from a background thread
+    
+    Durability modes:
+        async: write() returns once queued; a crash loses at most the
+               writes of the last flush interval (default)
+        group: write() waits for the grouped commit holding its statement,
+               which runs with synchronous=FULL
+        sync:  write() commits on the calling thread
+    """
+    
+    def __init__(self, storage: SQLiteStorage, settings: Optional[Dict[str, Any]] = None):
+        settings = settings or {}
+        self.storage = storage
+        self.durability = settings.get('durability', 'async')
+        if self.durability not in DURABILITY_MODES:
+            print(f"Warning: Unknown decision log durability '{self.durability}', using async")
+            self.durability = 'async'
+        self.batch_size = settings.get('batch_size', 256)
+        self.flush_interval = settings.get('flush_interval_ms', 50) / 1000
+        self.flush_timeout = settings.get('flush_timeout_seconds', 10)
+        self._queue: "queue.Queue[_Write]" = queue.Queue(maxsize=settings.get('queue_size', 10000))
+        self._lock = threading.Lock()          # Counters
+        self._queue_lock = threading.Lock()    # Orders writes against flush() and close()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lost = False
+        self._closed = False
+        self.stats = {'writes': 0, 'rows_written': 0, 'batches': 0, 'max_batch': 0,
+                      'queue_full': 0, 'write_errors': 0}
+        
+        if self.durability != 'sync':
+            atexit.register(self.close)
+    
+    def write(self, sql: str, rows: Sequence[Sequence]):
+        """
+        Log one statement for one or more rows
+        
+        Raises:
+            Exception: In sync and group mode, if the statement failed
+        """
+        if not rows:
+            return
+        
+        item = _Write(sql, rows, threading.Event() if self.durability == 'group' else None)
+        with self._queue_lock:
+            queued = self.durability != 'sync' and not self._closed and self._start_writer()
+            if queued:
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    with self._lock:
+                        self.stats['queue_full'] += 1
+                    self._queue.put(item)  # Backpressure: wait for the writer
+        
+        if not queued:
+            self._drain()
+            self._commit([item])  # Sync mode, after close() or without a live writer
+        elif item.done is None:
+            return  # Async: the writer reports failures
+        else:
+            self._wait(item)
+        if item.error is not None:
+            raise item.error
+    
+    def _start_writer(self) -> bool:
+        """
+        Start the background writer on first use (queue lock held)
+        
+        Returns:
+            False if the writer has died; callers then commit synchronously
+        """
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, daemon=True,
+                                            name="archon-decision-log")
+            self._writer.start()
+        if self._writer.is_alive():
+            return True
+        if not self._writer_lost:
+            self._writer_lost = True
+            print("Warning: Decision log writer stopped; writing synchronously")
+        return False
+    
+    def _wait(self, item: _Write, timeout: Optional[float] = None) -> bool:
+        """Wait for the writer to handle an item, taking over if it dies; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = 1.0 if deadline is None else min(1.0, deadline - time.monotonic())
+            if item.done.wait(max(0.0, remaining)):
+                return True
+            if not self._writer.is_alive():
+                self._drain()
+                if not item.done.is_set():
+                    item.error = RuntimeError("Decision log writer stopped before committing")
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+    
+    def _drain(self):
+        """Commit, on the calling thread, whatever a stopped writer left queued"""
+        if self._writer is None or self._writer.is_alive():
+            return
+        
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            self._commit(batch)
+        finally:
+            for item in batch:
+                if item.done is not None:
+                    item.done.set()
+    
+    def _run_writer(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            stop = batch[0] is _STOP
+            
+            # Gather what arrives within the flush interval, unless a flush is waiting
+            deadline = time.monotonic() + self.flush_interval
+            while not stop and batch[-1].sql is not None and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                stop = item is _STOP
+                batch.append(item)
+            
+            try:
+                self._commit(batch)
+            except Exception as e:  # Keep the writer alive; waiting writers get the error
+                print(f"Warning: Could not write decision log batch: {e}")
+                for item in batch:
+                    if item.sql is not None and item.error is None:
+                        item.error = e
+                with self._lock:
+                    self.stats['write_errors'] += 1
+            finally:
+                for item in batch:
+                    if item.done is not None:
+                        item.done.set()
+        
+        self.storage.close_connection()  # The writer thread's own connection
+    
+    def _commit(self, batch: List[_Write]):
+        """Write a batch in one transaction; if it fails, retry its writes one by one"""
+        writes = [item for item in batch if item.sql is not None]
+        if not writes:
+            return
+        
+        try:
+            if self.durability == 'group' and threading.current_thread() is self._writer:
+                self.storage.execute("PRAGMA synchronous = FULL")  # Writer thread's connection only
+            with self.storage.transaction() as conn:
+                for item in writes:
+                    conn.executemany(item.sql, item.rows)
+        except Exception as e:
+            if len(writes) > 1:
+                for item in writes:
+                    self._commit([item])
+                return
+            writes[0].error = e
+            print(f"Warning: Could not write decision log: {e}")
+            with self._lock:
+                self.stats['write_errors'] += 1
+            return
+        
+        with self._lock:
+            self.stats['batches'] += 1
+            self.stats['writes'] += len(writes)
+            self.stats['rows_written'] += sum(len(item.rows) for item in writes)
+            self.stats['max_batch'] = max(self.stats['max_batch'], len(writes))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every write queued so far is committed
+        
+        Returns:
+            False if the timeout passed first
+        """
+        with self._queue_lock:
+            if self._writer is None or self._closed:
+                return True
+            if not self._writer.is_alive():
+                barrier = None
+            else:
+                barrier = _Write(None, (), threading.Event())
+                self._queue.put(barrier)
+        
+        if barrier is None:
+            self._drain()
+            return True
+        return self._wait(barrier, timeout)
+    
+    def close(self, timeout: float = 30):
+        """Commit everything still queued and stop the writer; later writes run synchronously"""
+        with self._queue_lock:
+            if self._closed:
+                return
+            self._closed = True
+            writer = self._writer
+            if writer is not None:
+                self._queue.put(_STOP)
+        
+        if writer is not None:
+            writer.join(timeout)
+            self._drain()
+        atexit.unregister(self.close)
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get writer counters"""
+        with self._lock:
+            return {'all': {**self.stats, 'durability': self.durability,
+                            'pending': self._queue.qsize()}}
@@ -17,13 +17,51 @@ Outputs:
 """
 
 import os
+import sys
 import json
 import yaml
-import requests
-import sqlite3
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional
 
+# archon_core root, for the shared AI pool modules
+ARCHON_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ARCHON_ROOT not in sys.path:
+    sys.path.append(ARCHON_ROOT)
+
+from ai_pool.http_pool import get_session_pool
+from ai_pool.prompt_cache import prompt_cache_key, cached_tokens
+from storage.sqlite_storage import get_storage
+
+# Fixed instructions lead every request so providers can cache the prefix
+OPTIMIZER_SYSTEM_PROMPT = """You are ARCHON's Meta-Strategist AI (GPT-5).
+Your role is to analyze AI federation performance and recommend weight adjustments.
+
+Output ONLY valid JSON with this structure:
+{
+  "analysis_summary": "Brief analysis",
+  "recommended_weights": {
+    "gpt4o": 0.30,
+    "claude": 0.20,
+    "gemini": 0.20,
+    "deepseek": 0.15,
+    "gpt5": 0.15
+  },
+  "optimization_actions": ["action1", "action2"],
+  "confidence": 0.85
+}"""
+
+OPTIMIZER_REVIEW_INSTRUCTIONS = """ARCHON Federation Weekly Performance Review
+
+Analyze:
+1. Which AI models are underperforming?
+2. Are current weights optimal for build success?
+3. What weight adjustments would improve performance?
+4. Any structural recommendations?
+
+Weights must sum to 1.0 and each weight must be between 0.05 and 0.40.
+"""
+
+
 class GPT5Optimizer:
     """
     ARCHON GPT-5 Meta-Strategic Optimizer
@@ -33,9 +71,16 @@ class GPT5Optimizer:
     def __init__(self, config_path: str = "../config/decision_pool.yaml"):
         self.config_path = os.path.join(os.path.dirname(__file__), config_path)
         self.db_path = os.path.join(os.path.dirname(__file__), "../telemetry/memory_store.sqlite")
+        self.storage = get_storage(self.db_path)
         self.api_key = os.environ.get("OPENAI_API_KEY", "")
         self.model = "gpt-5"  # Or gpt-4o as fallback
         self.last_optimization = None
+        self.last_cached_tokens = 0
+        
+        # Share keep-alive provider connections with AIPoolManager
+        pool_settings = self.load_config().get('pool_settings', {})
+        self.http = get_session_pool(pool_settings.get('connection_pool', {}))
+        self.prompt_caching = pool_settings.get('prompt_caching', {}).get('enabled', True)
     
     def load_config(self) -> Dict:
         """Load current configuration"""
@@ -49,8 +94,7 @@ class GPT5Optimizer:
     def get_telemetry_summary(self, days: int = 7) -> Dict[str, Any]:
         """Get telemetry summary for analysis"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self.storage.connection().cursor()
             
             # Build statistics
             cursor.execute("""
@@ -74,7 +118,7 @@ class GPT5Optimizer:
                     AVG(trust_score) as avg_trust,
                     SUM(CASE WHEN status = 'approved' THEN 1 ELSE 0 END) as approvals
                 FROM decisions
-                WHERE timestamp >= datetime('now', ?)
+                WHERE created_at >= datetime('now', ?)
                 GROUP BY source
             """, (f'-{days} days',))
             
@@ -87,8 +131,6 @@ class GPT5Optimizer:
                     "approval_rate": ai_row[3] / max(1, ai_row[1])
                 }
             
-            conn.close()
-            
             return {
                 "period_days": days,
                 "build_stats": {
@@ -120,50 +162,42 @@ class GPT5Optimizer:
             })
         
         try:
-            response = requests.post(
+            response = self.http.post(
+                'openai',
                 "https://api.openai.com/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
                 },
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": """You are ARCHON's Meta-Strategist AI (GPT-5).
-Your role is to analyze AI federation performance and recommend weight adjustments.
-
-Output ONLY valid JSON with this structure:
-{
-  "analysis_summary": "Brief analysis",
-  "recommended_weights": {
-    "gpt4o": 0.30,
-    "claude": 0.20,
-    "gemini": 0.20,
-    "deepseek": 0.15,
-    "gpt5": 0.15
-  },
-  "optimization_actions": ["action1", "action2"],
-  "confidence": 0.85
-}"""
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    "max_tokens": 2000,
-                    "temperature": 0.5
-                },
+                json=self._build_request_body(prompt),
                 timeout=120
             )
             
             if response.ok:
-                return response.json()["choices"][0]["message"]["content"]
+                data = response.json()
+                self.last_cached_tokens = cached_tokens(data.get("usage", {}))
+                return data["choices"][0]["message"]["content"]
             else:
                 return json.dumps({"error": f"API error: {response.status_code}"})
                 
         except Exception as e:
             return json.dumps({"error": str(e)})
     
+    def _build_request_body(self, prompt: str) -> Dict[str, Any]:
+        """Chat completion body with the fixed system prompt as cacheable prefix"""
+        body = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": OPTIMIZER_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 2000,
+            "temperature": 0.5
+        }
+        if self.prompt_caching:
+            body["prompt_cache_key"] = prompt_cache_key("gpt5-optimizer", OPTIMIZER_SYSTEM_PROMPT)
+        return body
+    
     def run_optimization(self) -> Dict[str, Any]:
         """Run full optimization cycle"""
         print("\n" + "="*60)
@@ -182,23 +216,13 @@ Output ONLY valid JSON with this structure:
         print(f"\n📊 Current Weights: {current_weights}")
         print(f"📈 Build Success Rate: {telemetry['build_stats'].get('success_rate', 0):.1%}")
         
-        # Prepare prompt
-        prompt = f"""
-ARCHON Federation Weekly Performance Review
-
+        # Prepare prompt (static instructions first, weekly data last)
+        prompt = f"""{OPTIMIZER_REVIEW_INSTRUCTIONS}
 Current AI Weights:
 {json.dumps(current_weights, indent=2)}
 
 Last 7 Days Telemetry:
 {json.dumps(telemetry, indent=2)}
-
-Analyze:
-1. Which AI models are underperforming?
-2. Are current weights optimal for build success?
-3. What weight adjustments would improve performance?
-4. Any structural recommendations?
-
-Weights must sum to 1.0 and each weight must be between 0.05 and 0.40.
 """
         
         print("\n🤖 Calling GPT-5 for analysis...")
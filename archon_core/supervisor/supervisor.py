@@ -9,22 +9,34 @@ The Supervisor is the brain of ARCHON - it:
 2. Evaluates trust, cohesion, and cost efficiency
 3. Approves or rejects plans
 4. Triggers build pipeline via webhook
-5. Logs decisions and updates memory
+5. Logs decisions and updates memory (group-committed off the evaluation path)
+6. Queues plan requests for the AI pool worker and evaluates the results
 """
 
 import json
 import sqlite3
 import requests
 import os
+import sys
 import yaml
 import hashlib
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
 # Import trust engine
 from trust_engine import TrustEngine, TrustScore
+from decision_log import DecisionLogWriter
+
+# archon_core root, for the AI pool job queue
+ARCHON_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ARCHON_ROOT not in sys.path:
+    sys.path.append(ARCHON_ROOT)
+
+from ai_pool.job_queue import PlanJobQueue
+from storage.sqlite_storage import get_storage
+from storage.migrations import migrate
 
 # ================================
 # CONFIGURATION
@@ -48,6 +60,7 @@ class Config:
         
         # Database
         self.memory_db = self.supervisor.get('memory_db', 'telemetry/memory_store.sqlite')
+        self.decision_log = self.supervisor.get('decision_log', {})
         
         # Trigger
         self.github_dispatch_url = self.trigger.get('github_dispatch_url', '')
@@ -102,59 +115,23 @@ class SupervisorEngine:
         db_path = os.path.join(os.path.dirname(__file__), '..', self.config.memory_db)
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
-        self.conn = sqlite3.connect(db_path)
-        cursor = self.conn.cursor()
-        
-        # Create decisions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS decisions (
-                id TEXT PRIMARY KEY,
-                timestamp TEXT NOT NULL,
-                source TEXT NOT NULL,
-                plan TEXT NOT NULL,
-                trust_score REAL NOT NULL,
-                cohesion_score REAL NOT NULL,
-                cost_efficiency REAL NOT NULL,
-                status TEXT NOT NULL,
-                reason TEXT,
-                build_id TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        self.storage = get_storage(db_path)
         
-        # Create telemetry table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS telemetry (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                decision_id TEXT,
-                build_status TEXT,
-                latency_ms REAL,
-                token_usage INTEGER,
-                cost_usd REAL,
-                error_count INTEGER DEFAULT 0,
-                metadata TEXT,
-                FOREIGN KEY (decision_id) REFERENCES decisions(id)
-            )
-        """)
+        # Plan requests served by the AI pool worker (ai_pool/worker.py)
+        self.jobs = PlanJobQueue(db_path)
+        migrate(self.storage)
         
-        # Create AI weights history table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ai_weights_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                ai_id TEXT NOT NULL,
-                old_weight REAL,
-                new_weight REAL,
-                reason TEXT
-            )
-        """)
+        # Decision inserts and status updates, committed in groups by a background thread
+        self.decision_log = DecisionLogWriter(self.storage, self.config.decision_log)
         
-        self.conn.commit()
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection to memory_store.sqlite"""
+        return self.storage.connection()
     
-    def _generate_decision_id(self, plan: Dict) -> str:
-        """Generate unique decision ID"""
-        content = json.dumps(plan, sort_keys=True) + datetime.now(timezone.utc).isoformat()
+    def _generate_decision_id(self, plan: Dict, index: int = 0) -> str:
+        """Generate unique decision ID (index tells apart identical plans of a batch)"""
+        content = json.dumps(plan, sort_keys=True) + datetime.now(timezone.utc).isoformat() + str(index)
         return f"dec-{hashlib.sha256(content.encode()).hexdigest()[:12]}"
     
     def evaluate_plan(self, plan: Dict[str, Any], source: str) -> Decision:
@@ -168,29 +145,72 @@ class SupervisorEngine:
         Returns:
             Decision object with evaluation results
         """
-        decision_id = self._generate_decision_id(plan)
-        timestamp = datetime.now(timezone.utc).isoformat()
-        
-        # Get trust scores from trust engine
-        trust_score = self.trust_engine.evaluate_trust(plan, source)
-        cohesion_score = self.trust_engine.evaluate_cohesion(plan)
-        cost_efficiency = self.trust_engine.evaluate_cost_efficiency(plan)
+        # Score against history that includes decisions still queued for writing
+        self._flush_decision_log()
+        decision = self._decide(plan, source, self._generate_decision_id(plan))
         
         print(f"\n{'='*50}")
         print(f"🧠 SUPERVISOR EVALUATION")
         print(f"{'='*50}")
-        print(f"Decision ID: {decision_id}")
+        print(f"Decision ID: {decision.id}")
         print(f"Source: {source}")
-        print(f"Trust Score: {trust_score:.2f} (threshold: {self.config.trust_threshold})")
-        print(f"Cohesion Score: {cohesion_score:.2f} (threshold: {self.config.cohesion_threshold})")
-        print(f"Cost Efficiency: {cost_efficiency:.2f} (threshold: {self.config.cost_threshold})")
+        print(f"Trust Score: {decision.trust_score:.2f} (threshold: {self.config.trust_threshold})")
+        print(f"Cohesion Score: {decision.cohesion_score:.2f} (threshold: {self.config.cohesion_threshold})")
+        print(f"Cost Efficiency: {decision.cost_efficiency:.2f} (threshold: {self.config.cost_threshold})")
+        
+        if decision.status == DecisionStatus.APPROVED:
+            print(f"✅ APPROVED: {decision.reason}")
+        else:
+            print(f"⚠️ REJECTED: {decision.reason}")
+        
+        # Log decision
+        self._log_decisions([decision])
+        
+        return decision
+    
+    def evaluate_plans(self, plans: List[Tuple[Dict[str, Any], str]]) -> List[Decision]:
+        """
+        Evaluate a batch of plans, e.g. a backlog drained after an outage
+        
+        Historical trust is looked up once for all distinct sources, so
+        every plan is scored against the history as of the start of the
+        batch, and all decisions are written in a single transaction.
+        
+        Args:
+            plans: (plan, source) pairs
+        
+        Returns:
+            Decisions in the order of `plans`
+        """
+        if not plans:
+            return []
+        
+        self._flush_decision_log()
+        historical = self.trust_engine.get_historical_trusts([source for _, source in plans])
+        decisions = [
+            self._decide(plan, source, self._generate_decision_id(plan, index), historical[source])
+            for index, (plan, source) in enumerate(plans)
+        ]
+        self._log_decisions(decisions)
+        
+        approved = sum(1 for d in decisions if d.status == DecisionStatus.APPROVED)
+        print(f"🧠 SUPERVISOR BATCH: {len(decisions)} plans evaluated, "
+              f"{approved} approved, {len(decisions) - approved} rejected")
+        return decisions
+    
+    def _decide(self, plan: Dict[str, Any], source: str, decision_id: str,
+                historical_trust: Optional[float] = None) -> Decision:
+        """Score a plan and approve or reject it against the thresholds"""
+        # Get trust scores from trust engine
+        trust_score = self.trust_engine.evaluate_trust(plan, source, historical_trust)
+        cohesion_score = self.trust_engine.evaluate_cohesion(plan)
+        cost_efficiency = self.trust_engine.evaluate_cost_efficiency(plan)
         
         # Determine if plan is approved
         if (trust_score >= self.config.trust_threshold and 
             cohesion_score >= self.config.cohesion_threshold):
             status = DecisionStatus.APPROVED
             reason = "All thresholds met"
-            print(f"✅ APPROVED: {reason}")
         else:
             status = DecisionStatus.REJECTED
             reasons = []
@@ -199,11 +219,10 @@ class SupervisorEngine:
             if cohesion_score < self.config.cohesion_threshold:
                 reasons.append(f"cohesion_score {cohesion_score:.2f} < {self.config.cohesion_threshold}")
             reason = "; ".join(reasons)
-            print(f"⚠️ REJECTED: {reason}")
         
-        decision = Decision(
+        return Decision(
             id=decision_id,
-            timestamp=timestamp,
+            timestamp=datetime.now(timezone.utc).isoformat(),
             source=source,
             plan=plan,
             trust_score=trust_score,
@@ -212,20 +231,34 @@ class SupervisorEngine:
             status=status,
             reason=reason
         )
+    
+    def request_plan(self, task: str, description: str, **options) -> str:
+        """
+        Queue a plan request for the AI pool worker
         
-        # Log decision
-        self._log_decision(decision)
-        
-        return decision
+        Args:
+            task: Task name
+            description: Detailed task description
+            **options: Further AIPoolManager.generate_plan keyword arguments
+            
+        Returns:
+            Job id (see self.jobs.get / self.jobs.wait)
+        """
+        job_id = self.jobs.enqueue(task, description, **options)
+        print(f"📥 Queued plan request {job_id}: {task}")
+        return job_id
     
-    def _log_decision(self, decision: Decision):
-        """Log decision to SQLite database"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
+    def evaluate_queued_plans(self, limit: int = 100) -> List[Decision]:
+        """Evaluate plans the AI pool worker has finished since the last call"""
+        return self.evaluate_plans([(job['result'], "ai_pool") for job in self.jobs.take_results(limit)])
+    
+    def _log_decisions(self, decisions: List[Decision]):
+        """Queue decisions for the decision log (one statement for the batch)"""
+        self.decision_log.write("""
             INSERT INTO decisions (id, timestamp, source, plan, trust_score, 
                                    cohesion_score, cost_efficiency, status, reason, build_id)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        """, [(
             decision.id,
             decision.timestamp,
             decision.source,
@@ -236,8 +269,7 @@ class SupervisorEngine:
             decision.status.value,
             decision.reason,
             decision.build_id
-        ))
-        self.conn.commit()
+        ) for decision in decisions])
     
     def trigger_pipeline(self, decision: Decision) -> Dict[str, Any]:
         """
@@ -319,13 +351,11 @@ class SupervisorEngine:
             }
     
     def _update_decision_status(self, decision_id: str, status: DecisionStatus):
-        """Update decision status in database"""
-        cursor = self.conn.cursor()
-        cursor.execute(
+        """Queue a decision status update for the decision log"""
+        self.decision_log.write(
             "UPDATE decisions SET status = ? WHERE id = ?",
-            (status.value, decision_id)
+            [(status.value, decision_id)]
         )
-        self.conn.commit()
     
     def _notify_dashboard(self, decision: Decision, event: str):
         """Send notification to ARCHON dashboard"""
@@ -354,8 +384,7 @@ class SupervisorEngine:
         """
         print(f"\n📊 Processing telemetry data")
         
-        cursor = self.conn.cursor()
-        cursor.execute("""
+        self.storage.execute("""
             INSERT INTO telemetry (timestamp, decision_id, build_status, 
                                    latency_ms, token_usage, cost_usd, error_count, metadata)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -369,7 +398,6 @@ class SupervisorEngine:
             telemetry_data.get('error_count', 0),
             json.dumps(telemetry_data.get('metadata', {}))
         ))
-        self.conn.commit()
         
         # Update decision status based on telemetry
         decision_id = telemetry_data.get('decision_id')
@@ -380,11 +408,19 @@ class SupervisorEngine:
             elif build_status == 'failed':
                 self._update_decision_status(decision_id, DecisionStatus.FAILED)
         
-        # Trigger trust weight updates if needed
+        # Trigger trust weight updates if needed (reads the decision's source)
+        self._flush_decision_log()
         self.trust_engine.update_weights_from_telemetry(telemetry_data)
     
+    def _flush_decision_log(self):
+        """Wait, at most flush_timeout_seconds, for queued decision writes before reading"""
+        if not self.decision_log.flush(self.decision_log.flush_timeout):
+            print(f"Warning: Decision log flush timed out after {self.decision_log.flush_timeout}s; "
+                  f"reading possibly stale decisions")
+    
     def get_recent_decisions(self, limit: int = 10) -> list:
         """Get recent decisions from database"""
+        self._flush_decision_log()
         cursor = self.conn.cursor()
         cursor.execute("""
             SELECT id, timestamp, source, trust_score, status, reason
@@ -407,6 +443,7 @@ class SupervisorEngine:
     
     def get_system_health(self) -> Dict[str, Any]:
         """Get overall system health status"""
+        self._flush_decision_log()
         cursor = self.conn.cursor()
         
         # Get recent success rate
@@ -439,8 +476,9 @@ class SupervisorEngine:
         }
     
     def close(self):
-        """Close database connection"""
-        self.conn.close()
+        """Flush the decision log and close this thread's database connection"""
+        self.decision_log.close()
+        self.storage.close_connection()  # Shared storage: other components keep theirs
 
 
 # ================================
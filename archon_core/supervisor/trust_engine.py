@@ -12,14 +12,21 @@ The Trust Engine provides:
 """
 
 import json
-import sqlite3
 import os
+import sys
 import yaml
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 from collections import defaultdict
 
+# archon_core root, for the shared storage layer
+ARCHON_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ARCHON_ROOT not in sys.path:
+    sys.path.append(ARCHON_ROOT)
+
+from storage.sqlite_storage import get_storage
+
 
 @dataclass
 class TrustScore:
@@ -71,12 +78,16 @@ class TrustEngine:
         self.weights = self.BASE_WEIGHTS.copy()
         self._load_dynamic_weights()
     
+    @property
+    def storage(self):
+        """Shared storage of db_path (follows reassignments of db_path)"""
+        return get_storage(self.db_path)
+    
     def _load_dynamic_weights(self):
         """Load weights from database if available"""
         try:
             if os.path.exists(self.db_path):
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
+                cursor = self.storage.connection().cursor()
                 
                 # Check if weights table exists
                 cursor.execute("""
@@ -89,18 +100,19 @@ class TrustEngine:
                     for row in cursor.fetchall():
                         if row[0] in self.weights:
                             self.weights[row[0]] = row[1]
-                
-                conn.close()
         except Exception as e:
             print(f"Warning: Could not load dynamic weights: {e}")
     
-    def evaluate_trust(self, plan: Dict[str, Any], source: str) -> float:
+    def evaluate_trust(self, plan: Dict[str, Any], source: str,
+                       historical_trust: Optional[float] = None) -> float:
         """
         Calculate overall trust score for a plan
         
         Args:
             plan: The plan to evaluate
             source: The AI model that generated the plan
+            historical_trust: Precomputed historical trust of the source
+                              (see get_historical_trusts); looked up if omitted
             
         Returns:
             Trust score between 0.0 and 1.0
@@ -112,7 +124,8 @@ class TrustEngine:
         content_trust = self._evaluate_content_trust(plan)
         
         # Historical trust (based on past performance)
-        historical_trust = self._get_historical_trust(source)
+        if historical_trust is None:
+            historical_trust = self._get_historical_trust(source)
         
         # Weighted combination
         overall = (
@@ -167,37 +180,49 @@ class TrustEngine:
     
     def _get_historical_trust(self, source: str) -> float:
         """Get historical trust based on past performance"""
+        return self.get_historical_trusts([source])[source]
+    
+    def get_historical_trusts(self, sources: List[str]) -> Dict[str, float]:
+        """
+        Get historical trust for several sources with one query
+        
+        Args:
+            sources: AI sources to look up (duplicates are fine)
+        
+        Returns:
+            Historical trust per distinct source (0.75 without history)
+        """
+        distinct = sorted(set(sources))
+        trusts = {source: 0.75 for source in distinct}  # Default historical trust
+        if not distinct or not os.path.exists(self.db_path):
+            return trusts
+        
         try:
-            if not os.path.exists(self.db_path):
-                return 0.75  # Default historical trust
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self.storage.connection().cursor()
             
-            # Get success rate for this AI
-            cursor.execute("""
+            # Get success rate per AI
+            cursor.execute(f"""
                 SELECT 
+                    source,
                     COUNT(*) as total,
                     SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as successful
                 FROM decisions
-                WHERE source = ?
+                WHERE source IN ({', '.join('?' * len(distinct))})
                 AND created_at > datetime('now', '-30 days')
-            """, (source,))
-            
-            row = cursor.fetchone()
-            conn.close()
-            
-            total, successful = row[0] or 0, row[1] or 0
-            if total == 0:
-                return 0.75  # Default if no history
-            
-            success_rate = successful / total
-            # Convert to trust score (50% success = 0.6 trust, 100% = 0.95)
-            return 0.45 + (success_rate * 0.50)
+                GROUP BY source
+            """, distinct)
             
+            rows = cursor.fetchall()
         except Exception as e:
             print(f"Warning: Could not get historical trust: {e}")
-            return 0.75
+            return trusts
+        
+        for source, total, successful in rows:
+            if total:
+                success_rate = (successful or 0) / total
+                # Convert to trust score (50% success = 0.6 trust, 100% = 0.95)
+                trusts[source] = 0.45 + (success_rate * 0.50)
+        return trusts
     
     def evaluate_cohesion(self, plan: Dict[str, Any]) -> float:
         """
@@ -293,34 +318,34 @@ class TrustEngine:
             return
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get source AI for this decision
-            cursor.execute(
-                "SELECT source FROM decisions WHERE id = ?",
-                (decision_id,)
-            )
-            row = cursor.fetchone()
-            if not row:
-                conn.close()
-                return
-            
-            source = row[0]
-            build_status = telemetry.get('build_status', 'unknown')
-            
-            # Calculate weight adjustment
-            if build_status == 'success':
-                adjustment = 0.01  # Small increase on success
-            elif build_status == 'failed':
-                adjustment = -0.02  # Larger decrease on failure
-            else:
-                adjustment = 0.0
-            
-            if adjustment != 0 and source in self.weights:
+            with self.storage.transaction() as conn:
+                cursor = conn.cursor()
+                
+                # Get source AI for this decision
+                cursor.execute(
+                    "SELECT source FROM decisions WHERE id = ?",
+                    (decision_id,)
+                )
+                row = cursor.fetchone()
+                if not row:
+                    return
+                
+                source = row[0]
+                build_status = telemetry.get('build_status', 'unknown')
+                
+                # Calculate weight adjustment
+                if build_status == 'success':
+                    adjustment = 0.01  # Small increase on success
+                elif build_status == 'failed':
+                    adjustment = -0.02  # Larger decrease on failure
+                else:
+                    adjustment = 0.0
+                
+                if adjustment == 0 or source not in self.weights:
+                    return
+                
                 old_weight = self.weights[source]
                 new_weight = max(0.05, min(0.50, old_weight + adjustment))
-                self.weights[source] = new_weight
                 
                 # Log weight change
                 cursor.execute("""
@@ -339,14 +364,14 @@ class TrustEngine:
                     INSERT OR REPLACE INTO ai_weights (ai_id, weight, updated_at)
                     VALUES (?, ?, ?)
                 """, (source, new_weight, datetime.now(timezone.utc).isoformat()))
-                
-                conn.commit()
-                print(f"📊 Weight updated for {source}: {old_weight:.3f} → {new_weight:.3f}")
-            
-            conn.close()
-            
+        
         except Exception as e:
             print(f"Warning: Could not update weights: {e}")
+            return
+        
+        # Only apply the new weight once it is committed
+        self.weights[source] = new_weight
+        print(f"📊 Weight updated for {source}: {old_weight:.3f} → {new_weight:.3f}")
     
     def get_ai_performance(self, ai_id: str) -> AIPerformance:
         """
@@ -359,8 +384,7 @@ class TrustEngine:
             AIPerformance object
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self.storage.connection().cursor()
             
             # Get performance stats
             cursor.execute("""
@@ -384,8 +408,6 @@ class TrustEngine:
             """, (ai_id,))
             avg_latency = cursor.fetchone()[0] or 0.0
             
-            conn.close()
-            
             return AIPerformance(
                 ai_id=ai_id,
                 success_rate=success_rate,
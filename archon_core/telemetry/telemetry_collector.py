@@ -14,11 +14,20 @@ This module:
 import json
 import sqlite3
 import os
+import sys
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 from pathlib import Path
 
+# archon_core root, for the shared storage layer
+ARCHON_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ARCHON_ROOT not in sys.path:
+    sys.path.append(ARCHON_ROOT)
+
+from storage.sqlite_storage import get_storage
+from storage.migrations import migrate
+
 
 @dataclass
 class TelemetryRecord:
@@ -42,82 +51,12 @@ class TelemetryCollector:
     
     def __init__(self, db_path: str = "memory_store.sqlite"):
         self.db_path = os.path.join(os.path.dirname(__file__), db_path)
+        self.storage = get_storage(self.db_path)
         self._init_database()
     
     def _init_database(self):
         """Initialize SQLite database with required tables"""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Main telemetry table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS telemetry (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                decision_id TEXT,
-                build_status TEXT NOT NULL,
-                latency_ms REAL DEFAULT 0,
-                token_usage INTEGER DEFAULT 0,
-                cost_usd REAL DEFAULT 0,
-                error_count INTEGER DEFAULT 0,
-                metadata TEXT,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # AI performance tracking
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ai_performance (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                ai_id TEXT NOT NULL,
-                success_count INTEGER DEFAULT 0,
-                failure_count INTEGER DEFAULT 0,
-                avg_latency_ms REAL DEFAULT 0,
-                total_cost_usd REAL DEFAULT 0
-            )
-        """)
-        
-        # Daily metrics aggregation
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS daily_metrics (
-                date TEXT PRIMARY KEY,
-                total_builds INTEGER DEFAULT 0,
-                successful_builds INTEGER DEFAULT 0,
-                failed_builds INTEGER DEFAULT 0,
-                avg_latency_ms REAL DEFAULT 0,
-                total_cost_usd REAL DEFAULT 0,
-                total_errors INTEGER DEFAULT 0
-            )
-        """)
-        
-        # AI weights table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ai_weights (
-                ai_id TEXT PRIMARY KEY,
-                weight REAL NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-        """)
-        
-        # Create indexes for common queries
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_telemetry_timestamp 
-            ON telemetry(timestamp)
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_telemetry_decision 
-            ON telemetry(decision_id)
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_telemetry_status 
-            ON telemetry(build_status)
-        """)
-        
-        conn.commit()
-        conn.close()
+        migrate(self.storage)
     
     def collect(self, data: Dict[str, Any]) -> int:
         """
@@ -129,34 +68,29 @@ class TelemetryCollector:
         Returns:
             ID of inserted record
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         timestamp = data.get('timestamp', datetime.now(timezone.utc).isoformat())
         
-        cursor.execute("""
-            INSERT INTO telemetry 
-            (timestamp, decision_id, build_status, latency_ms, 
-             token_usage, cost_usd, error_count, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            timestamp,
-            data.get('decision_id'),
-            data.get('build_status', 'unknown'),
-            data.get('latency_ms', 0),
-            data.get('token_usage', 0),
-            data.get('cost_usd', 0),
-            data.get('error_count', 0),
-            json.dumps(data.get('metadata', {}))
-        ))
-        
-        record_id = cursor.lastrowid
-        conn.commit()
-        
-        # Update daily metrics
-        self._update_daily_metrics(conn, data)
-        
-        conn.close()
+        with self.storage.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO telemetry 
+                (timestamp, decision_id, build_status, latency_ms, 
+                 token_usage, cost_usd, error_count, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                timestamp,
+                data.get('decision_id'),
+                data.get('build_status', 'unknown'),
+                data.get('latency_ms', 0),
+                data.get('token_usage', 0),
+                data.get('cost_usd', 0),
+                data.get('error_count', 0),
+                json.dumps(data.get('metadata', {}))
+            ))
+            record_id = cursor.lastrowid
+            
+            # Update daily metrics in the same transaction
+            self._update_daily_metrics(conn, data)
         
         print(f"📊 Telemetry collected: {record_id}")
         return record_id
@@ -206,13 +140,64 @@ class TelemetryCollector:
                 data.get('cost_usd', 0),
                 data.get('error_count', 0)
             ))
+    
+    def collect_pool_metrics(self, component: str, 
+                             metrics: Dict[str, Dict[str, float]]) -> int:
+        """
+        Collect AI pool runtime metrics
+        
+        Args:
+            component: Pool component name (e.g. "http_pool")
+            metrics: Metric values keyed by scope (usually provider)
+            
+        Returns:
+            Number of metric rows written
+        """
+        timestamp = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (timestamp, component, scope, metric, float(value))
+            for scope, values in metrics.items()
+            for metric, value in values.items()
+            if isinstance(value, (int, float))
+        ]
+        
+        if not rows:
+            return 0
+        
+        self.storage.executemany("""
+            INSERT INTO pool_metrics (timestamp, component, scope, metric, value)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        
+        return len(rows)
+    
+    def get_pool_metrics(self, component: str, limit: int = 100) -> List[Dict]:
+        """Get the most recent AI pool metrics for a component"""
+        cursor = self.storage.connection().cursor()
+        
+        cursor.execute("""
+            SELECT timestamp, scope, metric, value
+            FROM pool_metrics
+            WHERE component = ?
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        """, (component, limit))
+        
+        records = [
+            {
+                "timestamp": row[0],
+                "scope": row[1],
+                "metric": row[2],
+                "value": row[3]
+            }
+            for row in cursor.fetchall()
+        ]
         
-        conn.commit()
+        return records
     
     def get_recent(self, limit: int = 10) -> List[Dict]:
         """Get recent telemetry records"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.storage.connection().cursor()
         
         cursor.execute("""
             SELECT id, timestamp, decision_id, build_status, 
@@ -237,13 +222,11 @@ class TelemetryCollector:
             for row in cursor.fetchall()
         ]
         
-        conn.close()
         return records
     
     def get_daily_stats(self, days: int = 7) -> List[Dict]:
         """Get daily statistics for the past N days"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.storage.connection().cursor()
         
         start_date = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d')
         
@@ -269,13 +252,11 @@ class TelemetryCollector:
             for row in cursor.fetchall()
         ]
         
-        conn.close()
         return stats
     
     def get_summary(self) -> Dict[str, Any]:
         """Get overall telemetry summary"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.storage.connection().cursor()
         
         # Overall stats
         cursor.execute("""
@@ -299,8 +280,6 @@ class TelemetryCollector:
         """)
         recent = cursor.fetchone()
         
-        conn.close()
-        
         return {
             "total_builds": row[0] or 0,
             "successful_builds": row[1] or 0,
@@ -315,8 +294,7 @@ class TelemetryCollector:
     
     def export_for_r(self, output_path: str = "telemetry_export.csv"):
         """Export telemetry data for R analysis"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.storage.connection().cursor()
         
         cursor.execute("""
             SELECT timestamp, decision_id, build_status, 
@@ -332,7 +310,6 @@ class TelemetryCollector:
             for row in cursor.fetchall():
                 f.write(','.join(str(v) for v in row) + '\n')
         
-        conn.close()
         print(f"📁 Exported to {output_file}")
         return output_file
     
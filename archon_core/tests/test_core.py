@@ -0,0 +1,1899 @@
+"""
+ARCHON Compact Federation - Core Test Suite
+Version: 2.5.1
+Purpose: Unit tests for archon_core components
+"""
+
+import pytest
+import json
+import sqlite3
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+# Add archon_core to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _ok_response(ai_id: str, delay: float = 0.0):
+    """Build a stub caller that returns a successful AIResponse after a delay"""
+    from ai_pool.pool_manager import AIResponse
+    
+    def caller(prompt, task_type=None, options=None):
+        time.sleep(delay)
+        return AIResponse(
+            ai_id=ai_id, role="test", content=f"{ai_id}: {prompt[:10]}",
+            tokens_used=100, latency_ms=delay * 1000, cost_usd=0.001,
+            timestamp="2026-01-01T00:00:00+00:00", success=True
+        )
+    return caller
+
+
+class _StubProviderHandler(BaseHTTPRequestHandler):
+    """Minimal provider stand-in answering in OpenAI, Anthropic or Gemini format"""
+    
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+    cached_prompt_tokens = 0  # Report this many prompt tokens as cache reads
+    received = []  # (path, headers, body) of every request
+    files = {}     # Mock batch API state: uploaded/output files and batches
+    batches = {}
+    failures = []  # (status, headers) answered to the next chat requests
+    truncate_below = 0  # OpenAI answers stop at "length" when max_tokens is lower
+    
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.startswith("/v1/files") or self.path.endswith("/batches"):
+            return self._create_batch(raw)
+        
+        body = json.loads(raw or b"{}")
+        _StubProviderHandler.received.append((self.path, dict(self.headers), body))
+        time.sleep(self.delay)
+        cached = self.cached_prompt_tokens
+        
+        if _StubProviderHandler.failures:
+            status, headers = _StubProviderHandler.failures.pop(0)
+            return self._send_error(status, headers)
+        
+        if body.get("stream"):
+            return self._stream_openai()
+        
+        if "contents" in body:
+            data = {"candidates": [{"content": {"parts": [{"text": "gemini plan"}]}}]}
+        elif "system" in body:
+            data = {"content": [{"text": "claude plan"}],
+                    "usage": {"input_tokens": 10, "output_tokens": 20, "cache_read_input_tokens": cached}}
+        else:
+            truncated = body.get("max_tokens", 0) < self.truncate_below
+            data = {"choices": [{"message": {"content": "openai plan"},
+                                 "finish_reason": "length" if truncated else "stop"}],
+                    "usage": {"total_tokens": 30 + cached, "prompt_tokens_details": {"cached_tokens": cached}}}
+        
+        self._send_json(data)
+    
+    def _send_json(self, data, content_type: str = "application/json"):
+        payload = data.encode() if isinstance(data, str) else json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _send_error(self, status: int, headers: dict):
+        payload = b'{"error": {"message": "stub failure"}}'
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _create_batch(self, raw: bytes):
+        """Mock OpenAI file upload / batch creation and Anthropic batch creation"""
+        import email
+        cls = _StubProviderHandler
+        
+        if self.path == "/v1/files":
+            message = email.message_from_bytes(
+                b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + raw)
+            upload = next(part for part in message.walk() if part.get_filename())
+            file_id = f"file-{len(cls.files)}"
+            cls.files[file_id] = upload.get_payload(decode=True).decode()
+            return self._send_json({"id": file_id})
+        
+        body = json.loads(raw)
+        batch_id = f"batch-{len(cls.batches)}"
+        if self.path == "/v1/batches":
+            requests = [json.loads(line) for line in cls.files[body["input_file_id"]].splitlines()]
+            cls.batches[batch_id] = {"api": "openai", "requests": requests, "polls": 0}
+            return self._send_json({"id": batch_id, "status": "validating"})
+        
+        cls.batches[batch_id] = {"api": "anthropic", "requests": body["requests"], "polls": 0}
+        return self._send_json({"id": batch_id, "processing_status": "in_progress"})
+    
+    def do_GET(self):
+        """Mock batch status polling and result download"""
+        cls = _StubProviderHandler
+        parts = self.path.strip("/").split("/")
+        
+        if self.path.startswith("/v1/files/"):
+            return self._send_json(cls.files[parts[2]], "application/jsonl")
+        
+        batch_id = parts[-2] if parts[-1] == "results" else parts[-1]
+        batch = cls.batches[batch_id]
+        
+        if parts[-1] == "results":
+            lines = [{"custom_id": r["custom_id"], "result": {"type": "succeeded", "message": {
+                "content": [{"text": f"batched {r['params']['messages'][-1]['content'][:12]}"}],
+                "usage": {"input_tokens": 10, "output_tokens": 20}}}} for r in batch["requests"]]
+            return self._send_json("\n".join(json.dumps(line) for line in lines), "application/jsonl")
+        
+        batch["polls"] += 1
+        finished = batch["polls"] >= 2
+        if batch["api"] == "anthropic":
+            return self._send_json({"id": batch_id,
+                                    "processing_status": "ended" if finished else "in_progress"})
+        
+        if not finished:
+            return self._send_json({"id": batch_id, "status": "in_progress"})
+        output_id = f"file-{len(cls.files)}"
+        cls.files[output_id] = "\n".join(json.dumps({
+            "custom_id": r["custom_id"],
+            "response": {"status_code": 200, "body": {
+                "choices": [{"message": {"content": f"batched {r['body']['messages'][-1]['content'][:12]}"}}],
+                "usage": {"total_tokens": 30}}}
+        }) for r in batch["requests"])
+        return self._send_json({"id": batch_id, "status": "completed", "output_file_id": output_id})
+    
+    def _stream_openai(self):
+        """Answer as an OpenAI SSE stream: a JSON plan followed by trailing prose"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        def send_chunk(data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        
+        chunks = ['{"plan": ', '"ship it"}', " Some trailing", " explanation."]
+        try:
+            for chunk in chunks:
+                event = {"choices": [{"delta": {"content": chunk}}]}
+                send_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                time.sleep(0.1)
+            usage = {"choices": [], "usage": {"total_tokens": 42}}
+            send_chunk(f"data: {json.dumps(usage)}\n\ndata: [DONE]\n\n".encode())
+            send_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Client stopped reading early
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_provider():
+    """Run a local provider stand-in and yield its base URL"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubProviderHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    _StubProviderHandler.delay = 0.0
+    _StubProviderHandler.cached_prompt_tokens = 0
+    _StubProviderHandler.received = []
+    _StubProviderHandler.files = {}
+    _StubProviderHandler.batches = {}
+    _StubProviderHandler.failures = []
+    _StubProviderHandler.truncate_below = 0
+
+
+@pytest.fixture(autouse=True)
+def pool_files(tmp_path, monkeypatch):
+    """Keep the SQLite files of every AIPoolManager in the test's tmp_path"""
+    from ai_pool.pool_manager import AIPoolManager
+    load_config = AIPoolManager._load_config
+    
+    def load_test_config(self):
+        config = load_config(self) or {}
+        memory_db = str(tmp_path / "memory_store.sqlite")
+        config.setdefault('telemetry', {})['storage'] = memory_db
+        pool_settings = config.setdefault('pool_settings', {})
+        pool_settings.setdefault('cache', {})['path'] = str(tmp_path / "response_cache.sqlite")
+        pool_settings.setdefault('circuit_breaker', {})['path'] = memory_db
+        pool_settings.setdefault('worker', {})['path'] = memory_db
+        return config
+    
+    monkeypatch.setattr(AIPoolManager, "_load_config", load_test_config)
+    return tmp_path
+
+
+def _point_pool_at(pool, base_url: str):
+    """Redirect every pool model to the stub provider"""
+    for ai_id in ["gpt4o", "claude", "gemini", "deepseek", "gpt5"]:
+        pool.ai_pool.setdefault(ai_id, {})["endpoint"] = f"{base_url}/{ai_id}"
+
+
+class TestAIPoolFanOut:
+    """Tests for concurrent plan generation"""
+    
+    def test_concurrent_fan_out_matches_sequential(self):
+        """Concurrent fan-out returns the same plan in the same order"""
+        from ai_pool.pool_manager import AIPoolManager
+        
+        pool = AIPoolManager()
+        for ai_id in ["gpt4o", "gemini", "claude", "deepseek"]:
+            setattr(pool, f"call_{ai_id}", _ok_response(ai_id, delay=0.2))
+        
+        start = time.time()
+        concurrent_plan = pool.generate_plan("t", "description", concurrent=True)
+        concurrent_elapsed = time.time() - start
+        
+        sequential_plan = pool.generate_plan("t", "description", concurrent=False)
+        
+        assert concurrent_elapsed < 0.6, "Fan-out latency should be close to the slowest call"
+        assert [r.ai_id for r in concurrent_plan.responses] == ["gpt4o", "gemini", "claude", "deepseek"]
+        assert [r.content for r in concurrent_plan.responses] == [r.content for r in sequential_plan.responses]
+        assert concurrent_plan.consensus_score == sequential_plan.consensus_score == 1.0
+    
+    
+    def test_quorum_and_deadline_return_partial_plan(self):
+        """Plans return at quorum or deadline with consensus over the responders"""
+        from ai_pool.pool_manager import AIPoolManager
+        
+        pool = AIPoolManager()
+        delays = {"gpt4o": 0.1, "gemini": 0.1, "claude": 0.1, "deepseek": 2.0}
+        for ai_id, delay in delays.items():
+            setattr(pool, f"call_{ai_id}", _ok_response(ai_id, delay=delay))
+        
+        start = time.time()
+        plan = pool.generate_plan("t", "description", concurrent=True, quorum=3)
+        assert time.time() - start < 0.6
+        assert [r.ai_id for r in plan.responses] == ["gpt4o", "gemini", "claude"]
+        assert plan.pending == ["deepseek"]
+        assert plan.consensus_score == 1.0
+        
+        start = time.time()
+        plan = pool.generate_plan("t", "description", concurrent=True, deadline_s=0.4)
+        assert time.time() - start < 0.8
+        assert plan.pending == ["deepseek"]
+        assert json.loads(pool.export_plan_json(plan))["pending"] == ["deepseek"]
+
+
+class TestAsyncAIPool:
+    """Tests for the asyncio provider layer"""
+    
+    def test_many_plans_on_one_loop(self, stub_provider):
+        """Many concurrent plans complete in roughly one provider round trip"""
+        pytest.importorskip("aiohttp")
+        import asyncio
+        from ai_pool.async_pool_manager import AsyncAIPoolManager
+        
+        _StubProviderHandler.delay = 0.3
+        
+        async def run():
+            async with AsyncAIPoolManager() as pool:
+                _point_pool_at(pool, stub_provider)
+                return await asyncio.gather(*(
+                    pool.generate_plan(f"task-{i}", "description") for i in range(10)
+                ))
+        
+        start = time.time()
+        plans = asyncio.run(run())
+        elapsed = time.time() - start
+        
+        assert len(plans) == 10
+        assert all(plan.consensus_score == 1.0 for plan in plans)
+        assert [r.content for r in plans[0].responses] == ["openai plan", "gemini plan", "claude plan", "openai plan"]
+        assert elapsed < 3.0, "40 requests should overlap on a single loop"
+    
+    def test_cancelled_call_returns_probe_and_tokens(self, stub_provider, tmp_path):
+        """Cancelling an in-flight call frees its half-open probe slot and rate-limit tokens"""
+        pytest.importorskip("aiohttp")
+        import asyncio
+        from ai_pool.async_pool_manager import AsyncAIPoolManager
+        from ai_pool.circuit_breaker import CircuitBreaker
+        
+        _StubProviderHandler.delay = 1.0
+        
+        async def run():
+            async with AsyncAIPoolManager() as pool:
+                _point_pool_at(pool, stub_provider)
+                pool.retries.enabled = False
+                pool.breakers = CircuitBreaker({"min_calls": 1, "open_seconds": 0.05},
+                                               str(tmp_path / "breakers.sqlite"))
+                pool.breakers.allow("gpt4o")
+                pool.breakers.record("gpt4o", False, 10.0)
+                await asyncio.sleep(0.1)  # Open long enough to admit one half-open probe
+                
+                bucket = pool.rate_limiter.limits["gpt4o"].tokens
+                call = asyncio.ensure_future(pool.call_gpt4o("Cancel me"))
+                await asyncio.sleep(0.3)
+                assert bucket.available < bucket.capacity
+                call.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await call
+                return bucket.available == bucket.capacity, pool.breakers.allow("gpt4o")
+        
+        tokens_returned, probe_free = asyncio.run(run())
+        assert tokens_returned and probe_free
+    
+    def test_persistent_breaker_routing_runs_off_the_loop(self, tmp_path):
+        """Routing reads shared breaker state on an executor thread, not the event loop"""
+        pytest.importorskip("aiohttp")
+        import asyncio
+        from ai_pool.async_pool_manager import AsyncAIPoolManager
+        from ai_pool.circuit_breaker import CircuitBreaker
+        
+        threads = set()
+        
+        def stub(ai_id):
+            async def caller(prompt, task_type=None, options=None):
+                return _ok_response(ai_id)(prompt)
+            return caller
+        
+        async def run():
+            async with AsyncAIPoolManager() as pool:
+                pool.breakers = CircuitBreaker({}, str(tmp_path / "breakers.sqlite"))
+                state = pool.breakers.state
+                pool.breakers.state = lambda ai_id: threads.add(threading.current_thread()) or state(ai_id)
+                for ai_id in ("gpt4o", "claude", "deepseek"):
+                    setattr(pool, f"call_{ai_id}", stub(ai_id))
+                return await pool.generate_plan("t", "d", task_type="routine_build",
+                                                include_research=False)
+        
+        plan = asyncio.run(run())
+        assert plan.responses and all(r.success for r in plan.responses)
+        assert threads and threading.main_thread() not in threads
+    
+    def test_deadline_cancels_stragglers(self):
+        """Async plans cancel models still running at the deadline"""
+        pytest.importorskip("aiohttp")
+        import asyncio
+        from ai_pool.async_pool_manager import AsyncAIPoolManager
+        
+        cancelled = []
+        
+        def stub(ai_id, delay):
+            async def caller(prompt, task_type=None, options=None):
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    cancelled.append(ai_id)
+                    raise
+                return _ok_response(ai_id)(prompt)
+            return caller
+        
+        async def run():
+            async with AsyncAIPoolManager() as pool:
+                for ai_id, delay in {"gpt4o": 0.05, "claude": 0.05, "deepseek": 5.0}.items():
+                    setattr(pool, f"call_{ai_id}", stub(ai_id, delay))
+                return await pool.generate_plan("t", "d", include_research=False, deadline_s=0.3)
+        
+        start = time.time()
+        plan = asyncio.run(run())
+        assert time.time() - start < 1.0
+        assert plan.pending == ["deepseek"] and cancelled == ["deepseek"]
+        assert plan.consensus_score == 1.0
+
+
+class TestProviderSessionPool:
+    """Tests for keep-alive provider connections"""
+    
+    def test_connections_are_reused(self, stub_provider):
+        """Repeated calls to one provider reuse a single connection"""
+        from ai_pool.http_pool import ProviderSessionPool
+        
+        pool = ProviderSessionPool(pool_size=2)
+        for _ in range(5):
+            response = pool.post("openai", f"{stub_provider}/v1/chat", json={"messages": []})
+            assert response.ok
+        
+        stats = pool.get_stats()["openai"]
+        assert stats["requests"] == 5
+        assert stats["new_connections"] == 1
+        assert stats["reuse_hits"] == 4
+        pool.close()
+    
+    def test_metrics_reach_telemetry(self, stub_provider, tmp_path):
+        """Connection stats are written to the pool_metrics table"""
+        from ai_pool.pool_manager import AIPoolManager
+        from telemetry.telemetry_collector import TelemetryCollector
+        
+        pool = AIPoolManager()
+        _point_pool_at(pool, stub_provider)
+        assert pool.call_gpt4o("plan").success
+        
+        collector = TelemetryCollector(str(tmp_path / "memory_store.sqlite"))
+        pool.report_metrics(collector)
+        
+        metrics = {(m["scope"], m["metric"]) for m in collector.get_pool_metrics("http_pool")}
+        assert ("openai", "reuse_hits") in metrics
+        assert ("openai", "new_connections") in metrics
+
+
+
+class TestResponseCache:
+    """Tests for the AI pool response cache"""
+    
+    def test_lru_ttl_and_persistence(self, tmp_path):
+        """Entries evict by LRU, expire by TTL and survive via SQLite"""
+        from ai_pool.response_cache import ResponseCache
+        from storage.migrations import schema_version, SCHEMA_VERSION
+        
+        db_path = str(tmp_path / "response_cache.sqlite")
+        cache = ResponseCache(max_entries=2, ttl_seconds=60, db_path=db_path)
+        assert schema_version(cache.storage) == SCHEMA_VERSION  # Table comes from the migrations
+        keys = [ResponseCache.make_key("gpt4o", "gpt-4o", "sys", f"p{i}", {}) for i in range(3)]
+        for key in keys:
+            cache.put(key, {"content": key})
+        
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get(keys[0]) == {"content": keys[0]}, "Evicted entry is served from SQLite"
+        
+        fresh = ResponseCache(max_entries=2, ttl_seconds=60, db_path=db_path)
+        assert fresh.get(keys[2]) == {"content": keys[2]}
+        assert fresh.get(ResponseCache.make_key("gpt4o", "gpt-4o", "sys", "other", {})) is None
+        assert fresh.get_stats()["disk_hits"] == 1
+        assert fresh.get_stats()["misses"] == 1
+        
+        expiring = ResponseCache(ttl_seconds=0)
+        expiring.put(keys[0], {"content": "stale"})
+        assert expiring.get(keys[0]) is None
+    
+    def test_expired_rows_are_purged(self, tmp_path):
+        """Expired SQLite entries are deleted on start-up and every purge_every stores"""
+        from ai_pool.response_cache import ResponseCache
+        
+        db_path = str(tmp_path / "response_cache.sqlite")
+        cache = ResponseCache(ttl_seconds=0, db_path=db_path, purge_every=3)
+        rows = lambda: cache.storage.query_one("SELECT COUNT(*) FROM response_cache")[0]
+        
+        for i in range(2):
+            cache.put(f"k{i}", {"content": i})
+        assert rows() == 2
+        cache.put("k2", {"content": 2})
+        assert rows() == 0
+        
+        cache.put("k3", {"content": 3})
+        ResponseCache(db_path=db_path)
+        assert rows() == 0 and cache.get_stats()["expirations"] == 3
+    
+    def test_repeated_prompt_costs_nothing(self, stub_provider):
+        """A repeated plan request is answered from cache"""
+        from ai_pool.pool_manager import AIPoolManager
+        
+        pool = AIPoolManager()
+        pool.cache = pool._init_cache({"enabled": True, "persistent": False})
+        _point_pool_at(pool, stub_provider)
+        
+        first = pool.call_claude("design deployment")
+        second = pool.call_claude("design deployment")
+        
+        assert first.success and not first.cached and first.tokens_used == 30
+        assert second.cached and second.content == first.content
+        assert second.tokens_used == 0 and second.cost_usd == 0
+        assert pool.get_session_usage()["cache"]["hits"] == 1
+
+
+
+class TestRateLimiter:
+    """Tests for token-bucket rate limiting"""
+    
+    def test_token_bucket_delays_and_rejects(self):
+        """Calls wait for token capacity and fail fast past max_wait"""
+        from ai_pool.rate_limiter import ProviderRateLimiter, RateLimitTimeout
+        
+        limiter = ProviderRateLimiter({
+            "gpt4o": {"rate_limit": {"requests_per_minute": 600, "tokens_per_minute": 600}}
+        })
+        
+        assert limiter.acquire("gpt4o", tokens=600) < 0.05
+        waited = limiter.acquire("gpt4o", tokens=5)
+        assert 0.3 < waited < 1.0, "5 tokens at 10 tokens/s should take ~0.5s"
+        
+        with pytest.raises(RateLimitTimeout):
+            limiter.acquire("gpt4o", tokens=600, max_wait=0.1)
+        
+        stats = limiter.get_stats()["gpt4o"]
+        assert stats["throttled"] == 1
+        assert stats["rejected"] == 1
+        assert stats["max_wait_ms"] >= 300
+        assert limiter.acquire("unlimited-model", tokens=10 ** 6) == 0.0
+    
+    def test_reconcile_refunds_unused_tokens(self):
+        """Over-estimated tokens are returned to the bucket"""
+        from ai_pool.rate_limiter import ProviderRateLimiter
+        
+        limiter = ProviderRateLimiter({"claude": {"rate_limit": {"tokens_per_minute": 1000}}})
+        limiter.acquire("claude", tokens=900)
+        limiter.reconcile("claude", estimated_tokens=900, actual_tokens=100)
+        
+        assert limiter.get_stats()["claude"]["tokens_available"] >= 900
+    
+    def test_priority_classes_share_capacity_fairly(self):
+        """Weighted fair queuing across classes; background yields and keeps off the reserve"""
+        from ai_pool.rate_limiter import ProviderRateLimiter
+        
+        limiter = ProviderRateLimiter(
+            {"gpt4o": {"rate_limit": {"tokens_per_minute": 600}}},
+            {"default": "interactive", "classes": {
+                "interactive": {"weight": 3},
+                "pipeline": {"weight": 1},
+                "background": {"weight": 1, "preemptible": True, "reserve": 0.5}
+            }}
+        )
+        limiter.acquire("gpt4o", tokens=400)
+        assert limiter.try_acquire("gpt4o", 1, priority="background") > 0
+        assert limiter.try_acquire("gpt4o", 1) == 0
+        limiter.acquire("gpt4o", tokens=199)  # Drain the bucket
+        
+        order = []
+        def caller(priority):
+            limiter.acquire("gpt4o", tokens=1, priority=priority)
+            order.append(priority)
+        
+        limiter.classes["background"].reserve = 0.0
+        threads = [threading.Thread(target=caller, args=("background",))]
+        threads += [threading.Thread(target=caller, args=(priority,))
+                    for priority in ["pipeline", "interactive"] * 4]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.005)
+        for thread in threads:
+            thread.join(timeout=5)
+        
+        assert order[:4].count("interactive") == 3
+        assert order[-1] == "background"
+        stats = limiter.get_stats()["gpt4o"]["priorities"]
+        assert stats["background"]["held_back"] == 1
+        assert stats["interactive"]["acquired"] == 6  # Including the two setup calls
+    
+    def test_timeouts_refund_virtual_time_and_weights_are_validated(self, capsys):
+        """A timed-out call does not push its class back; non-positive weights fall back to 1"""
+        from ai_pool.rate_limiter import ProviderRateLimiter, RateLimitTimeout
+        
+        limiter = ProviderRateLimiter(
+            {"gpt4o": {"rate_limit": {"tokens_per_minute": 60}}},
+            {"classes": {"interactive": {"weight": 2}, "pipeline": {"weight": 0}}}
+        )
+        assert limiter.classes["pipeline"].weight == 1.0
+        assert "invalid weight" in capsys.readouterr().out
+        
+        limiter.acquire("gpt4o", tokens=60)
+        before = dict(limiter._last_finish["gpt4o"])
+        for _ in range(3):
+            with pytest.raises(RateLimitTimeout):
+                limiter.acquire("gpt4o", tokens=30, max_wait=0.01, priority="pipeline")
+        
+        assert limiter._last_finish["gpt4o"].get("pipeline", 0.0) <= before["interactive"]
+        assert limiter._queues["gpt4o"] == []
+
+
+
+class TestHedgedRequests:
+    """Tests for hedged requests on latency-critical calls"""
+    
+    def test_hedge_beats_a_stalled_request(self):
+        """A duplicate request wins when the first one stalls"""
+        from ai_pool.pool_manager import AIPoolManager, CallOptions
+        from ai_pool.hedging import HedgePolicy
+        
+        pool = AIPoolManager()
+        pool.hedging = HedgePolicy({"default_threshold_ms": 100, "min_samples": 1000})
+        delays = [1.5, 0.0]
+        
+        def send(ai_id, prompt, options=None):
+            delay = delays.pop(0)
+            return _ok_response(ai_id, delay)(prompt)
+        
+        pool._send = send
+        start = time.time()
+        response = pool.call_gpt4o("plan", options=CallOptions(hedge=True))
+        
+        assert time.time() - start < 0.8
+        assert response.success and response.hedged
+        assert pool.hedging.get_stats()["hedge_wins"] == 1
+    
+    def test_loser_settles_reservation_and_caps_hedging(self):
+        """The duplicate's tokens are reconciled against the loser; running losers limit new hedges"""
+        from ai_pool.pool_manager import AIPoolManager, CallOptions
+        from ai_pool.hedging import HedgePolicy
+        
+        pool = AIPoolManager()
+        pool.hedging = HedgePolicy({"default_threshold_ms": 50, "min_samples": 1000,
+                                    "budget_burst": 5.0, "max_abandoned": 1})
+        pool.hedging.budget.credits = 5.0
+        delays = [0.6, 0.0, 0.3]
+        
+        def send(ai_id, prompt, options=None):
+            return _ok_response(ai_id, delays.pop(0))(prompt)
+        
+        reconciled = []
+        reconcile = pool.rate_limiter.reconcile
+        pool.rate_limiter.reconcile = lambda *args: (reconciled.append(args), reconcile(*args))
+        pool._send = send
+        
+        first = pool.call_gpt4o("plan", options=CallOptions(hedge=True))
+        assert first.hedged and pool.hedging.get_stats()["abandoned"] == 1
+        second = pool.call_gpt4o("plan", options=CallOptions(hedge=True))
+        assert not second.hedged
+        assert pool.hedging.get_stats()["abandon_denied"] == 1
+        
+        time.sleep(0.4)
+        assert pool.hedging.get_stats()["abandoned"] == 0
+        assert [actual for _, _, actual in reconciled] == [100, 100, 100]
+        assert len({estimated for _, estimated, _ in reconciled}) == 1
+    
+    def test_threshold_and_budget(self):
+        """Threshold follows the rolling p90 and hedges stay within budget"""
+        from ai_pool.hedging import HedgePolicy, HedgeBudget
+        
+        policy = HedgePolicy({"min_samples": 10, "min_threshold_ms": 1})
+        for latency in range(1, 101):
+            policy.latency.record("claude", latency * 10.0)
+        assert policy.threshold_ms("claude") == 900.0
+        assert policy.threshold_ms("gemini") == policy.default_threshold_ms
+        
+        budget = HedgeBudget(ratio=0.1, burst=1.0)
+        spent = 0
+        for _ in range(100):
+            budget.deposit()
+            spent += budget.try_spend()
+        assert spent <= 11
+
+
+
+class TestStreaming:
+    """Test SSE streaming, time to first token and early stop"""
+    
+    def test_stream_records_ttft_and_usage(self, stub_provider):
+        """Full stream: TTFT is reported before total latency, usage from the final event"""
+        from ai_pool.pool_manager import AIPoolManager, CallOptions
+        
+        pool = AIPoolManager()
+        _point_pool_at(pool, stub_provider)
+        
+        response = pool.call_gpt4o("plan", options=CallOptions(stream=True))
+        
+        assert response.success and not response.stopped_early
+        assert response.content == '{"plan": "ship it"} Some trailing explanation.'
+        assert response.tokens_used == 42
+        assert 0 < response.ttft_ms < response.latency_ms - 200
+    
+    def test_stop_when_plan_json_closes(self, stub_provider):
+        """Generation stops once the streamed JSON plan is complete"""
+        from ai_pool.pool_manager import AIPoolManager, CallOptions
+        from ai_pool.streaming import json_plan_complete
+        
+        pool = AIPoolManager()
+        _point_pool_at(pool, stub_provider)
+        
+        options = CallOptions(stream=True, stop_when=json_plan_complete)
+        response = pool.call_gpt4o("plan", options=options)
+        
+        assert response.success and response.stopped_early
+        assert json.loads(response.content) == {"plan": "ship it"}
+        assert response.latency_ms < 350
+        assert not json_plan_complete('{"plan": "a } inside"')
+    
+    def test_async_stream_stops_early(self, stub_provider):
+        """The async client streams and stops the same way"""
+        pytest.importorskip("aiohttp")
+        import asyncio
+        from ai_pool.async_pool_manager import AsyncAIPoolManager
+        from ai_pool.pool_manager import CallOptions
+        from ai_pool.streaming import json_plan_complete
+        
+        async def run():
+            async with AsyncAIPoolManager() as pool:
+                _point_pool_at(pool, stub_provider)
+                options = CallOptions(stream=True, stop_when=json_plan_complete)
+                return await pool.call_deepseek("analyse", options=options)
+        
+        response = asyncio.run(run())
+        assert response.success and response.stopped_early
+        assert response.ttft_ms is not None and response.ttft_ms <= response.latency_ms
+
+
+class TestCircuitBreaker:
+    """Tests for per-provider circuit breakers"""
+    
+    def test_open_half_open_close_and_shared_state(self, tmp_path):
+        """Failures open the circuit, a probe closes it, and state survives restarts"""
+        from ai_pool.circuit_breaker import CircuitBreaker
+        
+        db_path = str(tmp_path / "breakers.sqlite")
+        settings = {"min_calls": 3, "failure_rate": 0.5, "open_seconds": 0.2}
+        breaker = CircuitBreaker(settings, db_path)
+        
+        for _ in range(3):
+            assert breaker.allow("gemini")
+            breaker.record("gemini", False, 50.0)
+        assert not breaker.allow("gemini")
+        
+        # A new process (short-lived CLI run) sees the open circuit
+        other = CircuitBreaker(settings, db_path)
+        assert not other.allow("gemini")
+        assert other.allow("claude")
+        
+        time.sleep(0.25)
+        assert other.allow("gemini")
+        assert not other.allow("gemini"), "Only one half-open probe at a time"
+        other.record("gemini", True, 50.0)
+        assert breaker.allow("gemini") and breaker.state("gemini") == "closed"
+    
+    def test_concurrent_processes_keep_every_outcome(self, tmp_path):
+        """Breakers sharing a database record outcomes without overwriting each other"""
+        from ai_pool.circuit_breaker import CircuitBreaker
+        
+        db_path = str(tmp_path / "breakers.sqlite")
+        settings = {"min_calls": 1000, "window_seconds": 600}
+        breakers = [CircuitBreaker(settings, db_path) for _ in range(4)]
+        
+        def record(breaker):
+            for _ in range(25):
+                breaker.record("claude", True, 10.0)
+        
+        threads = [threading.Thread(target=record, args=(b,)) for b in breakers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        fresh = CircuitBreaker(settings, db_path)
+        fresh.state("claude")
+        assert fresh.get_stats()["claude"]["window_calls"] == 100
+    
+    def test_open_circuit_fails_fast(self, tmp_path):
+        """An open circuit skips the provider call entirely"""
+        from ai_pool.pool_manager import AIPoolManager
+        from ai_pool.circuit_breaker import CircuitBreaker
+        
+        pool = AIPoolManager()
+        pool.breakers = CircuitBreaker({"min_calls": 2, "open_seconds": 60},
+                                       str(tmp_path / "breakers.sqlite"))
+        pool.retries.enabled = False  # One send per call
+        calls = []
+        
+        def send(ai_id, prompt, options=None):
+            calls.append(ai_id)
+            return pool._error_response(ai_id, "test", "API error: 503", 60000.0)
+        
+        pool._send = send
+        for _ in range(4):
+            response = pool.call_deepseek("analyse")
+        
+        assert len(calls) == 2
+        assert not response.success and response.error.startswith("Circuit open")
+        assert response.latency_ms == 0
+        assert pool.get_session_usage()["circuit_breakers"]["deepseek"]["rejected"] == 2
+
+
+class TestRetries:
+    """Tests for jittered retries of transient provider failures"""
+    
+    def test_retry_after_and_decorrelated_jitter(self):
+        """Retry-After formats parse and jittered pauses stay within bounds"""
+        from email.utils import formatdate
+        from ai_pool.retry import RetryPolicy, parse_retry_after
+        
+        assert parse_retry_after({"retry-after": "2"}) == 2.0
+        assert parse_retry_after({"retry-after-ms": "150", "retry-after": "9"}) == 0.15
+        assert 8 < parse_retry_after({"retry-after": formatdate(time.time() + 10, usegmt=True)}) <= 10
+        assert parse_retry_after({}) is None
+        
+        policy = RetryPolicy(base_delay=0.1, max_delay=1.0, max_retry_after=5)
+        delay = 0.0
+        for _ in range(20):
+            delay = policy.next_delay(delay)
+            assert 0.1 <= delay <= 1.0
+        assert policy.next_delay(0.1, retry_after=2.0) == 2.0
+        assert policy.next_delay(0.1, retry_after=60) is None
+        assert policy.retryable(429) and policy.retryable(None) and not policy.retryable(400)
+    
+    def test_transient_failures_are_retried(self, stub_provider):
+        """429/503 answers are retried after Retry-After; the response records the retries"""
+        from ai_pool.pool_manager import AIPoolManager, CallOptions
+        
+        pool = AIPoolManager()
+        pool.usage.db_path = None
+        _point_pool_at(pool, stub_provider)
+        _StubProviderHandler.failures = [(429, {"Retry-After": "0.3"}), (503, {})]
+        
+        response = pool.call_gpt4o("Retry me")
+        assert response.success and response.retries == 2
+        assert response.retry_latency_ms >= 300
+        
+        _StubProviderHandler.failures = [(400, {})]
+        assert pool.call_gpt4o("Bad request").status_code == 400
+        
+        _StubProviderHandler.failures = [(429, {"Retry-After": "2"})]
+        response = pool.call_gpt4o("Deadline", options=CallOptions(deadline=time.monotonic() + 1))
+        assert not response.success and response.retries == 0
+        
+        stats = pool.get_session_usage()["retries"]["gpt4o"]
+        assert stats["retries"] == 2 and stats["recovered"] == 1
+        assert stats["deadline_skipped"] == 1 and stats["by_status"] == {"429": 1, "503": 1}
+        pool.close()
+    
+    def test_retry_timeout_on_rate_limiter_refunds_once(self):
+        """A retry that cannot get capacity back leaves the token bucket where the call found it"""
+        from ai_pool.pool_manager import AIPoolManager
+        from ai_pool.rate_limiter import ProviderRateLimiter, RateLimitTimeout
+        
+        pool = AIPoolManager()
+        pool.rate_limiter = ProviderRateLimiter({"claude": {"rate_limit": {"tokens_per_minute": 60000}}})
+        pool.rate_limiter.acquire("claude", tokens=40000)
+        pool._send = lambda ai_id, prompt, options=None: pool._error_response(ai_id, "test", "busy", 1, 503)
+        pool.retries.plan_retry = lambda ai_id, attempt, *args: 0.0 if attempt == 1 else None
+        acquire = pool.rate_limiter.acquire
+        acquires = []
+        
+        def second_acquire_times_out(*args, **kwargs):
+            acquires.append(args)
+            if len(acquires) == 2:
+                raise RateLimitTimeout("claude rate limit: no capacity within 0s")
+            return acquire(*args, **kwargs)
+        
+        pool.rate_limiter.acquire = second_acquire_times_out
+        response = pool.call_claude("Retry me")
+        
+        assert not response.success and len(acquires) == 2
+        available = pool.rate_limiter.get_stats()["claude"]["tokens_available"]
+        assert available < 20000 + 1000  # A second refund would add the ~4k reservation
+
+
+class TestOutputBudget:
+    """Tests for self-tuning max_tokens"""
+    
+    def test_percentile_budget_growth_and_persistence(self, tmp_path):
+        """Budgets follow the p95 completion length plus headroom and survive restarts"""
+        from ai_pool.output_budget import OutputBudget
+        from ai_pool.pool_manager import PROVIDERS
+        
+        settings = {"min_samples": 10, "min_tokens": 64, "headroom": 0.25, "percentile": 0.95}
+        db_path = str(tmp_path / "memory_store.sqlite")
+        budget = OutputBudget(settings, PROVIDERS, db_path)
+        
+        assert budget.max_tokens("claude", "deployment") == 4096  # Not enough samples yet
+        for tokens in range(100, 300, 10):
+            budget.record("claude", "deployment", tokens)
+        assert budget.max_tokens("claude", "deployment") == 384  # p95 = 280, x1.25 = 350 -> 384
+        assert budget.max_tokens("claude", "research") == 4096
+        
+        assert budget.grow("claude", 384) == 768
+        assert budget.grow("claude", 4096) is None
+        
+        budget.save()
+        restored = OutputBudget(settings, PROVIDERS, db_path)
+        assert restored.max_tokens("claude", "deployment") == 384
+    
+    def test_budgets_saved_every_n_completions(self, tmp_path):
+        """Windows reach disk without close(), once save_every completions were recorded"""
+        from ai_pool.output_budget import OutputBudget
+        from ai_pool.pool_manager import PROVIDERS
+        
+        settings = {"min_samples": 5, "min_tokens": 64, "save_every": 5}
+        db_path = str(tmp_path / "memory_store.sqlite")
+        budget = OutputBudget(settings, PROVIDERS, db_path)
+        
+        for tokens in range(100, 140, 10):
+            budget.record("claude", "deployment", tokens)
+        assert OutputBudget(settings, PROVIDERS, db_path).learned("claude", "deployment") is None
+        
+        budget.record("claude", "deployment", 140)
+        assert OutputBudget(settings, PROVIDERS, db_path).learned("claude", "deployment") == 192
+    
+    def test_truncated_completion_retries_with_larger_budget(self, stub_provider):
+        """Calls use the learned budget and grow it when the answer hits max_tokens"""
+        from ai_pool.pool_manager import AIPoolManager
+        
+        pool = AIPoolManager()
+        pool.usage.db_path = None
+        pool.output_budget.db_path = None
+        pool.output_budget.min_tokens = 64
+        _point_pool_at(pool, stub_provider)
+        for _ in range(20):
+            pool.output_budget.record("gpt4o", "planning", 100)
+        
+        response = pool.call_gpt4o("Short plan")
+        assert response.success and not response.truncated
+        assert response.budget_retries == 0
+        assert [body["max_tokens"] for _, _, body in _StubProviderHandler.received] == [128]
+        
+        _StubProviderHandler.truncate_below = 1000
+        response = pool.call_gpt4o("Long plan")
+        assert response.success and not response.truncated
+        assert response.budget_retries == 3 and response.tokens_used == 120
+        assert [body["max_tokens"] for _, _, body in _StubProviderHandler.received[1:]] == [128, 256, 512, 1024]
+        assert pool.get_session_usage()["output_budget"]["all"]["grown"] == 3
+        pool.close()
+
+
+class TestPoolBenchmark:
+    """Tests for the mock provider server and the load benchmark"""
+    
+    def test_mock_provider_speaks_every_api(self, tmp_path):
+        """Every pool model parses the mock's answers, streams, truncation and errors"""
+        from ai_pool.benchmark import benchmark_config
+        from ai_pool.mock_provider import MockProviderServer
+        from ai_pool.pool_manager import AIPoolManager, CallOptions
+        
+        profiles = {"defaults": {"latency": "fixed", "latency_ms": 10,
+                                 "completion_tokens": 50, "completion_tokens_stddev": 0},
+                    "deepseek": {"error_rate": 1.0, "error_statuses": [503]}}
+        with MockProviderServer(profiles, seed=1) as mock:
+            pool = AIPoolManager(benchmark_config(mock.base_url, str(tmp_path)))
+            pool.retries.enabled = False
+            
+            for response in (pool.call_gpt4o("Plan"), pool.call_claude("Deploy"), pool.call_gemini("Research")):
+                assert response.success and response.output_tokens == 50 and not response.truncated
+            
+            streamed = pool.call_gpt4o("Streamed plan", options=CallOptions(stream=True))
+            assert streamed.success and streamed.ttft_ms is not None and streamed.output_tokens == 50
+            
+            truncated = pool.call_claude("Long deploy", options=CallOptions(max_tokens=20))
+            assert truncated.truncated and truncated.output_tokens == 20
+            
+            failed = pool.call_deepseek("Analyze")
+            assert not failed.success and failed.status_code == 503
+            pool.close()
+            
+            stats = mock.get_stats()
+        assert stats["all"] == {"requests": 6, "errors": 1, "streamed": 1, "truncated": 1}
+        assert stats["anthropic"]["requests"] == 2
+    
+    def test_benchmark_reports_throughput_and_percentiles(self, tmp_path):
+        """The benchmark drives generate_plan concurrently and keeps telemetry in its workdir"""
+        from ai_pool.benchmark import run_benchmark
+        
+        settings = {"plans": 12, "concurrency": 4, "seed": 3,
+                    "plan_options": {"include_research": False},
+                    "mock_providers": {"defaults": {"latency": "uniform", "latency_min_ms": 20,
+                                                    "latency_max_ms": 60, "completion_tokens": 100,
+                                                    "completion_tokens_stddev": 10}}}
+        report = run_benchmark(settings, workdir=str(tmp_path))
+        
+        assert report["plans"] == 12 and report["successful_plans"] == 12
+        assert report["mock_providers"]["all"]["requests"] == 36  # GPT-4o, Claude, DeepSeek per plan
+        latency = report["latency_ms"]
+        assert 20 <= latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+        assert report["throughput_plans_per_s"] > 0 and report["cost_per_plan_usd"] > 0
+        assert report["cost_per_plan_usd"] == pytest.approx(report["total_cost_usd"] / 12, abs=1e-6)
+        assert (tmp_path / "memory_store.sqlite").exists()
+
+
+class TestModelRouter:
+    """Tests for latency- and cost-aware routing"""
+    
+    WEIGHTS = {"gpt4o": 0.30, "gemini": 0.20, "claude": 0.20, "deepseek": 0.15}
+    
+    def test_skips_failing_and_expensive_models(self, tmp_path):
+        """Routing drops unhealthy models and stops at the quality floor"""
+        import sqlite3
+        from ai_pool.router import ModelRouter
+        
+        db_path = str(tmp_path / "memory_store.sqlite")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE ai_performance (id INTEGER PRIMARY KEY, timestamp TEXT, ai_id TEXT,
+                success_count INTEGER, failure_count INTEGER, avg_latency_ms REAL, total_cost_usd REAL)
+        """)
+        conn.executemany(
+            "INSERT INTO ai_performance (timestamp, ai_id, success_count, failure_count, avg_latency_ms, total_cost_usd) VALUES (?, ?, ?, ?, ?, ?)",
+            [("2026-01-01", "gpt4o", 10, 0, 2000, 0.20),
+             ("2026-01-01", "claude", 2, 8, 3000, 0.10),
+             ("2026-01-01", "gemini", 10, 0, 8000, 0.05),
+             ("2026-01-01", "deepseek", 10, 0, 1000, 0.02)]
+        )
+        conn.commit()
+        conn.close()
+        
+        settings = {"min_samples": 5,
+                    "task_types": {"routine_build": {"required": ["gpt4o"], "quality_floor": 0.5}}}
+        router = ModelRouter(settings, self.WEIGHTS, db_path)
+        candidates = ["gpt4o", "gemini", "claude", "deepseek"]
+        
+        assert not router.is_healthy("claude")
+        assert router.select(candidates, "routine_build") == ["gpt4o", "deepseek"]
+        assert router.select(candidates, None) == candidates
+        assert router.select(candidates, "routine_build",
+                             available=lambda ai_id: ai_id != "deepseek") == ["gpt4o", "gemini"]
+        assert router.get_stats()["all"]["skipped"] == 4
+    
+    def test_routine_plan_uses_fewer_models(self):
+        """A routed plan consults only what the quality floor needs"""
+        from ai_pool.pool_manager import AIPoolManager
+        from ai_pool.router import ModelRouter
+        
+        pool = AIPoolManager()
+        pool.router = ModelRouter(pool.pool_settings.get("routing", {}), self.WEIGHTS)
+        for ai_id in self.WEIGHTS:
+            setattr(pool, f"call_{ai_id}", _ok_response(ai_id))
+        
+        plan = pool.generate_plan("t", "description", task_type="routine_build")
+        
+        assert len(plan.responses) == 3
+        assert plan.responses[0].ai_id == "gpt4o"
+        assert plan.consensus_score == 1.0
+
+
+class TestSingleFlight:
+    """Tests for coalescing identical in-flight requests"""
+    
+    def test_identical_requests_share_one_call(self):
+        """Concurrent identical prompts make one provider call"""
+        from concurrent.futures import ThreadPoolExecutor
+        from ai_pool.pool_manager import AIPoolManager
+        
+        pool = AIPoolManager()
+        sends = []
+        
+        def send(ai_id, prompt, options=None):
+            sends.append(prompt)
+            return _ok_response(ai_id, delay=0.3)(prompt)
+        
+        pool._send = send
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            futures = [executor.submit(pool.call_claude, "same prompt") for _ in range(5)]
+            futures.append(executor.submit(pool.call_claude, "other prompt"))
+            responses = [f.result() for f in futures]
+        
+        assert sorted(sends) == ["other prompt", "same prompt"]
+        assert all(r.success for r in responses)
+        assert sum(r.coalesced for r in responses) == 4
+        assert sum(r.tokens_used for r in responses) == 200
+        assert pool.get_session_usage()["single_flight"]["coalesced"] == 4
+    
+    def test_async_requests_share_one_call(self):
+        """The async manager coalesces on the event loop"""
+        pytest.importorskip("aiohttp")
+        import asyncio
+        from ai_pool.async_pool_manager import AsyncAIPoolManager
+        
+        sends = []
+        
+        async def run():
+            async with AsyncAIPoolManager() as pool:
+                async def send(ai_id, prompt, options=None):
+                    sends.append(prompt)
+                    await asyncio.sleep(0.2)
+                    return _ok_response(ai_id)(prompt)
+                
+                pool._send_async = send
+                return await asyncio.gather(*(pool.call_gpt4o("same prompt") for _ in range(10)))
+        
+        responses = asyncio.run(run())
+        assert len(sends) == 1
+        assert sum(r.coalesced for r in responses) == 9
+    
+    def test_key_covers_output_budget_and_stream(self):
+        """Calls with a different max_tokens or streaming mode are neither shared nor cached together"""
+        from ai_pool.pool_manager import AIPoolManager, CallOptions
+        
+        pool = AIPoolManager()
+        keys = {pool._request_key("claude", "p"),
+                pool._request_key("claude", "p", CallOptions(max_tokens=256)),
+                pool._request_key("claude", "p", CallOptions(stream=True))}
+        assert len(keys) == 3
+        assert pool._request_key("claude", "p") == \
+            pool._request_key("claude", "p", CallOptions(max_tokens=4096))
+    
+    def test_followers_only_join_equal_or_higher_priority(self):
+        """A caller never waits on a lower-priority leader; later callers join the higher one"""
+        from ai_pool.single_flight import SingleFlight
+        from ai_pool.rate_limiter import ProviderRateLimiter
+        
+        limiter = ProviderRateLimiter({})
+        background = limiter.priority("background").rank
+        interactive = limiter.priority("interactive").rank
+        group = SingleFlight()
+        release = threading.Event()
+        runs = []
+        
+        def slow(name):
+            runs.append(name)
+            release.wait(5)
+            return name
+        
+        threads = [threading.Thread(target=group.do, args=("k", lambda: slow("bg"), background))]
+        threads[0].start()
+        while not runs:
+            time.sleep(0.01)
+        threads.append(threading.Thread(target=group.do, args=("k", lambda: slow("ui"), interactive)))
+        threads[1].start()
+        while len(runs) < 2:
+            time.sleep(0.01)
+        results = []
+        for rank in (interactive, background):
+            threads.append(threading.Thread(
+                target=lambda r=rank: results.append(group.do("k", lambda: slow("extra"), r))))
+            threads[-1].start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        assert runs == ["bg", "ui"]
+        assert sorted(results) == [("ui", True), ("ui", True)]
+        assert group.get_stats()["outranked"] == 1
+
+
+class TestPromptCaching:
+    """Tests for provider-side prompt prefix caching"""
+    
+    def test_cache_fields_sent_and_cached_tokens_recorded(self, stub_provider):
+        """System prompts are marked cacheable and cache reads are counted and discounted"""
+        from ai_pool.pool_manager import AIPoolManager, PROVIDERS
+        
+        pool = AIPoolManager()
+        _point_pool_at(pool, stub_provider)
+        _StubProviderHandler.cached_prompt_tokens = 1000
+        
+        claude = pool.call_claude("design deployment")
+        gpt4o = pool.call_gpt4o("plan")
+        pool.call_gpt4o("another plan")
+        
+        requests = {path: (headers, body) for path, headers, body in _StubProviderHandler.received}
+        claude_headers, claude_body = requests["/claude"]
+        assert claude_headers["anthropic-version"] == "2023-06-01"
+        assert claude_body["system"] == [{"type": "text", "text": PROVIDERS["claude"]["system"],
+                                          "cache_control": {"type": "ephemeral"}}]
+        
+        _, gpt4o_body = requests["/gpt4o"]
+        assert gpt4o_body["messages"][0]["role"] == "system"
+        keys = {body.get("prompt_cache_key") for path, _, body in _StubProviderHandler.received
+                if path == "/gpt4o"}
+        assert len(keys) == 1 and keys.pop().startswith("archon-gpt4o-")
+        
+        assert claude.cached_prompt_tokens == 1000 and claude.tokens_used == 1030
+        assert claude.cost_usd < 1030 * PROVIDERS["claude"]["cost_per_token"] * 0.2
+        assert gpt4o.cached_prompt_tokens == 1000
+        assert gpt4o.cost_usd == pytest.approx((1030 - 500) * PROVIDERS["gpt4o"]["cost_per_token"])
+    
+    def test_disabled_sends_plain_requests(self, stub_provider):
+        """Turning prompt caching off restores the plain request bodies"""
+        from ai_pool.pool_manager import AIPoolManager, PROVIDERS
+        
+        pool = AIPoolManager()
+        pool.prompt_caching = False
+        _point_pool_at(pool, stub_provider)
+        
+        pool.call_claude("design deployment")
+        pool.call_deepseek("analyse")
+        
+        bodies = {path: body for path, _, body in _StubProviderHandler.received}
+        assert bodies["/claude"]["system"] == PROVIDERS["claude"]["system"]
+        assert "prompt_cache_key" not in bodies["/deepseek"]
+
+
+class TestBatchMode:
+    """Tests for offline batch plan generation"""
+    
+    def test_plans_from_mock_batch_endpoints(self, stub_provider):
+        """OpenAI/Anthropic consultations go through batch jobs, the rest are called directly"""
+        from ai_pool.pool_manager import AIPoolManager, PROVIDERS
+        
+        pool = AIPoolManager()
+        _point_pool_at(pool, stub_provider)
+        pool.ai_pool["gpt4o"]["endpoint"] = f"{stub_provider}/v1/chat/completions"
+        pool.ai_pool["claude"]["endpoint"] = f"{stub_provider}/v1/messages"
+        pool.pool_settings["batch"] = {"poll_interval_seconds": 0.05, "max_wait_seconds": 5}
+        
+        tasks = [(f"module_{i}", f"Re-plan module {i}") for i in range(3)]
+        plans = pool.generate_plans_batch(tasks)
+        
+        assert len(plans) == 3 and [p.task for p in plans] == ["module_0", "module_1", "module_2"]
+        assert all(p.consensus_score == 1.0 for p in plans)
+        gpt4o, gemini, claude, deepseek = plans[1].responses
+        assert gpt4o.content.startswith("batched Task: module")
+        assert claude.content.startswith("batched Design")
+        assert gemini.content == "gemini plan" and deepseek.content == "openai plan"
+        assert gpt4o.cost_usd == pytest.approx(30 * PROVIDERS["gpt4o"]["cost_per_token"] * 0.5)
+        
+        # One batch job per batch-capable model, direct calls for the others
+        assert len(_StubProviderHandler.batches) == 2
+        direct = [path.split("?")[0] for path, _, _ in _StubProviderHandler.received]
+        assert sorted(set(direct)) == ["/deepseek", "/gemini"] and len(direct) == 6
+
+
+
+class TestTokenEstimator:
+    """Tests for pre-flight token and cost estimation"""
+    
+    def test_usage_priced_from_price_table(self):
+        """Split usage is priced per input/cached/output token; Gemini uses usageMetadata"""
+        from ai_pool.pool_manager import AIPoolManager
+        
+        pool = AIPoolManager()
+        pricing = pool.ai_pool["gpt4o"]["pricing"]
+        
+        _, tokens, cost, cached = pool._parse_response("gpt4o", {
+            "choices": [{"message": {"content": "plan"}}],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 200, "total_tokens": 1200,
+                      "prompt_tokens_details": {"cached_tokens": 400}}})
+        assert tokens == 1200 and cached == 400
+        assert cost == pytest.approx((600 * pricing["input"] + 400 * pricing["cached_input"]
+                                      + 200 * pricing["output"]) / 1e6)
+        
+        _, tokens, _, _ = pool._parse_response("gemini", {
+            "candidates": [{"content": {"parts": [{"text": "one two three"}]}}],
+            "usageMetadata": {"promptTokenCount": 50, "candidatesTokenCount": 7, "totalTokenCount": 57}})
+        assert tokens == 57
+    
+    def test_oversized_prompt_trimmed_or_rejected(self, stub_provider):
+        """Prompts over the context budget are trimmed before sending, or rejected"""
+        from ai_pool.pool_manager import AIPoolManager, PROVIDERS
+        
+        pool = AIPoolManager()
+        _point_pool_at(pool, stub_provider)
+        pool.ai_pool["deepseek"]["context_window"] = PROVIDERS["deepseek"]["max_tokens"] + 200
+        prompt = "START " + "filler words " * 2000 + " END"
+        
+        response = pool.call_deepseek(prompt)
+        sent = _StubProviderHandler.received[-1][2]["messages"][-1]["content"]
+        assert response.success
+        assert sent.startswith("START") and sent.endswith("END") and "[trimmed]" in sent
+        assert pool.estimator.count_input("deepseek", sent) <= 200
+        
+        pool.estimator.oversize = "reject"
+        response = pool.call_deepseek(prompt)
+        assert not response.success and "Prompt too large" in response.error
+        assert len(_StubProviderHandler.received) == 1
+        assert pool.get_session_usage()["preflight"]["rejected"] == 1
+    
+    def test_plan_estimate_feeds_cost_efficiency(self):
+        """estimate_plan predicts plan tokens and cost the TrustEngine can score"""
+        from ai_pool.pool_manager import AIPoolManager
+        from supervisor.trust_engine import TrustEngine
+        
+        pool = AIPoolManager()
+        estimate = pool.estimate_plan("deploy_dashboard", "Deploy the dashboard", include_research=False)
+        
+        assert set(estimate["models"]) == {"gpt4o", "claude", "deepseek"}
+        gpt4o = estimate["models"]["gpt4o"]
+        assert gpt4o["input_tokens"] > 0 and gpt4o["output_tokens"] == 1000
+        assert 0 < estimate["estimated_cost"] < estimate["max_cost"]
+        assert estimate["estimated_tokens"] == sum(
+            m["input_tokens"] + m["output_tokens"] for m in estimate["models"].values())
+        assert 0.0 <= TrustEngine().evaluate_cost_efficiency(estimate) <= 1.0
+
+
+
+class TestPlanCascade:
+    """Tests for the cheap-first planner cascade"""
+    
+    CONFIDENT = json.dumps({"steps": ["build", "test", "deploy"], "confidence": 0.9})
+    
+    def test_confidence_checks(self):
+        """Malformed JSON, missing steps and low self-reported scores fail the check"""
+        from ai_pool.cascade import PlanCascade
+        
+        cascade = PlanCascade({"min_steps": 3, "min_confidence": 0.7})
+        assert cascade.assess(f"Here is the plan:\n```json\n{self.CONFIDENT}\n```") == []
+        assert "malformed JSON" in cascade.assess('{"steps": ["a", "b", "c"], "confidence": ')
+        assert cascade.assess(json.dumps({"steps": ["a"], "confidence": 0.9}))[0].startswith("missing steps")
+        assert cascade.assess(json.dumps({"steps": ["a", "b", "c"], "confidence": 45}))[0].startswith("low confidence")
+        
+        lenient = PlanCascade({"require_json": False})
+        assert lenient.assess("1. build\n2. test\n3. deploy\nConfidence: 8/10") == []
+    
+    def _pool(self, replies):
+        """Pool whose cascade tiers answer with canned content"""
+        from ai_pool.pool_manager import AIPoolManager
+        
+        pool = AIPoolManager()
+        calls = []
+        for ai_id, content in replies.items():
+            def caller(prompt, task_type=None, options=None, ai_id=ai_id, content=content):
+                calls.append(ai_id)
+                response = _ok_response(ai_id)(prompt)
+                response.content = content
+                return response
+            setattr(pool, f"call_{ai_id}", caller)
+        return pool, calls
+    
+    def test_cheap_tier_answers_confident_plans(self):
+        """A confident cheap answer is used and larger models are never called"""
+        pool, calls = self._pool({"gemini": self.CONFIDENT, "gpt4o": self.CONFIDENT,
+                                  "claude": "claude", "deepseek": "deepseek"})
+        
+        plan = pool.generate_plan("routine_build", "Rebuild the dashboard",
+                                  include_research=False, cascade=True)
+        
+        planner = plan.responses[0]
+        assert planner.ai_id == "gpt4o" and planner.cascade_tier == "gemini"
+        assert planner.escalations == 0 and "gpt4o" not in calls
+        assert plan.pending == [] and plan.consensus_score == 1.0
+    
+    def test_low_confidence_escalates(self):
+        """A failed check escalates to the next tier and charges both attempts"""
+        pool, calls = self._pool({"gemini": '{"steps": ["do it"], "confidence": 0.3}',
+                                  "gpt4o": self.CONFIDENT})
+        
+        response = pool.call_planner_cascade("Task: deploy")
+        
+        assert calls == ["gemini", "gpt4o"]
+        assert response.ai_id == "gpt4o" and response.escalations == 1
+        assert response.tokens_used == 200 and response.cost_usd == pytest.approx(0.002)
+        stats = pool.get_session_usage()["cascade"]
+        assert stats["all"]["escalations"] == 1 and stats["gpt4o"]["answered"] == 1
+    
+    def test_manual_only_tiers_need_opt_in(self):
+        """GPT-5 listed as a tier is skipped unless cascade.allow_manual is set"""
+        pool, calls = self._pool({"gemini": '{"steps": ["do it"], "confidence": 0.3}',
+                                  "gpt5": self.CONFIDENT})
+        pool.cascade.tiers = ["gemini", "gpt5"]
+        pool._is_active = lambda ai_id: True
+        
+        response = pool.call_planner_cascade("Task: deploy")
+        assert calls == ["gemini"] and response.cascade_tier == "gemini"
+        
+        pool.cascade.allow_manual = True
+        response = pool.call_planner_cascade("Task: deploy")
+        assert calls[1:] == ["gemini", "gpt5"]
+        assert response.ai_id == "gpt4o" and response.cascade_tier == "gpt5"
+
+
+
+class TestUsageLedger:
+    """Tests for the bounded usage ledger"""
+    
+    def test_ring_buffer_aggregates_and_flush(self, tmp_path):
+        """Memory stays bounded, totals keep counting and flushes write one row per model"""
+        import sqlite3
+        from ai_pool.usage_ledger import UsageLedger
+        from ai_pool.router import ModelRouter
+        
+        db_path = str(tmp_path / "memory_store.sqlite")
+        ledger = UsageLedger({"capacity": 5, "flush_interval_seconds": 60}, db_path)
+        for i in range(20):
+            ledger.record("gpt4o", i % 4 != 0, 100, 0.01, 200.0)
+        ledger.record("claude", False, 0, 0.0, 50.0)
+        
+        assert len(ledger.recent_calls()) == 5
+        assert ledger.get_totals() == {"total_tokens": 2000, "total_cost": pytest.approx(0.2),
+                                       "requests": 21}
+        assert ledger.get_stats()["gpt4o"]["failures"] == 5
+        
+        assert ledger.flush() == 2 and ledger.flush() == 0
+        rows = sqlite3.connect(db_path).execute(
+            "SELECT ai_id, success_count, failure_count, avg_latency_ms FROM ai_performance ORDER BY ai_id"
+        ).fetchall()
+        assert rows == [("claude", 0, 1, 50.0), ("gpt4o", 15, 5, 200.0)]
+        
+        router = ModelRouter({}, {"gpt4o": 0.3}, db_path)
+        assert router.model_summary("gpt4o")["success_rate"] == 0.75
+        ledger.close()
+    
+    def test_pool_records_provider_calls(self, stub_provider):
+        """Provider calls land in the ledger and session totals come from it"""
+        from ai_pool.pool_manager import AIPoolManager
+        
+        pool = AIPoolManager()
+        pool.usage.db_path = None
+        _point_pool_at(pool, stub_provider)
+        
+        pool.generate_plan("ledger_task", "Check usage", include_research=False)
+        usage = pool.get_session_usage()
+        
+        assert usage["requests"] == 3 and usage["total_tokens"] == 90
+        assert set(usage["models"]) == {"all", "gpt4o", "claude", "deepseek"}
+        pool.close()
+
+
+class TestPlanWorker:
+    """Tests for the plan job queue and pool worker daemon"""
+    
+    def test_queue_claims_leases_and_retries(self, tmp_path):
+        """Claims are exclusive, expired leases re-queue and failures retry up to max_attempts"""
+        from ai_pool.job_queue import PlanJobQueue
+        
+        queue = PlanJobQueue(str(tmp_path / "jobs.sqlite"), max_attempts=2, lease_seconds=0)
+        first = queue.enqueue("a", "first")
+        queue.enqueue("b", "second")
+        
+        claimed = queue.claim("w1", 1)
+        assert [job["id"] for job in claimed] == [first]
+        assert claimed[0]["payload"] == {"task": "a", "description": "first"}
+        assert len(queue.claim("w2", 5)) == 1
+        assert queue.claim("w3", 5) == []
+        
+        assert queue.requeue_expired() == 2
+        job = queue.claim("w1", 1)[0]
+        assert not queue.complete(job["id"], "w2", {"task": "a"})  # Not w2's lease
+        assert queue.fail(job["id"], "w1", "boom", job["attempts"])
+        assert queue.get(job["id"])["status"] == "failed"
+        
+        other = queue.claim("w1", 1)[0]
+        queue.fail(other["id"], "w1", "boom", 1)
+        retry = queue.claim("w1", 1)[0]
+        assert queue.complete(retry["id"], "w1", {"task": "b"})
+        assert queue.take_results() == [{"id": retry["id"], "payload": {"task": "b", "description": "second"},
+                                         "result": {"task": "b"}}]
+        assert queue.take_results() == []
+        assert queue.counts() == {"failed": 1, "collected": 1}
+    
+    def test_expired_leases_fail_at_max_attempts_and_renew(self, tmp_path):
+        """A job past max_attempts fails instead of re-queueing; a renewed lease survives"""
+        from ai_pool.job_queue import PlanJobQueue
+        
+        queue = PlanJobQueue(str(tmp_path / "jobs.sqlite"), max_attempts=1, lease_seconds=60)
+        dead, alive = queue.enqueue("a", "first"), queue.enqueue("b", "second")
+        queue.claim("w1", 2)
+        queue.storage.execute("UPDATE plan_jobs SET started_at = started_at - 120")
+        assert queue.renew("w1", [alive]) == 1
+        
+        assert queue.requeue_expired() == 0
+        assert queue.get(dead)["status"] == "failed"
+        assert queue.get(dead)["error"] == "Lease expired on the last attempt"
+        assert queue.get(alive)["status"] == "running"
+        assert not queue.complete(dead, "w1", {"task": "a"})
+        assert queue.complete(alive, "w1", {"task": "b"})
+    
+    def test_worker_runs_jobs_with_backpressure(self, tmp_path):
+        """One warm pool serves queued plans, never more than `concurrency` at once"""
+        from ai_pool.pool_manager import AIPoolManager
+        from ai_pool.job_queue import PlanJobQueue
+        from ai_pool.worker import PoolWorker
+        
+        pool = AIPoolManager()
+        pool.usage.db_path = None
+        for ai_id in ["gpt4o", "gemini", "claude", "deepseek"]:
+            setattr(pool, f"call_{ai_id}", _ok_response(ai_id, delay=0.2))
+        queue = PlanJobQueue(str(tmp_path / "jobs.sqlite"))
+        worker = PoolWorker(pool, queue, {"concurrency": 2, "poll_interval_seconds": 0.05})
+        
+        job_ids = [queue.enqueue(f"task_{i}", "Queued plan", include_research=False) for i in range(5)]
+        assert worker.run_once() == 2
+        assert worker.run_once() == 0
+        
+        thread = threading.Thread(target=worker.serve)
+        thread.start()
+        jobs = [queue.wait(job_id, timeout=10, poll_interval=0.05) for job_id in job_ids]
+        worker.stop()
+        thread.join(timeout=10)
+        
+        assert [job["status"] for job in jobs] == ["done"] * 5
+        assert jobs[0]["result"]["task"] == "task_0"
+        assert jobs[0]["result"]["consensus_score"] == 1.0
+        stats = worker.get_stats()
+        assert stats["all"]["completed"] == 5 and stats["all"]["in_flight"] == 0
+        assert stats["queue"] == {"done": 5}
+
+
+class TestSupervisorBatch:
+    """Tests for batch plan evaluation in the SupervisorEngine"""
+    
+    def test_batch_matches_single_evaluation(self, tmp_path, monkeypatch):
+        """One history query and one transaction score a batch like evaluate_plan does"""
+        import yaml
+        # supervisor.py imports trust_engine as a top-level module
+        monkeypatch.setattr(sys, "path", sys.path + [str(Path(__file__).parent.parent / "supervisor")])
+        from supervisor.supervisor import SupervisorEngine, DecisionStatus
+        
+        db_path = tmp_path / "memory_store.sqlite"
+        config_path = tmp_path / "decision_pool.yaml"
+        # Sync decision log: the batch commits on this thread's connection
+        config_path.write_text(yaml.safe_dump({"supervisor": {"memory_db": str(db_path),
+                                                              "decision_log": {"durability": "sync"}}}))
+        supervisor = SupervisorEngine(str(config_path))
+        supervisor.trust_engine.db_path = str(db_path)
+        
+        history = [("h1", "gpt4o", "completed"), ("h2", "gpt4o", "failed"), ("h3", "claude", "failed")]
+        supervisor.conn.executemany(
+            "INSERT INTO decisions (id, timestamp, source, plan, trust_score, cohesion_score, "
+            "cost_efficiency, status) VALUES (?, '', ?, '{}', 0.8, 0.8, 0.8, ?)", history)
+        supervisor.conn.commit()
+        
+        good = {"task": "deploy", "description": "Deploy the dashboard with live metrics",
+                "risk_level": "low", "has_tests": True}
+        risky = {"task": "migrate", "description": "Migrate", "risk_level": "high"}
+        plans = [(good, "gpt4o"), (risky, "claude"), (good, "gpt4o"), (good, "deepseek")]
+        expected = [supervisor.trust_engine.evaluate_trust(plan, source) for plan, source in plans]
+        
+        statements = []
+        supervisor.conn.set_trace_callback(statements.append)
+        lookups = Mock(wraps=supervisor.trust_engine.get_historical_trusts)
+        supervisor.trust_engine.get_historical_trusts = lookups
+        decisions = supervisor.evaluate_plans(plans)
+        
+        assert lookups.call_count == 1
+        assert [d.trust_score for d in decisions] == pytest.approx(expected)
+        assert [d.status for d in decisions] == [DecisionStatus.APPROVED, DecisionStatus.REJECTED,
+                                                 DecisionStatus.APPROVED, DecisionStatus.APPROVED]
+        assert len({d.id for d in decisions}) == 4
+        assert sum(1 for s in statements if s.strip().upper() == "COMMIT") == 1
+        
+        rows = supervisor.conn.execute("SELECT COUNT(*) FROM decisions WHERE id LIKE 'dec-%'").fetchone()
+        assert rows[0] == 4
+        assert supervisor.evaluate_plans([]) == []
+        supervisor.close()
+    
+    def test_trust_history_includes_queued_decisions(self, tmp_path, monkeypatch):
+        """Plans are scored against decisions the async log writer has not committed yet"""
+        import yaml
+        monkeypatch.setattr(sys, "path", sys.path + [str(Path(__file__).parent.parent / "supervisor")])
+        from supervisor.supervisor import SupervisorEngine
+        
+        db_path = tmp_path / "memory_store.sqlite"
+        config_path = tmp_path / "decision_pool.yaml"
+        config_path.write_text(yaml.safe_dump({"supervisor": {
+            "memory_db": str(db_path),
+            "decision_log": {"durability": "async", "flush_interval_ms": 5000}}}))
+        supervisor = SupervisorEngine(str(config_path))
+        supervisor.trust_engine.db_path = str(db_path)
+        
+        seen = []
+        count = lambda: supervisor.conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        history = supervisor.trust_engine.get_historical_trusts
+        supervisor.trust_engine.get_historical_trusts = lambda sources: seen.append(count()) or history(sources)
+        
+        plan = {"task": "deploy", "description": "Deploy the dashboard", "risk_level": "low"}
+        supervisor.evaluate_plan(plan, "gpt4o")
+        supervisor.evaluate_plan(plan, "gpt4o")
+        supervisor.evaluate_plans([(plan, "claude")])
+        
+        assert seen == [0, 1, 2]
+        supervisor.close()
+    
+    def test_weight_applied_only_after_commit(self, tmp_path):
+        """A failed weight update leaves the in-memory weight and the history untouched"""
+        from supervisor.trust_engine import TrustEngine
+        from storage.sqlite_storage import get_storage
+        from storage.migrations import migrate
+        
+        engine = TrustEngine()
+        engine.db_path = str(tmp_path / "memory_store.sqlite")
+        storage = get_storage(engine.db_path)
+        migrate(storage)
+        storage.execute("INSERT INTO decisions (id, timestamp, source, plan, trust_score, cohesion_score, "
+                        "cost_efficiency, status) VALUES ('d1', '', 'gemini', '{}', 0.8, 0.8, 0.8, 'completed')")
+        storage.execute("DROP TABLE ai_weights")
+        
+        engine.update_weights_from_telemetry({"decision_id": "d1", "build_status": "success"})
+        assert engine.weights["gemini"] == 0.20
+        assert storage.query_one("SELECT COUNT(*) FROM ai_weights_history")[0] == 0
+        
+        storage.execute("CREATE TABLE ai_weights (ai_id TEXT PRIMARY KEY, weight REAL, updated_at TEXT)")
+        engine.update_weights_from_telemetry({"decision_id": "d1", "build_status": "success"})
+        assert engine.weights["gemini"] == pytest.approx(0.21)
+        assert storage.query_one("SELECT weight FROM ai_weights")[0] == pytest.approx(0.21)
+
+
+class TestSQLiteStorage:
+    """Tests for the shared SQLite storage layer"""
+    
+    def test_pragmas_and_per_thread_connections(self, tmp_path):
+        """Each thread reuses one tuned connection; connections of finished threads are reaped"""
+        from storage.sqlite_storage import SQLiteStorage
+        
+        storage = SQLiteStorage(str(tmp_path / "store.sqlite"), {"mmap_size_mb": 8, "busy_timeout_ms": 1234})
+        conn = storage.connection()
+        assert storage.connection() is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 8 * 1024 * 1024
+        
+        others = []
+        thread = threading.Thread(target=lambda: others.append(storage.connection()))
+        thread.start()
+        thread.join()
+        assert others[0] is not conn
+        
+        storage.connection()  # Same thread: no new connection, no reaping
+        assert storage.get_stats()["open"] == 2
+        thread = threading.Thread(target=storage.connection)
+        thread.start()
+        thread.join()
+        stats = storage.get_stats()
+        assert stats["opened"] == 3 and stats["closed"] == 1 and stats["open"] == 2
+        storage.close()
+    
+    def test_reader_does_not_block_writer(self, tmp_path):
+        """With WAL an open read transaction keeps its snapshot while a writer commits"""
+        from storage.sqlite_storage import SQLiteStorage
+        
+        db_path = str(tmp_path / "store.sqlite")
+        writer = SQLiteStorage(db_path, {"busy_timeout_ms": 100})
+        reader = SQLiteStorage(db_path, {"busy_timeout_ms": 100})  # Stands in for another process
+        writer.execute("CREATE TABLE items (value INTEGER)")
+        writer.execute("INSERT INTO items VALUES (1)")
+        
+        with reader.transaction(immediate=False) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+            writer.executemany("INSERT INTO items VALUES (?)", [(2,), (3,)])
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+        assert reader.query_one("SELECT COUNT(*) FROM items")[0] == 3
+        writer.close()
+        reader.close()
+    
+    def test_transaction_rollback_and_reopen(self, tmp_path):
+        """A failed block rolls back as a whole; close() makes later calls reconnect"""
+        from storage.sqlite_storage import SQLiteStorage
+        
+        storage = SQLiteStorage(str(tmp_path / "store.sqlite"))
+        storage.execute("CREATE TABLE items (value INTEGER)")
+        with pytest.raises(ValueError):
+            with storage.transaction() as conn:
+                conn.execute("INSERT INTO items VALUES (1)")
+                with storage.transaction():  # Nested blocks join the outer transaction
+                    conn.execute("INSERT INTO items VALUES (2)")
+                raise ValueError("abort")
+        assert storage.query("SELECT value FROM items") == []
+        assert storage.get_stats()["rollbacks"] == 1
+        
+        storage.close()
+        storage.executemany("INSERT INTO items VALUES (?)", [(1,), (2,)])
+        assert storage.query("SELECT value FROM items ORDER BY value") == [(1,), (2,)]
+        stats = storage.get_stats()
+        assert stats["opened"] == 2 and stats["transactions"] == 1
+        storage.close()
+    
+    def test_component_close_keeps_other_threads_connections(self, tmp_path):
+        """close_connection() (used by SupervisorEngine.close) releases only the caller's connection"""
+        from storage.sqlite_storage import SQLiteStorage
+        
+        storage = SQLiteStorage(str(tmp_path / "store.sqlite"))
+        storage.execute("CREATE TABLE items (value INTEGER)")
+        held, release, done = [], threading.Event(), []
+        
+        def other_component():
+            with storage.transaction() as conn:
+                conn.execute("INSERT INTO items VALUES (1)")
+                held.append(conn)
+                release.wait(5)
+                conn.execute("INSERT INTO items VALUES (2)")  # Still open after the other close
+            done.append(True)
+        
+        thread = threading.Thread(target=other_component)
+        thread.start()
+        while not held:
+            time.sleep(0.01)
+        own = storage.connection()
+        storage.close_connection()
+        release.set()
+        thread.join()
+        
+        assert done and storage.connection() is not own
+        assert storage.query("SELECT value FROM items ORDER BY value") == [(1,), (2,)]
+        storage.close()
+    
+    def test_components_share_storage(self, tmp_path):
+        """get_storage hands every component the same storage per database file"""
+        from storage.sqlite_storage import get_storage
+        from ai_pool.job_queue import PlanJobQueue
+        from telemetry.telemetry_collector import TelemetryCollector
+        
+        db_path = tmp_path / "memory_store.sqlite"
+        collector = TelemetryCollector(str(db_path))
+        jobs = PlanJobQueue(str(db_path))
+        assert collector.storage is jobs.storage is get_storage(str(tmp_path / "." / "memory_store.sqlite"))
+        
+        collector.collect({"decision_id": "dec-1", "build_status": "success", "latency_ms": 100})
+        job_id = jobs.enqueue("task", "description")
+        assert collector.get_summary()["total_builds"] == 1
+        assert jobs.get(job_id)["status"] == "queued"
+        assert collector.storage.get_stats()["open"] == 1
+        collector.storage.close()
+
+
+class TestSchemaMigrations:
+    """Tests for the versioned memory_store.sqlite schema"""
+    
+    def test_fresh_database_migrates_once(self, tmp_path):
+        """A new database reaches the latest version; later runs apply nothing"""
+        from storage.sqlite_storage import SQLiteStorage
+        from storage.migrations import migrate, schema_version, SCHEMA_VERSION, TABLES
+        
+        storage = SQLiteStorage(str(tmp_path / "memory_store.sqlite"))
+        assert schema_version(storage) == 0
+        assert migrate(storage) == SCHEMA_VERSION == schema_version(storage)
+        
+        tables = {row[0] for row in storage.query("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert set(TABLES) <= tables
+        statements = []
+        storage.connection().set_trace_callback(statements.append)
+        assert migrate(storage) == SCHEMA_VERSION
+        assert statements == ["PRAGMA user_version"]
+        storage.close()
+    
+    def test_legacy_tables_are_rebuilt(self, tmp_path):
+        """Tables from the old ad hoc schemas keep their rows and gain the missing columns"""
+        from storage.sqlite_storage import SQLiteStorage
+        from storage.migrations import migrate, SCHEMA_VERSION
+        
+        storage = SQLiteStorage(str(tmp_path / "memory_store.sqlite"))
+        # Telemetry table as SupervisorEngine used to create it (no created_at)
+        storage.execute("""
+            CREATE TABLE telemetry (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+                                    decision_id TEXT, build_status TEXT, latency_ms REAL)
+        """)
+        storage.execute("CREATE INDEX idx_telemetry_timestamp ON telemetry (timestamp)")
+        storage.execute("INSERT INTO telemetry (timestamp, build_status, latency_ms) VALUES ('t1', 'success', 12)")
+        
+        assert migrate(storage) == SCHEMA_VERSION
+        columns = [row[1] for row in storage.query("PRAGMA table_info(telemetry)")]
+        assert "created_at" in columns and "cost_usd" in columns
+        assert storage.query("SELECT timestamp, build_status, latency_ms, cost_usd FROM telemetry") == \
+            [("t1", "success", 12.0, 0.0)]
+        indexes = {row[0] for row in storage.query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_telemetry_timestamp_covering" in indexes and "idx_telemetry_timestamp" not in indexes
+        storage.close()
+    
+    def test_hot_queries_use_covering_indexes(self, tmp_path, monkeypatch):
+        """EXPLAIN QUERY PLAN: trust, health and optimizer queries read only covering indexes"""
+        import yaml
+        monkeypatch.setattr(sys, "path", sys.path + [str(Path(__file__).parent.parent / "supervisor")])
+        from supervisor.supervisor import SupervisorEngine
+        from supervisor.gpt5_optimizer import GPT5Optimizer
+        
+        db_path = tmp_path / "memory_store.sqlite"
+        config_path = tmp_path / "decision_pool.yaml"
+        config_path.write_text(yaml.safe_dump({"supervisor": {"memory_db": str(db_path)}}))
+        supervisor = SupervisorEngine(str(config_path))
+        supervisor.trust_engine.db_path = str(db_path)
+        optimizer = GPT5Optimizer()
+        optimizer.storage = supervisor.storage
+        
+        statements = []
+        supervisor.conn.set_trace_callback(statements.append)
+        supervisor.trust_engine.get_historical_trusts(["gpt4o", "claude"])
+        supervisor.get_system_health()
+        optimizer.get_telemetry_summary()
+        supervisor.conn.set_trace_callback(None)
+        
+        queries = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(queries) == 5
+        for query in queries:
+            plan = [row[3] for row in supervisor.conn.execute("EXPLAIN QUERY PLAN " + query)]
+            assert plan and all("USING COVERING INDEX" in step for step in plan), (query, plan)
+        supervisor.close()
+
+
+class TestDecisionLogWriter:
+    """Tests for the group-commit decision log writer"""
+    
+    INSERT = "INSERT INTO decisions (id, timestamp, source, plan, trust_score, cohesion_score, " \
+             "cost_efficiency, status) VALUES (?, '', 'gpt4o', '{}', 0.8, 0.8, 0.8, 'approved')"
+    UPDATE = "UPDATE decisions SET status = ? WHERE id = ?"
+    
+    @staticmethod
+    def _storage(tmp_path):
+        from storage.sqlite_storage import SQLiteStorage
+        from storage.migrations import migrate
+        
+        storage = SQLiteStorage(str(tmp_path / "memory_store.sqlite"))
+        migrate(storage)
+        return storage
+    
+    def test_async_writes_are_group_committed(self, tmp_path):
+        """Callers never commit; queued writes share transactions and keep their order"""
+        from supervisor.decision_log import DecisionLogWriter
+        
+        storage = self._storage(tmp_path)
+        log = DecisionLogWriter(storage, {"flush_interval_ms": 100})
+        statements = []
+        storage.connection().set_trace_callback(statements.append)
+        for i in range(50):
+            log.write(self.INSERT, [(f"dec-{i}",)])
+            log.write(self.UPDATE, [("completed", f"dec-{i}")])
+        assert statements == []
+        
+        assert log.flush(timeout=5)
+        storage.connection().set_trace_callback(None)
+        rows = storage.query("SELECT status, COUNT(*) FROM decisions GROUP BY status")
+        assert rows == [("completed", 50)]
+        stats = log.get_stats()["all"]
+        assert stats["writes"] == 100 and stats["batches"] < 10 and stats["pending"] == 0
+        log.close()
+        storage.close()
+    
+    def test_close_flushes_and_later_writes_are_synchronous(self, tmp_path):
+        """Nothing queued is lost on shutdown; a closed writer commits inline"""
+        from supervisor.decision_log import DecisionLogWriter
+        
+        storage = self._storage(tmp_path)
+        log = DecisionLogWriter(storage, {"flush_interval_ms": 1000})
+        log.write(self.INSERT, [("dec-1",), ("dec-2",)])
+        log.close()
+        assert storage.query_one("SELECT COUNT(*) FROM decisions")[0] == 2
+        
+        log.write(self.INSERT, [("dec-3",)])
+        assert storage.query_one("SELECT COUNT(*) FROM decisions")[0] == 3
+        with pytest.raises(sqlite3.IntegrityError):
+            log.write(self.INSERT, [("dec-3",)])
+        storage.close()
+    
+    def test_bad_write_does_not_drop_its_batch(self, tmp_path):
+        """A failing statement is isolated; group mode raises it to its caller"""
+        from supervisor.decision_log import DecisionLogWriter
+        
+        storage = self._storage(tmp_path)
+        log = DecisionLogWriter(storage, {"durability": "group", "flush_interval_ms": 50})
+        log.write(self.INSERT, [("dec-1",)])
+        assert storage.query_one("SELECT COUNT(*) FROM decisions")[0] == 1  # Committed on return
+        
+        results = []
+        
+        def write(decision_id):
+            try:
+                log.write(self.INSERT, [(decision_id,)])
+                results.append(decision_id)
+            except sqlite3.IntegrityError:
+                results.append("error")
+        
+        threads = [threading.Thread(target=write, args=(d,)) for d in ("dec-2", "dec-1", "dec-3")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == ["dec-2", "dec-3", "error"]
+        assert storage.query_one("SELECT COUNT(*) FROM decisions")[0] == 3
+        assert log.get_stats()["all"]["write_errors"] == 1
+        log.close()
+        storage.close()
+    
+    def test_writer_survives_errors_and_is_replaced_when_dead(self, tmp_path):
+        """Unexpected errors reach the waiting caller; a dead writer's queue is committed inline"""
+        from supervisor.decision_log import DecisionLogWriter
+        
+        storage = self._storage(tmp_path)
+        log = DecisionLogWriter(storage, {"durability": "group", "flush_interval_ms": 0})
+        commit = log._commit
+        failures = [RuntimeError("disk gone")]
+        
+        def flaky_commit(batch):
+            if failures:
+                raise failures.pop()
+            commit(batch)
+        
+        log._commit = flaky_commit
+        with pytest.raises(RuntimeError):
+            log.write(self.INSERT, [("dec-1",)])
+        log.write(self.INSERT, [("dec-2",)])
+        assert log._writer.is_alive() and log.get_stats()["all"]["write_errors"] == 1
+        log.close()
+        
+        dead = DecisionLogWriter(storage, {"flush_interval_ms": 1000})
+        dead._run_writer = lambda: None  # A writer thread that is gone at once
+        dead.write(self.INSERT, [("dec-3",)])
+        dead._writer.join()
+        dead.write(self.INSERT, [("dec-4",)])
+        assert dead.flush(timeout=5)
+        assert storage.query("SELECT id FROM decisions ORDER BY id") == [("dec-2",), ("dec-3",), ("dec-4",)]
+        dead.close()
+        storage.close()
+    
+    def test_bounded_queue_applies_backpressure(self, tmp_path):
+        """Writers block once queue_size statements are pending"""
+        from supervisor.decision_log import DecisionLogWriter
+        
+        storage = self._storage(tmp_path)
+        log = DecisionLogWriter(storage, {"queue_size": 2, "batch_size": 1, "flush_interval_ms": 0})
+        gate = threading.Event()
+        commit = log._commit
+        log._commit = lambda batch: (gate.wait(5), commit(batch))
+        
+        producer = threading.Thread(target=lambda: [log.write(self.INSERT, [(f"dec-{i}",)]) for i in range(6)])
+        producer.start()
+        time.sleep(0.2)
+        assert producer.is_alive() and log.get_stats()["all"]["queue_full"] >= 1
+        assert log.get_stats()["all"]["pending"] <= 2
+        
+        gate.set()
+        producer.join(timeout=5)
+        log.close()
+        assert storage.query_one("SELECT COUNT(*) FROM decisions")[0] == 6
+        storage.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -14,11 +14,19 @@ This module handles:
 import json
 import requests
 import os
+import sys
 import time
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
-import sqlite3
+
+# archon_core root, for the shared storage layer
+ARCHON_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ARCHON_ROOT not in sys.path:
+    sys.path.append(ARCHON_ROOT)
+
+from storage.sqlite_storage import get_storage
+from storage.migrations import migrate
 
 
 @dataclass
@@ -247,23 +255,9 @@ class WebhookDispatcher:
             if not os.path.exists(db_path):
                 return
             
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Ensure triggers table exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS triggers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    decision_id TEXT,
-                    source TEXT,
-                    trust_score REAL,
-                    status TEXT,
-                    error TEXT
-                )
-            """)
-            
-            cursor.execute("""
+            storage = get_storage(db_path)
+            migrate(storage)
+            storage.execute("""
                 INSERT INTO triggers (timestamp, decision_id, source, trust_score, status, error)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (
@@ -275,9 +269,6 @@ class WebhookDispatcher:
                 error
             ))
             
-            conn.commit()
-            conn.close()
-            
         except Exception as e:
             print(f"Warning: Could not log trigger: {e}")
     
@@ -306,8 +297,7 @@ class WebhookDispatcher:
             if not os.path.exists(db_path):
                 return []
             
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            cursor = get_storage(db_path).connection().cursor()
             
             cursor.execute("""
                 SELECT timestamp, decision_id, source, trust_score, status, error
@@ -328,7 +318,6 @@ class WebhookDispatcher:
                 for row in cursor.fetchall()
             ]
             
-            conn.close()
             return history
             
         except Exception as e: